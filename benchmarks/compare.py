@@ -0,0 +1,68 @@
+import argparse
+import json
+from typing import List
+
+# Métrica -> True si un valor mayor es mejor
+METRICS = {
+    "rows_per_second": True,
+    "wall_seconds": False,
+    "peak_rss_bytes": False,
+}
+
+
+def compare_reports(baseline: dict, current: dict, threshold: float = 0.15) -> List:
+    """
+    Compara dos reportes de `benchmarks.run` y retorna las regresiones que
+    superan `threshold` (fracción relativa) en cualquier métrica.
+    """
+    regressions = []
+    for name, base in baseline.get("benchmarks", {}).items():
+        result = current.get("benchmarks", {}).get(name)
+        if result is None or "error" in result:
+            regressions.append({"benchmark": name, "metric": "missing"})
+            continue
+        if "error" in base:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append(
+                    {
+                        "benchmark": name,
+                        "metric": metric,
+                        "baseline": old,
+                        "current": new,
+                        "change": round(change, 4),
+                    }
+                )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Detecta regresiones contra un baseline de benchmarks"
+    )
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    with open(args.baseline, "r") as f:
+        baseline_report = json.load(f)
+    with open(args.current, "r") as f:
+        current_report = json.load(f)
+    if baseline_report.get("dataset") != current_report.get("dataset"):
+        print("Advertencia: los reportes usan datasets distintos")
+
+    found = compare_reports(baseline_report, current_report, args.threshold)
+    if not found:
+        print(f"Sin regresiones (umbral {args.threshold:.0%})")
+        exit(0)
+    print(f"Regresiones detectadas (umbral {args.threshold:.0%}):")
+    for regression in found:
+        print(f"  {json.dumps(regression)}")
+    exit(1)
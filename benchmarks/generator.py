@@ -0,0 +1,120 @@
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+HEADER = "id,timestamp,value,category\n"
+BASE_TIMESTAMP = datetime(2024, 1, 1)
+
+# Variantes de filas inválidas que el Ingestor debe descartar
+INVALID_ROWS = (
+    "{id},no-es-fecha,{value},{category}",
+    "{id},{timestamp},no-es-numero,{category}",
+    "{id},{timestamp},{value},",
+    "-{id},{timestamp},{value},{category}",
+)
+
+
+def _category(index: int, encoding: str) -> str:
+    """Nombre de categoría; en latin-1 incluye caracteres no ASCII"""
+    if encoding == "latin-1":
+        return f"categoría_{index}"
+    return f"category_{index}"
+
+
+def generate_dataset(
+    output_dir: Path,
+    rows: int,
+    files: int = 1,
+    categories: int = 10,
+    duplicate_ratio: float = 0.0,
+    invalid_ratio: float = 0.0,
+    encoding: str = "utf-8",
+    seed: int = 42,
+) -> dict:
+    """
+    Genera CSV sintéticos deterministas (misma semilla = mismos bytes) con
+    cardinalidad de categorías, proporción de ids duplicados y de filas
+    inválidas controladas. Escribe fila a fila, sin cargar el dataset.
+    """
+    if encoding not in ("utf-8", "latin-1"):
+        raise ValueError(f"Encoding no soportado: {encoding}")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    files = max(1, files)
+
+    counts = {"rows": 0, "duplicates": 0, "invalid": 0}
+    next_id = 1
+    for file_index in range(files):
+        file_rows = rows // files + (1 if file_index < rows % files else 0)
+        path = output_dir / f"bench_{file_index:05d}.csv"
+        with open(path, "w", encoding=encoding, newline="") as f:
+            f.write(HEADER)
+            for _ in range(file_rows):
+                if next_id > 1 and rng.random() < duplicate_ratio:
+                    record_id = rng.randint(1, next_id - 1)
+                    counts["duplicates"] += 1
+                else:
+                    record_id = next_id
+                    next_id += 1
+                timestamp = BASE_TIMESTAMP + timedelta(seconds=record_id)
+                fields = {
+                    "id": record_id,
+                    "timestamp": timestamp.isoformat() + "Z",
+                    "value": round(rng.uniform(-1000.0, 1000.0), 4),
+                    "category": _category(rng.randrange(max(1, categories)), encoding),
+                }
+                if rng.random() < invalid_ratio:
+                    template = INVALID_ROWS[rng.randrange(len(INVALID_ROWS))]
+                    counts["invalid"] += 1
+                else:
+                    template = "{id},{timestamp},{value},{category}"
+                f.write(template.format(**fields) + "\n")
+                counts["rows"] += 1
+
+    return {
+        "rows": counts["rows"],
+        "files": files,
+        "categories": categories,
+        "duplicate_ratio": duplicate_ratio,
+        "invalid_ratio": invalid_ratio,
+        "encoding": encoding,
+        "seed": seed,
+        "duplicates": counts["duplicates"],
+        "invalid": counts["invalid"],
+    }
+
+
+def add_dataset_arguments(parser: argparse.ArgumentParser) -> None:
+    """Opciones del generador compartidas con el runner de benchmarks"""
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--files", type=int, default=1)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0)
+    parser.add_argument("--invalid-ratio", type=float, default=0.0)
+    parser.add_argument("--encoding", choices=["utf-8", "latin-1"], default="utf-8")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def dataset_kwargs(args: argparse.Namespace) -> dict:
+    """Argumentos de `generate_dataset` desde la línea de comandos"""
+    return {
+        "rows": args.rows,
+        "files": args.files,
+        "categories": args.categories,
+        "duplicate_ratio": args.duplicate_ratio,
+        "invalid_ratio": args.invalid_ratio,
+        "encoding": args.encoding,
+        "seed": args.seed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generador de CSV sintéticos")
+    parser.add_argument("output_dir")
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+    summary = generate_dataset(Path(args.output_dir), **dataset_kwargs(args))
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.generator import add_dataset_arguments, dataset_kwargs, generate_dataset
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+STAGES = ("ingestor", "transformer", "publisher")
+BENCHMARKS = STAGES + ("pipeline",)
+
+
+def _peak_rss_bytes() -> int:
+    """Pico de RSS del proceso actual"""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_stage(stage: str) -> dict:
+    """Ejecuta una etapa en este proceso (lanzado por `measure_stage`)"""
+    start = time.perf_counter()
+    if stage == "ingestor":
+        from pipeline.ingestor.main import Ingestor
+
+        Ingestor().ingest()
+        success = True
+    elif stage == "transformer":
+        from pipeline.transformer.main import Transformer
+
+        Transformer().transform()
+        success = True
+    elif stage == "publisher":
+        from pipeline.publisher.main import Publisher
+
+        success = Publisher().publish()
+    elif stage == "pipeline":
+        from pipeline.runner import PipelineRunner
+
+        success = PipelineRunner().run()
+    else:
+        raise ValueError(f"Benchmark no soportado: {stage}")
+    return {
+        "success": bool(success),
+        "wall_seconds": time.perf_counter() - start,
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def measure_stage(stage: str, sandbox: Path, rows: int, env: Dict[str, str]) -> dict:
+    """Mide una etapa en un proceso nuevo para aislar el pico de RSS"""
+    child_env = dict(os.environ)
+    child_env.update(env)
+    child_env.update(
+        {
+            "INPUT_DIR": str(sandbox / "input"),
+            "INTERMEDIATE_DIR": str(sandbox / "intermediate"),
+            "OUTPUT_DIR": str(sandbox / "output"),
+            "PYTHONPATH": str(PROJECT_ROOT),
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--child", stage],
+        cwd=PROJECT_ROOT,
+        env=child_env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return {"error": result.stderr[-2000:]}
+    measurement = json.loads(result.stdout.strip().splitlines()[-1])
+    if not measurement["success"]:
+        return {"error": f"{stage} terminó sin éxito: {result.stderr[-2000:]}"}
+    wall = measurement["wall_seconds"]
+    measurement["rows_per_second"] = rows / wall if wall > 0 else 0.0
+    return measurement
+
+
+def run_benchmarks(
+    dataset: dict, env: Dict[str, str], benchmarks: List[str] = BENCHMARKS
+) -> dict:
+    """Genera el dataset y mide cada etapa y el pipeline completo"""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmpdir:
+        input_dir = Path(tmpdir) / "data"
+        summary = generate_dataset(input_dir, **dataset)
+
+        # Etapas encadenadas en un mismo sandbox
+        stages_sandbox = Path(tmpdir) / "stages"
+        stages_sandbox.mkdir()
+        (stages_sandbox / "input").symlink_to(input_dir)
+        # Las etapas previas a la última pedida se ejecutan aunque no se midan,
+        # porque producen los artefactos de entrada de las siguientes
+        requested = [i for i, stage in enumerate(STAGES) if stage in benchmarks]
+        for stage in STAGES[: max(requested) + 1] if requested else ():
+            measurement = measure_stage(stage, stages_sandbox, summary["rows"], env)
+            if stage in benchmarks:
+                results[stage] = measurement
+
+        # Pipeline completo en proceso, en un sandbox limpio
+        if "pipeline" in benchmarks:
+            pipeline_sandbox = Path(tmpdir) / "pipeline"
+            pipeline_sandbox.mkdir()
+            (pipeline_sandbox / "input").symlink_to(input_dir)
+            results["pipeline"] = measure_stage(
+                "pipeline", pipeline_sandbox, summary["rows"], env
+            )
+
+    return {
+        "dataset": summary,
+        "env": env,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "benchmarks": results,
+    }
+
+
+def print_results(report: dict) -> None:
+    """Imprime una tabla con rows/s, tiempo y pico de RSS por benchmark"""
+    print(f"Dataset: {report['dataset']['rows']} filas")
+    for name, result in report["benchmarks"].items():
+        if "error" in result:
+            print(f"  {name:<12} ERROR")
+            continue
+        print(
+            f"  {name:<12} {result['rows_per_second']:>12.0f} filas/s "
+            f"{result['wall_seconds']:>8.2f}s "
+            f"{result['peak_rss_bytes'] / 1024**2:>8.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        print(json.dumps(run_stage(sys.argv[2])))
+        exit(0)
+
+    parser = argparse.ArgumentParser(description="Benchmarks de etapas y pipeline")
+    add_dataset_arguments(parser)
+    parser.add_argument(
+        "--benchmark", action="append", choices=BENCHMARKS, help="Por defecto todos"
+    )
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        help="Variable de configuración CLAVE=VALOR (ej. MEMORY_BUDGET=512MB)",
+    )
+    parser.add_argument("--output", help="Guardar el reporte JSON en este archivo")
+    args = parser.parse_args()
+
+    env = dict(assignment.split("=", 1) for assignment in args.env)
+    report = run_benchmarks(
+        dataset_kwargs(args), env, list(args.benchmark or BENCHMARKS)
+    )
+    print_results(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    failed = any("error" in result for result in report["benchmarks"].values())
+    exit(1 if failed else 0)
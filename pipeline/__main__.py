@@ -0,0 +1,40 @@
+import argparse
+import logging
+
+from pipeline.config import LOG_LEVEL
+from pipeline.runner import PipelineRunner
+
+if __name__ == "__main__":
+    logging.basicConfig(level=getattr(logging, LOG_LEVEL))
+    parser = argparse.ArgumentParser(
+        description="Pipeline completo en un solo proceso (DataFrames en memoria)"
+    )
+    parser.add_argument(
+        "--persist-intermediate",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=(
+            "Escribir los artefactos intermedios {hash}.json y registrar los "
+            "archivos procesados (por defecto PERSIST_INTERMEDIATE=true)"
+        ),
+    )
+    parser.add_argument(
+        "--persist-transformed",
+        action="store_true",
+        default=None,
+        help="Escribir transformed_*.json antes de publicar",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        default=None,
+        help="Solapar ingesta, transformación y escritura con colas acotadas",
+    )
+    args = parser.parse_args()
+
+    runner = PipelineRunner(
+        persist_intermediate=args.persist_intermediate,
+        persist_transformed=args.persist_transformed,
+        streaming=args.streaming,
+    )
+    exit(0 if runner.run() else 1)
@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from pipeline.contracts.sidecar import read_sidecar
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILENAME = ".catalog.jsonl"
+
+
+class CatalogEntry:
+    """Entrada del catálogo de publicación"""
+
+    def __init__(
+        self,
+        path: str,
+        created_at: str,
+        size: int,
+        data_hash: Optional[str],
+        total_records: Optional[int],
+    ):
+        self.path = path
+        self.created_at = created_at
+        self.size = size
+        self.data_hash = data_hash
+        self.total_records = total_records
+
+    def to_dict(self):
+        """Convertir a diccionario"""
+        return {
+            "path": self.path,
+            "created_at": self.created_at,
+            "size": self.size,
+            "data_hash": self.data_hash,
+            "total_records": self.total_records,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CatalogEntry":
+        """Construir una entrada desde un diccionario"""
+        return cls(
+            path=data["path"],
+            created_at=data["created_at"],
+            size=data["size"],
+            data_hash=data.get("data_hash"),
+            total_records=data.get("total_records"),
+        )
+
+
+class PublicationCatalog:
+    """Catálogo append-only de archivos transformados (JSON Lines)"""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.catalog_path = self.directory / CATALOG_FILENAME
+
+    def exists(self) -> bool:
+        """Indica si el catálogo ya fue creado"""
+        return self.catalog_path.exists()
+
+    def register(
+        self,
+        file_path: Path,
+        data_hash: Optional[str],
+        total_records: Optional[int],
+    ) -> CatalogEntry:
+        """Registrar un archivo transformado al final del catálogo"""
+        stat = file_path.stat()
+        entry = CatalogEntry(
+            path=file_path.name,
+            created_at=datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            size=stat.st_size,
+            data_hash=data_hash,
+            total_records=total_records,
+        )
+        self._append(entry)
+        logger.info(f"Catálogo actualizado: {entry.path}")
+        return entry
+
+    def _append(self, entry: CatalogEntry) -> None:
+        """Agregar una línea completa al catálogo"""
+        line = json.dumps(entry.to_dict(), sort_keys=True) + "\n"
+        with open(self.catalog_path, "a") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def latest(self) -> Optional[CatalogEntry]:
+        """Última entrada registrada, leyendo solo el final del archivo"""
+        if not self.catalog_path.exists():
+            return None
+        line = self._read_last_line()
+        if not line:
+            return None
+        try:
+            return CatalogEntry.from_dict(json.loads(line))
+        except (json.JSONDecodeError, KeyError) as e:
+            logger.warning(f"Última entrada del catálogo corrupta: {e}")
+            return None
+
+    def _read_last_line(self, block_size: int = 4096) -> str:
+        """Leer la última línea no vacía buscando desde el final"""
+        with open(self.catalog_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            buffer = b""
+            while position > 0:
+                step = min(block_size, position)
+                position -= step
+                f.seek(position)
+                buffer = f.read(step) + buffer
+                stripped = buffer.rstrip(b"\n")
+                if b"\n" in stripped:
+                    return stripped.rsplit(b"\n", 1)[1].decode("utf-8")
+            return buffer.rstrip(b"\n").decode("utf-8")
+
+    def entries(self) -> List[CatalogEntry]:
+        """Todas las entradas del catálogo en orden de registro"""
+        if not self.catalog_path.exists():
+            return []
+        entries = []
+        with open(self.catalog_path, "r") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(CatalogEntry.from_dict(json.loads(line)))
+        return entries
+
+    def rebuild(self, pattern: str = "transformed_*.json") -> int:
+        """Reconstruir el catálogo a partir del contenido del directorio"""
+        files = sorted(self.directory.glob(pattern), key=lambda x: x.stat().st_mtime)
+        tmp_path = self.catalog_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            for file_path in files:
+                data_hash, total_records = self._read_output_metadata(file_path)
+                stat = file_path.stat()
+                entry = CatalogEntry(
+                    path=file_path.name,
+                    created_at=datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                    size=stat.st_size,
+                    data_hash=data_hash,
+                    total_records=total_records,
+                )
+                f.write(json.dumps(entry.to_dict(), sort_keys=True) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.catalog_path)
+        logger.info(f"Catálogo reconstruido con {len(files)} entradas")
+        return len(files)
+
+    @staticmethod
+    def _read_output_metadata(file_path: Path):
+        """Extraer data_hash y total_records de un archivo transformado"""
+        sidecar = read_sidecar(file_path)
+        if sidecar is not None:
+            metadata = sidecar["metadata"]
+            return metadata.get("data_hash"), metadata.get("total_records")
+        try:
+            with open(file_path, "r") as f:
+                metadata = json.load(f).get("metadata", {})
+            return metadata.get("data_hash"), metadata.get("total_records")
+        except (json.JSONDecodeError, AttributeError, OSError):
+            return None, None
+
+
+if __name__ == "__main__":
+    import sys
+
+    from pipeline.config import LOG_LEVEL, OUTPUT_DIR
+
+    logging.basicConfig(level=getattr(logging, LOG_LEVEL))
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print("Uso: python -m pipeline.catalog rebuild [directorio]")
+        exit(1)
+    directory = sys.argv[2] if len(sys.argv) > 2 else OUTPUT_DIR
+    total = PublicationCatalog(directory).rebuild()
+    print(f"Catálogo reconstruido: {total} entradas")
@@ -1,9 +1,99 @@
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
+# La configuración se resuelve en el primer acceso (PEP 562): importar este
+# módulo no lee `.env` ni el entorno; `from pipeline.config import X` o
+# `config.X` resuelven y cachean el valor.
+_loaded = False
 
-LOG_LEVEL = os.getenv("LOG_LEVEL", default="INFO")
-INPUT_DIR = os.getenv("INPUT_DIR", default="/data/input")
-INTERMEDIATE_DIR = os.getenv("INTERMEDIATE_DIR", default="/data/intermediate")
-OUTPUT_DIR = os.getenv("OUTPUT_DIR", default="/data/output")
+
+def _env_bool(name: str, default: str) -> bool:
+    """Interpreta una variable de entorno booleana"""
+    return os.getenv(name, default=default).strip().lower() in ("1", "true", "yes")
+
+
+def _env_int(name: str, default: str) -> int:
+    """Interpreta una variable de entorno entera"""
+    return int(os.getenv(name, default=default))
+
+
+def _env_list(name: str, default: str) -> list:
+    """Interpreta una lista separada por comas"""
+    return [f.strip() for f in os.getenv(name, default=default).split(",") if f.strip()]
+
+
+def _env_size(name: str, default: str) -> int:
+    """Interpreta un tamaño en bytes con sufijo opcional (512MB, 2g)"""
+    from pipeline.memory import parse_size
+
+    return parse_size(os.getenv(name, default=default))
+
+
+_SETTINGS = {
+    "LOG_LEVEL": (os.getenv, "INFO"),
+    "INPUT_DIR": (os.getenv, "/data/input"),
+    "INTERMEDIATE_DIR": (os.getenv, "/data/intermediate"),
+    "OUTPUT_DIR": (os.getenv, "/data/output"),
+    "PUBLISH_VALIDATION": (os.getenv, "strict"),
+    "PUBLISH_KEEP_VERSIONS": (_env_int, "10"),
+    "PUBLISH_RETENTION_DAYS": (_env_int, "0"),
+    "PUBLISH_DELTA": (_env_bool, "true"),
+    "EXPORT_FORMATS": (_env_list, ""),
+    "PUBLISH_SEGMENTS": (_env_bool, "false"),
+    "SEGMENT_MIN_MERGE": (_env_int, "4"),
+    "PUBLISH_INDEXES": (_env_bool, "false"),
+    "INDEX_BLOCK_RECORDS": (_env_int, "1024"),
+    "HASH_ALGORITHM": (os.getenv, "sha256"),
+    "HASH_SCHEME": (os.getenv, "plain"),
+    "HASH_CHUNK_SIZE": (_env_int, str(64 * 1024 * 1024)),
+    "HASH_WORKERS": (_env_int, "0"),
+    "PERSIST_INTERMEDIATE": (_env_bool, "true"),
+    "PERSIST_TRANSFORMED": (_env_bool, "false"),
+    "PIPELINE_STREAMING": (_env_bool, "false"),
+    "PIPELINE_QUEUE_SIZE": (_env_int, "2"),
+    "SMALL_FILE_THRESHOLD_BYTES": (_env_int, "0"),
+    "SMALL_FILE_BATCH_SIZE": (_env_int, "5000"),
+    "TRANSFORM_CHECKPOINT": (_env_bool, "false"),
+    "MEMORY_BUDGET": (_env_size, "0"),
+    "METRICS_ENABLED": (_env_bool, "false"),
+    "METRICS_DIR": (os.getenv, ""),
+    "PROFILE": (_env_list, ""),
+    "PROFILE_DIR": (os.getenv, ""),
+    "PROFILE_SAMPLE_RATE": (_env_int, "1"),
+    "PROFILE_TOP_N": (_env_int, "25"),
+    "TRACING_ENABLED": (_env_bool, "false"),
+    "TRACING_DIR": (os.getenv, ""),
+    "GLOBAL_DEDUP": (_env_bool, "false"),
+    "ID_INDEX_DIR": (os.getenv, ""),
+    "ID_INDEX_CAPACITY": (_env_int, "10000000"),
+    "ID_INDEX_BUFFER": (_env_int, "1000000"),
+}
+
+
+def _load_env() -> None:
+    """Carga `.env` una sola vez, en el primer acceso a la configuración"""
+    global _loaded
+    if not _loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _loaded = True
+
+
+def __getattr__(name: str):
+    if name not in _SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    _load_env()
+    parse, default = _SETTINGS[name]
+    value = parse(name, default=default)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_SETTINGS))
+
+
+def reset() -> None:
+    """Olvida los valores resueltos para releerlos del entorno (tests)"""
+    for name in _SETTINGS:
+        globals().pop(name, None)
@@ -0,0 +1,58 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional
+
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import from_json
+
+from pipeline.contracts.schemas import OutputData, TransformedRecord
+
+# Campos fuera del hash canónico de la salida (varían entre ejecuciones)
+HASH_EXCLUDE = {"processed_at"}
+
+
+@lru_cache(maxsize=None)
+def _records_adapter() -> TypeAdapter:
+    """Adaptador de listas de TransformedRecord (se construye una vez)"""
+    return TypeAdapter(List[TransformedRecord])
+
+
+def load_json(data: bytes) -> Any:
+    """Parseo JSON en Rust (pydantic-core) a objetos Python"""
+    return from_json(data)
+
+
+def is_json_error(error: ValidationError) -> bool:
+    """El error proviene de bytes que no son JSON válido"""
+    return any(detail["type"] == "json_invalid" for detail in error.errors())
+
+
+def validate_output_json(data: bytes) -> OutputData:
+    """Valida un documento de salida directamente desde sus bytes"""
+    return OutputData.model_validate_json(data)
+
+
+def validate_records(records: Iterable[dict]) -> List[TransformedRecord]:
+    """Valida una lista de registros en una sola llamada al validador nativo"""
+    if not isinstance(records, list):
+        records = list(records)
+    return _records_adapter().validate_python(records)
+
+
+def validate_records_json(data: bytes) -> List[TransformedRecord]:
+    """Valida un arreglo JSON de registros directamente desde sus bytes"""
+    return _records_adapter().validate_json(data)
+
+
+def dump_records(
+    records: List[TransformedRecord], for_hash: bool = False
+) -> List[dict]:
+    """Registros como dicts; `for_hash` excluye los campos fuera del hash"""
+    exclude = {"__all__": HASH_EXCLUDE} if for_hash else None
+    return _records_adapter().dump_python(records, exclude=exclude)
+
+
+def dump_records_json(
+    records: List[TransformedRecord], indent: Optional[int] = None
+) -> bytes:
+    """Serializa una lista de registros a bytes JSON en una sola llamada"""
+    return _records_adapter().dump_json(records, indent=indent)
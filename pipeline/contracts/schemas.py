@@ -2,6 +2,9 @@ from datetime import datetime
 from typing import List
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 
+# Columna de los segmentos intermedios coalescidos con el hash del CSV de origen
+SOURCE_COLUMN = "source_hash"
+
 
 class InputRecord(BaseModel):
     """
@@ -0,0 +1,47 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+SIDECAR_SUFFIX = ".sha256"
+
+
+def sidecar_path(file_path: Path) -> Path:
+    """Ruta del sidecar asociado a un archivo transformado"""
+    return file_path.with_name(file_path.name + SIDECAR_SUFFIX)
+
+
+def write_sidecar(file_path: Path, sha256: str, size: int, metadata: dict) -> Path:
+    """
+    Escribe el sidecar con el hash SHA256 a nivel de bytes, el tamaño
+    y la metadata de salida del archivo transformado
+    """
+    target = sidecar_path(file_path)
+    tmp_path = target.with_name(target.name + ".tmp")
+    content = {
+        "file": file_path.name,
+        "sha256": sha256,
+        "size": size,
+        "metadata": metadata,
+    }
+    with open(tmp_path, "w") as f:
+        json.dump(content, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, target)
+    return target
+
+
+def read_sidecar(file_path: Path) -> Optional[dict]:
+    """Lee el sidecar de un archivo transformado, None si no existe o es inválido"""
+    path = sidecar_path(file_path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r") as f:
+            content = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+    if not all(key in content for key in ("sha256", "size", "metadata")):
+        return None
+    return content
@@ -0,0 +1,156 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+class RecordHasher:
+    """
+    Hash canónico incremental de una lista de registros.
+    Equivale a sha256(json.dumps(records, sort_keys=True, ensure_ascii=True))
+    sin mantener la lista completa en memoria.
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256(b"[")
+        self._first = True
+        self.count = 0
+
+    def update(self, record: Dict) -> None:
+        """Agregar un registro al hash"""
+        if not self._first:
+            self._hash.update(b", ")
+        self._hash.update(
+            json.dumps(record, sort_keys=True, ensure_ascii=True).encode()
+        )
+        self._first = False
+        self.count += 1
+
+    def hexdigest(self) -> str:
+        """Hash final, sin alterar el estado acumulado"""
+        final = self._hash.copy()
+        final.update(b"]")
+        return final.hexdigest()
+
+
+class StreamingJSONReader:
+    """Tokenizador JSON incremental con buffer acotado"""
+
+    def __init__(self, fh, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Leer el siguiente bloque descartando lo ya consumido"""
+        if self.eof:
+            return False
+        chunk = self.fh.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Siguiente carácter significativo, cadena vacía al final del archivo"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consumir un carácter estructural esperado"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(
+                f"JSON inválido: se esperaba '{char}' y se encontró '{found}'"
+            )
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decodificar el siguiente valor JSON completo"""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise ValueError(f"JSON inválido: {e}")
+            # Un número al final del buffer puede estar truncado
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def iter_array(self) -> Iterator[Any]:
+        """Iterar los elementos de un arreglo uno a uno"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"JSON inválido: separador inesperado '{separator}'")
+
+
+def iter_array_items(
+    file_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Any]:
+    """Itera los elementos de un archivo cuyo contenido es un arreglo JSON"""
+    with open(file_path, "r", encoding="utf-8") as f:
+        reader = StreamingJSONReader(f, chunk_size)
+        yield from reader.iter_array()
+        if reader.peek() != "":
+            raise ValueError("JSON inválido: contenido extra al final")
+
+
+def iter_output_document(
+    file_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE, stream_key: str = "records"
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Itera un documento OutputData sin cargarlo completo.
+    Emite ("record", registro) por cada elemento de `records` y
+    (clave, valor) por cada otro miembro de primer nivel (ej. metadata).
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        reader = StreamingJSONReader(f, chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            reader.pos += 1
+            return
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise ValueError("JSON inválido: se esperaba una clave")
+            reader.expect(":")
+            if key == stream_key:
+                for item in reader.iter_array():
+                    yield "record", item
+            else:
+                yield key, reader.value()
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == "}":
+                break
+            if separator != ",":
+                raise ValueError(f"JSON inválido: separador inesperado '{separator}'")
+        if reader.peek() != "":
+            raise ValueError("JSON inválido: contenido extra al final")
@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+from pipeline import config
+
+logger = logging.getLogger(__name__)
+
+# Filas muestreadas por archivo CSV
+SAMPLE_ROWS = 2000
+# Tamaño de línea supuesto para traducir filas de muestra a bytes leídos
+TYPICAL_LINE_BYTES = 128
+# Un archivo se recorre completo (reservoir) solo si cuesta a lo sumo este
+# múltiplo de los bytes de su muestra; si no, offsets aleatorios
+RESERVOIR_FACTOR = 4
+# Bytes leídos como máximo entre todos los archivos de una ejecución
+READ_BUDGET_BYTES = 256 * 1024 * 1024
+# Líneas consecutivas leídas en cada offset aleatorio
+PROBE_LINES = 16
+# Límite de una línea leída tras un seek (protege de regiones sin saltos de línea)
+MAX_LINE_BYTES = 1024 * 1024
+# Bytes en memoria hasheados para estimar la velocidad del hash de archivos
+HASH_PROBE_BYTES = 8 * 1024 * 1024
+REQUIRED_COLUMNS = ("id", "timestamp", "value", "category")
+
+
+class CsvSample:
+    """Muestra de filas de un CSV y su estimación de filas totales"""
+
+    def __init__(
+        self,
+        header: bytes,
+        lines: List[bytes],
+        estimated_rows: float,
+        method: str,
+        bytes_read: int = 0,
+    ):
+        self.header = header
+        self.lines = lines
+        self.estimated_rows = estimated_rows
+        self.method = method
+        self.bytes_read = bytes_read
+
+    def text(self) -> str:
+        """Cabecera y filas muestreadas como CSV decodificado"""
+        body = b"".join(
+            line if line.endswith(b"\n") else line + b"\n" for line in self.lines
+        )
+        content = self.header + body
+        try:
+            return content.decode("utf-8")
+        except UnicodeDecodeError:
+            return content.decode("latin-1")
+
+
+def reservoir_sample(path: Path, k: int, rng: random.Random) -> CsvSample:
+    """Muestreo reservoir (algoritmo R) en una pasada: conteo de filas exacto"""
+    sample: List[bytes] = []
+    seen = 0
+    with open(path, "rb") as f:
+        header = f.readline()
+        for line in f:
+            if not line.strip():
+                continue
+            seen += 1
+            if len(sample) < k:
+                sample.append(line)
+            else:
+                slot = rng.randrange(seen)
+                if slot < k:
+                    sample[slot] = line
+    return CsvSample(
+        header, sample, float(seen), "reservoir", bytes_read=path.stat().st_size
+    )
+
+
+def seek_sample(path: Path, k: int, rng: random.Random) -> CsvSample:
+    """
+    Muestreo por offsets aleatorios: en cada offset se descarta la línea
+    parcial y se leen PROBE_LINES líneas; las filas totales se estiman con
+    el tamaño medio de las líneas leídas
+    """
+    size = path.stat().st_size
+    lines: List[bytes] = []
+    with open(path, "rb") as f:
+        header = f.readline()
+        data_start = read = f.tell()
+        probes = max(1, math.ceil(k / PROBE_LINES))
+        offsets = sorted(rng.randrange(data_start, size) for _ in range(probes))
+        for offset in offsets:
+            f.seek(offset)
+            partial = f.readline(MAX_LINE_BYTES)
+            read += len(partial)
+            if not partial.endswith(b"\n"):
+                continue
+            for _ in range(PROBE_LINES):
+                line = f.readline(MAX_LINE_BYTES)
+                read += len(line)
+                if not line or len(line) == MAX_LINE_BYTES:
+                    break
+                if line.strip():
+                    lines.append(line)
+        if not lines:
+            # Sin líneas completas en los offsets: muestra acotada del inicio
+            f.seek(data_start)
+            for _ in range(k):
+                line = f.readline(MAX_LINE_BYTES)
+                read += len(line)
+                if not line.endswith(b"\n"):
+                    break
+                lines.append(line)
+    if not lines:
+        return CsvSample(header, [], 0.0, "seek", bytes_read=read)
+    mean_bytes = sum(len(line) for line in lines) / len(lines)
+    return CsvSample(
+        header, lines[:k], (size - data_start) / mean_bytes, "seek", bytes_read=read
+    )
+
+
+def sample_csv(
+    path: Path, k: int, rng: random.Random, read_budget: float = math.inf
+) -> CsvSample:
+    """
+    Muestra de un CSV: reservoir si recorrerlo cuesta poco frente a la
+    muestra y cabe en `read_budget` bytes; si no, offsets aleatorios
+    """
+    size = path.stat().st_size
+    if size <= min(read_budget, RESERVOIR_FACTOR * k * TYPICAL_LINE_BYTES):
+        return reservoir_sample(path, k, rng)
+    return seek_sample(path, k, rng)
+
+
+def hash_rate() -> float:
+    """Bytes por segundo del hash configurado sobre un buffer en memoria"""
+    data = bytes(HASH_PROBE_BYTES)
+    start = time.perf_counter()
+    hashlib.new(config.HASH_ALGORITHM, data).digest()
+    elapsed = time.perf_counter() - start
+    return len(data) / elapsed if elapsed > 0 else float("inf")
+
+
+class _StageProbe:
+    """Tiempo y pico de memoria (tracemalloc) por fase de la muestra"""
+
+    def __init__(self, trace_memory: bool):
+        self.trace_memory = trace_memory
+        self.seconds: Dict[str, float] = {}
+        self.peak_bytes: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = time.perf_counter() - start
+            if self.trace_memory:
+                self.peak_bytes[name] = tracemalloc.get_traced_memory()[1] - baseline
+
+
+class DryRun:
+    """
+    Ejecución de prueba sin artefactos: muestrea filas de cada CSV, las pasa
+    por la validación de InputRecord y la cadena de TransformationPrototype,
+    y extrapola filas, rechazo, tamaño de salida, tiempo y memoria por etapa
+    """
+
+    def __init__(
+        self,
+        input_dir: str | None = None,
+        sample_rows: int | None = None,
+        seed: int = 0,
+        read_budget: int | None = None,
+    ):
+        from pipeline.transformer.main import Transformer
+
+        self.input_dir = Path(input_dir or config.INPUT_DIR)
+        self.sample_rows = max(1, sample_rows or SAMPLE_ROWS)
+        self.rng = random.Random(seed)
+        self.read_budget = read_budget or READ_BUDGET_BYTES
+        self.bytes_read = 0
+        self.hash_bytes_per_second = 0.0
+        self.prototype = Transformer._create_prototype()
+
+    def _process(self, text: str, probe: _StageProbe) -> Dict:
+        """
+        Ingesta, transformación y publicación de una muestra en memoria,
+        incluyendo la serialización que el modo por archivos haría a disco
+        """
+        import pandas as pd
+
+        from pipeline.contracts.adapters import (
+            dump_records,
+            load_json,
+            validate_output_json,
+            validate_records,
+        )
+        from pipeline.contracts.schemas import InputRecord, OutputData
+        from pipeline.contracts.streaming import RecordHasher
+        from pipeline.ingestor.main import CSVDataSource
+
+        result = {"rows": 0, "valid": 0, "output": 0, "record_bytes": 0.0}
+        with probe.phase("ingestor"):
+            df = CSVDataSource.parse(text)
+            result["rows"] = len(df)
+            if not all(col in df.columns for col in REQUIRED_COLUMNS):
+                result["missing_columns"] = True
+                return result
+            valid_records = []
+            for _, row in df.iterrows():
+                try:
+                    valid_records.append(InputRecord(**row.to_dict()).model_dump())
+                except Exception:
+                    continue
+            result["valid"] = len(valid_records)
+            if not valid_records:
+                return result
+            df_valid = pd.DataFrame(valid_records).sort_values("id")
+            intermediate = df_valid.to_json(orient="records", indent=2)
+
+        with probe.phase("transformer"):
+            df_in = pd.DataFrame(load_json(intermediate.encode("utf-8")))
+            df_out = self.prototype.clone().apply(df_in).sort_values("id")
+            records = validate_records(df_out.to_dict(orient="records"))
+            hasher = RecordHasher()
+            for record in dump_records(records, for_hash=True):
+                hasher.update(record)
+            metadata = {
+                "total_records": len(records),
+                "execution_time_seconds": 0.0,
+                "data_hash": hasher.hexdigest(),
+                "generated_at": "2024-01-01T00:00:00",
+            }
+            payload = OutputData(records=records, metadata=metadata).model_dump_json(
+                indent=2
+            )
+            result["output"] = len(records)
+        if len(records) > 1:
+            # Bytes por registro: diferencia contra un documento de un registro
+            single = OutputData(records=records[:1], metadata=metadata)
+            single_bytes = len(single.model_dump_json(indent=2))
+            result["record_bytes"] = (len(payload) - single_bytes) / (len(records) - 1)
+        elif records:
+            result["record_bytes"] = float(len(payload))
+
+        with probe.phase("publisher"):
+            data = payload.encode("utf-8")
+            validate_output_json(data)
+            hashlib.sha256(data).hexdigest()
+        return result
+
+    def _estimate_file(self, csv_file: Path, files_left: int) -> Dict:
+        """
+        Estimación de un CSV a partir de su muestra; el presupuesto de lectura
+        restante se reparte entre los archivos que faltan
+        """
+        size = csv_file.stat().st_size
+        share = max(0, self.read_budget - self.bytes_read) / files_left
+        rows = max(PROBE_LINES, min(self.sample_rows, int(share // TYPICAL_LINE_BYTES)))
+        sample = sample_csv(csv_file, rows, self.rng, share)
+        self.bytes_read += sample.bytes_read
+        estimate = {
+            "file": csv_file.name,
+            "bytes": size,
+            "method": sample.method,
+            "read_bytes": sample.bytes_read,
+            "sampled_rows": len(sample.lines),
+            "estimated_rows": round(sample.estimated_rows),
+        }
+        if not sample.lines:
+            estimate.update({"rejection_rate": 0.0, "estimated_output_records": 0})
+            estimate["seconds"] = {"ingestor": size / self.hash_bytes_per_second}
+            estimate["peak_bytes"] = {}
+            return estimate
+
+        timed = _StageProbe(trace_memory=False)
+        traced = _StageProbe(trace_memory=True)
+        text = sample.text()
+        try:
+            result = self._process(text, timed)
+            owns_tracing = not tracemalloc.is_tracing()
+            if owns_tracing:
+                tracemalloc.start()
+            try:
+                self._process(text, traced)
+            finally:
+                if owns_tracing:
+                    tracemalloc.stop()
+        except Exception as e:
+            logger.error(f"Error procesando la muestra de {csv_file.name}: {e}")
+            result = {"rows": len(sample.lines), "valid": 0, "output": 0}
+            estimate["error"] = str(e)
+
+        scale = sample.estimated_rows / max(1, result["rows"])
+        estimate["rejection_rate"] = round(
+            1 - result["valid"] / max(1, result["rows"]), 4
+        )
+        if result.get("missing_columns"):
+            estimate["error"] = "Columnas requeridas ausentes"
+        estimate["estimated_output_records"] = round(result["output"] * scale)
+        estimate["estimated_output_bytes"] = round(
+            result.get("record_bytes", 0.0) * result["output"] * scale
+        )
+        # El hash recorre el archivo completo: se estima por su velocidad
+        seconds = {name: value * scale for name, value in timed.seconds.items()}
+        seconds["ingestor"] = (
+            seconds.get("ingestor", 0.0) + size / self.hash_bytes_per_second
+        )
+        estimate["seconds"] = seconds
+        estimate["peak_bytes"] = {
+            name: round(value * scale) for name, value in traced.peak_bytes.items()
+        }
+        return estimate
+
+    def _stage_totals(self, files: List[Dict]) -> Dict[str, Dict]:
+        """Tiempo y pico de memoria estimados por etapa"""
+        from pipeline.memory import MemoryBudget
+        from pipeline.publisher.main import STRICT_EXPANSION, VALIDATION_BATCH_SIZE
+
+        budget = MemoryBudget.from_config()
+        stages = {}
+        for stage in ("ingestor", "transformer", "publisher"):
+            seconds = sum(f["seconds"].get(stage, 0.0) for f in files)
+            peaks = [f["peak_bytes"].get(stage, 0) for f in files]
+            if stage == "ingestor":
+                # Un archivo a la vez; con presupuesto se lee por chunks
+                peak = max(peaks, default=0)
+                if budget.enabled:
+                    peak = min(peak, budget.limit)
+            elif stage == "transformer":
+                # La salida completa se acumula antes de escribirse
+                peak = sum(peaks)
+            else:
+                output_bytes = sum(f.get("estimated_output_bytes", 0) for f in files)
+                records = sum(f["estimated_output_records"] for f in files)
+                if config.PUBLISH_VALIDATION == "strict":
+                    peak = output_bytes * STRICT_EXPANSION
+                else:
+                    per_record = sum(peaks) / records if records else 0
+                    peak = round(per_record * min(records, VALIDATION_BATCH_SIZE))
+            stages[stage] = {
+                "wall_seconds": round(seconds, 3),
+                "peak_memory_bytes": int(peak),
+            }
+        return stages
+
+    def run(self) -> Dict:
+        """Estima la ejecución completa sobre los CSV de INPUT_DIR"""
+        start = time.perf_counter()
+        csv_files = sorted(self.input_dir.glob("*.csv"))
+        logger.info(
+            f"Dry-run sobre {len(csv_files)} archivos "
+            f"({self.sample_rows} filas por archivo)"
+        )
+        # La velocidad del hash no depende del archivo: se mide una sola vez
+        self.hash_bytes_per_second = hash_rate()
+        files = [
+            self._estimate_file(csv_file, len(csv_files) - index)
+            for index, csv_file in enumerate(csv_files)
+        ]
+
+        rows = sum(f["estimated_rows"] for f in files)
+        rejected = sum(f["estimated_rows"] * f["rejection_rate"] for f in files)
+        report = {
+            "input_dir": str(self.input_dir),
+            "sample_rows_per_file": self.sample_rows,
+            "files": files,
+            "totals": {
+                "files": len(files),
+                "input_bytes": sum(f["bytes"] for f in files),
+                "read_bytes": self.bytes_read,
+                "estimated_rows": rows,
+                "rejection_rate": round(rejected / rows, 4) if rows else 0.0,
+                "estimated_output_records": sum(
+                    f["estimated_output_records"] for f in files
+                ),
+                "estimated_output_bytes": sum(
+                    f.get("estimated_output_bytes", 0) for f in files
+                ),
+            },
+            "stages": self._stage_totals(files),
+            "dry_run_seconds": round(time.perf_counter() - start, 3),
+        }
+        rate = report["totals"]["rejection_rate"]
+        logger.info(f"Estimación: {rows} filas, rechazo {rate:.2%}")
+        return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
+    parser = argparse.ArgumentParser(
+        description="Estimar una ejecución completa a partir de muestras"
+    )
+    parser.add_argument("--input-dir", default=None, help="Directorio de CSV")
+    parser.add_argument(
+        "--sample-rows",
+        type=int,
+        default=SAMPLE_ROWS,
+        help="Filas muestreadas por archivo",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Semilla del muestreo (reproducible)"
+    )
+    parser.add_argument(
+        "--read-budget",
+        default=str(READ_BUDGET_BYTES),
+        help="Bytes leídos como máximo entre todos los archivos (ej. 256MB)",
+    )
+    args = parser.parse_args()
+
+    from pipeline.memory import parse_size
+
+    report = DryRun(
+        args.input_dir, args.sample_rows, args.seed, parse_size(args.read_budget)
+    ).run()
+    print(json.dumps(report, indent=2))
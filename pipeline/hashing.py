@@ -0,0 +1,144 @@
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Tuple
+
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+PLAIN_SCHEME = "plain"
+TREE_SCHEME = "tree"
+
+# Formato: <esquema>-<algoritmo>-<hex>, ej. tree67108864-blake2b-3f1a...
+# Un hex sin prefijo es un SHA256 plano (formato histórico)
+_DIGEST_PATTERN = re.compile(
+    r"^(?P<scheme>plain|tree(?P<chunk>\d+))"
+    r"-(?P<algorithm>[a-z0-9_]+)-(?P<hex>[0-9a-f]+)$"
+)
+
+
+def _new_hash(algorithm: str):
+    """Crea un objeto hash validando el algoritmo"""
+    if algorithm.startswith("shake_") or algorithm not in hashlib.algorithms_available:
+        raise ValueError(f"Algoritmo de hash no soportado: {algorithm}")
+    return hashlib.new(algorithm)
+
+
+def _hash_range(
+    fd: int, algorithm: str, start: int, length: int, block_size: int
+) -> bytes:
+    """Hash de un rango del archivo con lecturas posicionales (sin compartir offset)"""
+    hasher = _new_hash(algorithm)
+    position = start
+    end = start + length
+    while position < end:
+        block = os.pread(fd, min(block_size, end - position), position)
+        if not block:
+            break
+        hasher.update(block)
+        position += len(block)
+    return hasher.digest()
+
+
+def _hash_plain(file_path: Path, algorithm: str, block_size: int) -> str:
+    """Hash secuencial con un buffer grande reutilizado"""
+    hasher = _new_hash(algorithm)
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            hasher.update(view[:read])
+    return hasher.hexdigest()
+
+
+def _hash_tree(
+    file_path: Path, algorithm: str, chunk_size: int, block_size: int, workers: int
+) -> str:
+    """
+    Hash en árbol de un nivel: cada segmento de `chunk_size` bytes se hashea
+    en paralelo (hashlib libera el GIL) y la raíz es el hash de los digests
+    concatenados en orden.
+    """
+    size = file_path.stat().st_size
+    offsets = range(0, max(size, 1), chunk_size)
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            digests = list(
+                executor.map(
+                    lambda start: _hash_range(
+                        fd, algorithm, start, min(chunk_size, size - start), block_size
+                    ),
+                    offsets,
+                )
+            )
+    finally:
+        os.close(fd)
+    root = _new_hash(algorithm)
+    for digest in digests:
+        root.update(digest)
+    return root.hexdigest()
+
+
+def format_digest(
+    hexdigest: str, algorithm: str = "sha256", scheme: str = PLAIN_SCHEME, chunk_size=0
+) -> str:
+    """Digest almacenable que registra el esquema y el algoritmo usados"""
+    if scheme == PLAIN_SCHEME and algorithm == "sha256":
+        return hexdigest
+    label = PLAIN_SCHEME if scheme == PLAIN_SCHEME else f"{TREE_SCHEME}{chunk_size}"
+    return f"{label}-{algorithm}-{hexdigest}"
+
+
+def parse_digest(digest: str) -> Tuple[str, str, int, str]:
+    """Retorna (esquema, algoritmo, chunk_size, hex) de un digest almacenado"""
+    match = _DIGEST_PATTERN.match(digest)
+    if match is None:
+        return PLAIN_SCHEME, "sha256", 0, digest
+    scheme = TREE_SCHEME if match.group("chunk") else PLAIN_SCHEME
+    chunk_size = int(match.group("chunk") or 0)
+    return scheme, match.group("algorithm"), chunk_size, match.group("hex")
+
+
+def hash_file(
+    file_path: Path,
+    algorithm: str = "sha256",
+    scheme: str = PLAIN_SCHEME,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    workers: Optional[int] = None,
+) -> str:
+    """Calcula el digest almacenable de un archivo según el esquema indicado"""
+    if scheme == PLAIN_SCHEME:
+        hexdigest = _hash_plain(Path(file_path), algorithm, block_size)
+    elif scheme == TREE_SCHEME:
+        hexdigest = _hash_tree(
+            Path(file_path),
+            algorithm,
+            chunk_size,
+            block_size,
+            workers or os.cpu_count() or 1,
+        )
+    else:
+        raise ValueError(f"Esquema de hash no soportado: {scheme}")
+    return format_digest(hexdigest, algorithm, scheme, chunk_size)
+
+
+def rehash_file(file_path: Path, digest: str, workers: Optional[int] = None) -> str:
+    """Digest actual de un archivo con el esquema y algoritmo de `digest`"""
+    scheme, algorithm, chunk_size, _ = parse_digest(digest)
+    if scheme == TREE_SCHEME:
+        return hash_file(
+            file_path, algorithm, scheme, chunk_size=chunk_size, workers=workers
+        )
+    return hash_file(file_path, algorithm, scheme)
+
+
+def verify_file(file_path: Path, digest: str, workers: Optional[int] = None) -> bool:
+    """Recalcula el digest con el esquema registrado y lo compara"""
+    return rehash_file(file_path, digest, workers) == digest
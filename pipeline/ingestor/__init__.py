@@ -1,3 +1,11 @@
-from .main import Ingestor, DataSourceFactory
-
+# Import diferido (PEP 562): `import pipeline.ingestor` no carga pandas ni
+# la configuración hasta que se usa Ingestor o DataSourceFactory
 __all__ = ["Ingestor", "DataSourceFactory"]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        from . import main
+
+        return getattr(main, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
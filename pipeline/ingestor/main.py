@@ -1,19 +1,40 @@
+from __future__ import annotations
+
 import hashlib
+import io
 import json
 import logging
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Optional
-from pipeline.config import LOG_LEVEL, INPUT_DIR, INTERMEDIATE_DIR
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
 
-import pandas as pd
+from pipeline import config, hashing
+from pipeline.contracts.adapters import load_json
+from pipeline.contracts.schemas import SOURCE_COLUMN, InputRecord
+from pipeline.memory import AdaptiveChunker, MemoryBudget
+from pipeline.metrics import MetricsRegistry, StageMetrics
+from pipeline.profiling import Profiler
+from pipeline.tracing import Tracer
 
-from pipeline.contracts.schemas import InputRecord
+if TYPE_CHECKING:
+    import pandas as pd
 
-log_level = LOG_LEVEL
-logging.basicConfig(level=getattr(logging, log_level))
 logger = logging.getLogger(__name__)
 
+# Decimales de los floats en los JSON intermedios (`DataFrame.to_json`)
+JSON_DOUBLE_PRECISION = 10
+
+
+def _merge_dtype(current, dtype):
+    """Tipo de una columna leída completa a partir de los tipos de sus chunks"""
+    from pandas.api.types import is_bool_dtype, is_numeric_dtype, pandas_dtype
+
+    if current is None or current == dtype:
+        return dtype
+    if all(is_numeric_dtype(d) and not is_bool_dtype(d) for d in (current, dtype)):
+        return pandas_dtype("float64")
+    return pandas_dtype("object")
+
 
 # Factory Pattern para CSV
 class DataSourceFactory:
@@ -39,21 +60,101 @@ class CSVDataSource(DataSource):
     """Implementación para archivos CSV con manejo robusto de encoding"""
 
     def read(self, filepath: Path) -> pd.DataFrame:
+        import pandas as pd
+
         try:
             return pd.read_csv(filepath, encoding="utf-8")
         except UnicodeDecodeError:
             return pd.read_csv(filepath, encoding="latin-1")
 
+    def iter_chunks(
+        self,
+        filepath: Path,
+        next_rows: Callable[[], int],
+        encoding: str = "utf-8",
+        dtype: Optional[Dict] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Leer por chunks de tamaño variable (decidido antes de cada lectura).
+        Un byte inválido para `encoding` lanza UnicodeDecodeError a mitad de
+        la lectura.
+        """
+        import pandas as pd
+
+        with pd.read_csv(
+            filepath, encoding=encoding, dtype=dtype, iterator=True
+        ) as reader:
+            while True:
+                try:
+                    yield reader.get_chunk(next_rows())
+                except StopIteration:
+                    return
+
+    def infer_dtypes(
+        self, filepath: Path, next_rows: Callable[[], int], encoding: str = "utf-8"
+    ) -> Dict:
+        """
+        Tipos que inferiría `read` sobre el archivo completo, combinando los
+        de cada chunk sin retenerlos (int y float dan float; otra mezcla, object)
+        """
+        dtypes: Dict = {}
+        for chunk in self.iter_chunks(filepath, next_rows, encoding):
+            for column, dtype in chunk.dtypes.items():
+                dtypes[column] = _merge_dtype(dtypes.get(column), dtype)
+        return dtypes
+
+    @staticmethod
+    def read_text(filepath: Path) -> str:
+        """Contenido decodificado con la misma política de encoding que `read`"""
+        content = filepath.read_bytes()
+        try:
+            return content.decode("utf-8")
+        except UnicodeDecodeError:
+            return content.decode("latin-1")
+
+    @staticmethod
+    def parse(text: str) -> pd.DataFrame:
+        """Parsear un CSV ya decodificado"""
+        import pandas as pd
+
+        return pd.read_csv(io.StringIO(text))
+
 
 class Ingestor:
     """Componente principal de ingesta con idempotencia"""
 
-    def __init__(self, input_dir: str | None = None, output_dir: str | None = None):
-        self.input_dir = Path(input_dir or INPUT_DIR)
-        self.output_dir = Path(output_dir or INTERMEDIATE_DIR)
+    def __init__(
+        self,
+        input_dir: str | None = None,
+        output_dir: str | None = None,
+        small_file_threshold: int | None = None,
+        small_file_batch_size: int | None = None,
+        memory_budget: int | None = None,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self.input_dir = Path(input_dir or config.INPUT_DIR)
+        self.output_dir = Path(output_dir or config.INTERMEDIATE_DIR)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.processed_hashes = self._load_processed_hashes()
+        self.hash_schemes = self._hash_schemes()
         self.factory = DataSourceFactory()
+        self.small_file_threshold = (
+            config.SMALL_FILE_THRESHOLD_BYTES
+            if small_file_threshold is None
+            else small_file_threshold
+        )
+        self.small_file_batch_size = max(
+            1, small_file_batch_size or config.SMALL_FILE_BATCH_SIZE
+        )
+        self.memory_budget = (
+            MemoryBudget.from_config()
+            if memory_budget is None
+            else MemoryBudget(memory_budget)
+        )
+        self.chunker = AdaptiveChunker("ingesta", self.memory_budget)
+        self.metrics = StageMetrics(metrics, "ingestor")
+        self.profiler = Profiler.from_config(self.output_dir)
+        self.tracer = Tracer.from_config(self.output_dir)
 
     def _load_processed_hashes(self) -> set:
         """Cargar hashes de archivos ya procesados"""
@@ -69,13 +170,59 @@ class Ingestor:
         with open(hash_file, "w") as f:
             json.dump(list(self.processed_hashes), f)
 
-    def _calculate_file_hash(self, filepath: Path) -> str:
-        """Calcular hash SHA256 de un archivo"""
-        sha256_hash = hashlib.sha256()
-        with open(filepath, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+    def _hash_schemes(self) -> List[Tuple[str, str, int]]:
+        """
+        Esquemas (esquema, algoritmo, chunk_size) de las claves de idempotencia.
+        Los hashes registrados fijan el esquema: cambiar HASH_SCHEME sobre un
+        registro existente no debe reingestar archivos ya procesados.
+        """
+        configured = (
+            config.HASH_SCHEME,
+            config.HASH_ALGORITHM,
+            config.HASH_CHUNK_SIZE if config.HASH_SCHEME == hashing.TREE_SCHEME else 0,
+        )
+        recorded = sorted(
+            {hashing.parse_digest(digest)[:3] for digest in self.processed_hashes}
+        )
+        if not recorded:
+            return [configured]
+        if configured not in recorded:
+            logger.warning(
+                f"HASH_SCHEME={config.HASH_SCHEME}/{config.HASH_ALGORITHM} no coincide "
+                f"con {self.output_dir / '.processed_hashes.json'}: se mantiene "
+                "el esquema registrado"
+            )
+            return recorded
+        return [configured] + [scheme for scheme in recorded if scheme != configured]
+
+    def _calculate_file_hash(
+        self, filepath: Path, scheme: Optional[Tuple[str, str, int]] = None
+    ) -> str:
+        """Calcular hash de un archivo (por defecto, con el esquema principal)"""
+        name, algorithm, chunk_size = scheme or self.hash_schemes[0]
+        with self.metrics.phase("hash"):
+            digest = hashing.hash_file(
+                filepath,
+                algorithm=algorithm,
+                scheme=name,
+                chunk_size=chunk_size or config.HASH_CHUNK_SIZE,
+                workers=config.HASH_WORKERS or None,
+            )
+        self.metrics.bytes_read(filepath.stat().st_size)
+        return digest
+
+    def _file_key(self, filepath: Path) -> Tuple[str, bool]:
+        """
+        Clave de idempotencia de un archivo y si ya fue procesado. Solo un
+        registro con esquemas mezclados obliga a hashear más de una vez.
+        """
+        key = None
+        for scheme in self.hash_schemes:
+            digest = self._calculate_file_hash(filepath, scheme)
+            if digest in self.processed_hashes:
+                return digest, True
+            key = key or digest
+        return key, False
 
     def _validate_record(self, row: Dict) -> Optional[InputRecord]:
         """Validar una fila usando el schema de Pydantic"""
@@ -85,65 +232,336 @@ class Ingestor:
             logger.warning(f"Registro inválido: {e}")
             return None
 
-    def ingest(self):
-        """Proceso principal de ingesta idempotente"""
-        csv_files = list(self.input_dir.glob("*.csv"))
-        logger.info(f"Encontrados {len(csv_files)} archivos CSV")
+    def _read_valid_frame(self, csv_file: Path) -> Optional[pd.DataFrame]:
+        """Leer, validar y ordenar por id los registros de un CSV"""
+        # Leer datos usando factory
+        source = self.factory.create_source("csv")
+        if not self.memory_budget.enabled:
+            return self._validate_chunks(csv_file, iter([source.read(csv_file)]))
 
-        for csv_file in csv_files:
-            file_hash = self._calculate_file_hash(csv_file)
-
-            # Idempotencia: skip si ya fue procesado
-            if file_hash in self.processed_hashes:
-                logger.info(
-                    f"Archivo {csv_file.name} ya procesado (hash: {file_hash[:8]}...)"
+        # Pasada previa por chunks: detecta el encoding y fija los tipos de una
+        # lectura completa, así cada chunk se parsea igual sin importar su tamaño
+        with self.metrics.phase("parse"):
+            try:
+                encoding = "utf-8"
+                dtypes = source.infer_dtypes(csv_file, self.chunker.rows, encoding)
+            except UnicodeDecodeError:
+                logger.info(f"Archivo {csv_file.name} no es UTF-8, se lee en latin-1")
+                encoding = "latin-1"
+                dtypes = source.infer_dtypes(csv_file, self.chunker.rows, encoding)
+        chunks = source.iter_chunks(csv_file, self.chunker.rows, encoding, dtypes)
+        return self._validate_chunks(csv_file, chunks)
+
+    def _validate_chunks(
+        self, csv_file: Path, chunks: Iterator[pd.DataFrame]
+    ) -> Optional[pd.DataFrame]:
+        """
+        Validar cada chunk con pydantic conservando solo el DataFrame compacto
+        de las filas válidas; las métricas de filas se registran al terminar
+        """
+        import pandas as pd
+
+        required_columns = ["id", "timestamp", "value", "category"]
+        valid_frames = []
+        rows_read = rows_valid = 0
+        while True:
+            with self.metrics.phase("parse"):
+                df = next(chunks, None)
+            if df is None:
+                break
+
+            # Validar esquema básico
+            if not all(col in df.columns for col in required_columns):
+                logger.error(
+                    f"Archivo {csv_file.name} no tiene las columnas requeridas"
                 )
-                continue
+                return None
 
-            try:
-                # Leer datos usando factory
-                source = self.factory.create_source("csv")
-                df = source.read(csv_file)
-
-                # Validar esquema básico
-                required_columns = ["id", "timestamp", "value", "category"]
-                if not all(col in df.columns for col in required_columns):
-                    logger.error(
-                        f"Archivo {csv_file.name} no tiene las columnas requeridas"
-                    )
-                    continue
-
-                # Validar cada registro con pydantic
-                valid_records = []
+            valid_records = []
+            with self.metrics.phase("validate"):
                 for _, row in df.iterrows():
                     record = self._validate_record(row.to_dict())
                     if record:
                         valid_records.append(record.model_dump())
+            rows_read += len(df)
+            rows_valid += len(valid_records)
+            # Durante la validación conviven el chunk, los dicts y los modelos:
+            # se estima ~4x el tamaño del DataFrame leído
+            self.chunker.observe(len(df), int(df.memory_usage(deep=True).sum()) * 4)
+            if valid_records:
+                valid_frames.append(pd.DataFrame(valid_records))
+
+        self.metrics.rows("read", rows_read)
+        self.metrics.rows("valid", rows_valid)
+        self.metrics.rows("rejected", rows_read - rows_valid)
+        if not valid_frames:
+            logger.error(f"Archivo {csv_file.name} no tiene registros válidos")
+            return None
+
+        if len(valid_frames) == 1:
+            df_valid = valid_frames[0]
+        else:
+            df_valid = pd.concat(valid_frames, ignore_index=True)
+        with self.metrics.phase("sort"):
+            return df_valid.sort_values("id")
+
+    def _persist_frame(self, file_hash: str, df_sorted: pd.DataFrame) -> Path:
+        """Guardar en intermediate con el hash del archivo como nombre"""
+        output_file = self.output_dir / f"{file_hash}.json"
+        with self.metrics.phase("write"):
+            df_sorted.to_json(
+                output_file,
+                orient="records",
+                indent=2,
+                double_precision=JSON_DOUBLE_PRECISION,
+            )
+        self.metrics.bytes_written(output_file.stat().st_size)
+        self.metrics.rows("written", len(df_sorted))
+
+        # Marcar como procesado
+        self.processed_hashes.add(file_hash)
+        self._save_processed_hashes()
+        return output_file
 
-                if not valid_records:
-                    logger.error(f"Archivo {csv_file.name} no tiene registros válidos")
-                    continue
+    @staticmethod
+    def _as_persisted(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Floats con la precisión del JSON intermedio: el Transformer recibe los
+        mismos valores (y el mismo `data_hash`) en memoria que desde archivos
+        """
+        for column in df.select_dtypes("float").columns:
+            df[column] = load_json(
+                df[column]
+                .to_json(orient="values", double_precision=JSON_DOUBLE_PRECISION)
+                .encode("utf-8")
+            )
+        return df
+
+    def iter_frames(self, persist: bool = True) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Ingesta idempotente que produce (hash, DataFrame validado) por cada
+        archivo nuevo, a medida que se procesa. Sin `persist` no se escriben
+        artefactos ni se marcan los archivos como procesados.
+        """
+        csv_files = list(self.input_dir.glob("*.csv"))
+        logger.info(f"Encontrados {len(csv_files)} archivos CSV")
+        small_files, csv_files = self._partition_small_files(csv_files)
 
-                # Guardar en intermediate con el hash del archivo como nombre
-                output_file = self.output_dir / f"{file_hash}.json"
+        for csv_file in csv_files:
+            # El span se cierra antes de entregar el DataFrame al consumidor
+            with self.tracer.span(
+                "ingestor.file", **{"file.name": csv_file.name}
+            ) as span:
+                result = self._ingest_file(csv_file, persist, span)
+            if result is not None:
+                yield result[0], self._as_persisted(result[1])
+
+        for start in range(0, len(small_files), self.small_file_batch_size):
+            batch = small_files[start : start + self.small_file_batch_size]
+            with self.tracer.span(
+                "ingestor.segment", **{"segment.files": len(batch)}
+            ) as span, self.profiler.capture(
+                f"ingestor_segment_{start}", self.profiler.sample_file()
+            ):
+                segment = self._ingest_small_batch(batch, persist)
+                if segment is not None:
+                    span.set_attribute("segment.name", segment[0])
+                    span.set_attribute("rows.valid", len(segment[1]))
+            if segment is not None:
+                yield segment[0], self._as_persisted(segment[1])
 
-                # Convertir a JSON manteniendo orden
-                df_valid = pd.DataFrame(valid_records)
-                df_sorted = df_valid.sort_values("id")
-                df_sorted.to_json(output_file, orient="records", indent=2)
+        logger.info(f"Ingesta completa. Total procesados: {len(self.processed_hashes)}")
 
-                # Marcar como procesado
-                self.processed_hashes.add(file_hash)
-                self._save_processed_hashes()
+    def _ingest_file(
+        self, csv_file: Path, persist: bool, span
+    ) -> Optional[Tuple[str, pd.DataFrame]]:
+        """Hash, idempotencia, validación y persistencia de un CSV"""
+        file_hash, processed = self._file_key(csv_file)
+        span.set_attribute("file.hash", file_hash)
+
+        # Idempotencia: skip si ya fue procesado
+        if processed:
+            logger.info(
+                f"Archivo {csv_file.name} ya procesado (hash: {file_hash[:8]}...)"
+            )
+            self.metrics.files("skipped")
+            span.set_attribute("file.status", "skipped")
+            return None
 
+        try:
+            with self.profiler.capture(
+                f"ingestor_{csv_file.name}", self.profiler.sample_file()
+            ):
+                df_sorted = self._read_valid_frame(csv_file)
+                if df_sorted is not None and persist:
+                    output_file = self._persist_frame(file_hash, df_sorted)
+            if df_sorted is None:
+                self.metrics.files("rejected")
+                span.set_attribute("file.status", "rejected")
+                return None
+
+            if persist:
                 logger.info(f"Procesado: {csv_file.name} -> {output_file.name}")
+            else:
+                logger.info(f"Procesado en memoria: {csv_file.name}")
+
+        except Exception as e:
+            logger.error(f"Error procesando {csv_file.name}: {str(e)}")
+            self.metrics.files("rejected")
+            span.set_attribute("file.status", "rejected")
+            return None
+
+        self.metrics.files("processed")
+        span.set_attribute("file.status", "processed")
+        span.set_attribute("rows.valid", len(df_sorted))
+        return file_hash, df_sorted
 
+    def _partition_small_files(self, csv_files: List[Path]) -> Tuple[List, List]:
+        """Separar los CSV pequeños (a coalescer) del resto"""
+        if self.small_file_threshold <= 0:
+            return [], csv_files
+        small, regular = [], []
+        for csv_file in csv_files:
+            if csv_file.stat().st_size < self.small_file_threshold:
+                small.append(csv_file)
+            else:
+                regular.append(csv_file)
+        if small:
+            logger.info(f"{len(small)} archivos pequeños se procesarán en segmentos")
+        return sorted(small), regular
+
+    def _read_small_batch(self, batch: List[Path]) -> List[Tuple[str, str, str]]:
+        """Hash, cabecera y cuerpo de los archivos nuevos de un lote"""
+        entries = []
+        seen = set()
+        for csv_file in batch:
+            file_hash, processed = self._file_key(csv_file)
+            if processed or file_hash in seen:
+                logger.debug(f"Archivo {csv_file.name} ya procesado")
+                self.metrics.files("skipped")
+                continue
+            seen.add(file_hash)
+            try:
+                text = CSVDataSource.read_text(csv_file)
             except Exception as e:
                 logger.error(f"Error procesando {csv_file.name}: {str(e)}")
+                self.metrics.files("rejected")
+                continue
+            header, _, body = text.lstrip("\ufeff").partition("\n")
+            header = header.rstrip("\r")
+            required_columns = ["id", "timestamp", "value", "category"]
+            if not all(col in header.split(",") for col in required_columns):
+                logger.error(
+                    f"Archivo {csv_file.name} no tiene las columnas requeridas"
+                )
+                self.metrics.files("rejected")
+                continue
+            entries.append((file_hash, header, body))
+        return entries
+
+    def _parse_small_batch(self, entries: List[Tuple[str, str, str]]) -> List[Dict]:
+        """
+        Filas del lote con el hash de su archivo de origen en SOURCE_COLUMN.
+        Cada archivo se parsea por separado: la inferencia de tipos es la
+        misma que en la ruta individual y no depende de los otros archivos.
+        """
+        rows = []
+        for file_hash, header, body in entries:
+            for row in CSVDataSource.parse(f"{header}\n{body}").to_dict("records"):
+                row[SOURCE_COLUMN] = file_hash
+                rows.append(row)
+        return rows
+
+    def _ingest_small_batch(
+        self, batch: List[Path], persist: bool
+    ) -> Optional[Tuple[str, pd.DataFrame]]:
+        """
+        Coalescer un lote de CSV pequeños en un único segmento intermedio,
+        manteniendo la idempotencia por hash de archivo de origen
+        """
+        import pandas as pd
+
+        entries = self._read_small_batch(batch)
+        if not entries:
+            return None
 
-        logger.info(f"Ingesta completa. Total procesados: {len(self.processed_hashes)}")
+        try:
+            with self.metrics.phase("parse"):
+                rows = self._parse_small_batch(entries)
+            valid_records = []
+            with self.metrics.phase("validate"):
+                for row in rows:
+                    source_hash = row.pop(SOURCE_COLUMN)
+                    record = self._validate_record(row)
+                    if record:
+                        valid_records.append(
+                            {SOURCE_COLUMN: source_hash, **record.model_dump()}
+                        )
+        except Exception as e:
+            logger.error(f"Error procesando lote de {len(batch)} archivos: {str(e)}")
+            self.metrics.files("rejected", len(entries))
+            return None
+
+        self.metrics.rows("read", len(rows))
+        self.metrics.rows("valid", len(valid_records))
+        self.metrics.rows("rejected", len(rows) - len(valid_records))
+        if not valid_records:
+            logger.error(f"Lote de {len(batch)} archivos sin registros válidos")
+            self.metrics.files("rejected", len(entries))
+            return None
+
+        # Cada archivo de origen ordenado por id, igual que en la ruta individual
+        df_valid = pd.DataFrame(valid_records)
+        with self.metrics.phase("sort"):
+            df_segment = pd.concat(
+                [
+                    group.sort_values("id")
+                    for _, group in df_valid.groupby(SOURCE_COLUMN, sort=True)
+                ]
+            )
+        sources = sorted(df_segment[SOURCE_COLUMN].unique())
+        self.metrics.files("processed", len(sources))
+        self.metrics.files("rejected", len(entries) - len(sources))
+        segment_name = (
+            "segment_" + hashlib.sha256("\n".join(sources).encode()).hexdigest()
+        )
+
+        if persist:
+            output_file = self.output_dir / f"{segment_name}.json"
+            with self.metrics.phase("write"):
+                df_segment.to_json(
+                    output_file,
+                    orient="records",
+                    indent=2,
+                    double_precision=JSON_DOUBLE_PRECISION,
+                )
+            self.metrics.bytes_written(output_file.stat().st_size)
+            self.metrics.rows("written", len(df_segment))
+            self.processed_hashes.update(sources)
+            self._save_processed_hashes()
+            logger.info(f"Segmento: {len(sources)} archivos -> {output_file.name}")
+        else:
+            logger.info(f"Segmento en memoria: {len(sources)} archivos")
+        return segment_name, df_segment
+
+    def ingest_frames(self, persist: bool = True) -> Dict[str, pd.DataFrame]:
+        """DataFrames validados de los archivos nuevos, indexados por hash"""
+        return dict(self.iter_frames(persist=persist))
+
+    def ingest(self):
+        """Proceso principal de ingesta idempotente"""
+        self.metrics.start()
+        # Consumir sin retener los DataFrames: cada archivo se libera al persistirse
+        with self.tracer.span(
+            "ingestor.ingest", **{"input.dir": str(self.input_dir)}
+        ), self.profiler.capture("ingestor", self.profiler.sample_run()):
+            for _ in self.iter_frames(persist=True):
+                pass
+        self.metrics.finish()
+        self.metrics.export(self.output_dir)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
     ingestor = Ingestor()
     ingestor.ingest()
@@ -0,0 +1,129 @@
+import logging
+import os
+import re
+import sys
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Fracción del presupuesto a partir de la cual se considera que hay presión
+HIGH_WATERMARK = 0.9
+# Holgura mínima garantizada (fracción del presupuesto) para seguir avanzando
+MIN_HEADROOM_FRACTION = 1 / 16
+
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?i?b?)?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+
+def parse_size(value: str) -> int:
+    """Interpreta tamaños como `512MB`, `2g` o `1048576` (0 o vacío = sin límite)"""
+    if not value or not value.strip():
+        return 0
+    match = _SIZE_PATTERN.match(value)
+    if match is None:
+        raise ValueError(f"Tamaño de memoria inválido: {value}")
+    unit = (match.group(2) or "").lower()[:1]
+    return int(float(match.group(1)) * _SIZE_UNITS[unit])
+
+
+def current_rss() -> Optional[int]:
+    """RSS actual del proceso en bytes (None si la plataforma no lo expone)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        # ru_maxrss es el pico (KiB en Linux, bytes en macOS): cota superior
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def estimate_record_bytes(record: dict) -> int:
+    """Tamaño aproximado en memoria de un registro como diccionario"""
+    return sys.getsizeof(record) + sum(
+        sys.getsizeof(key) + sys.getsizeof(value) for key, value in record.items()
+    )
+
+
+class MemoryBudget:
+    """Presupuesto de memoria del proceso (MEMORY_BUDGET); 0 = sin límite"""
+
+    def __init__(self, limit_bytes: int = 0):
+        self.limit = max(0, int(limit_bytes))
+
+    @classmethod
+    def from_config(cls) -> "MemoryBudget":
+        from pipeline import config
+
+        return cls(config.MEMORY_BUDGET)
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    def headroom(self) -> int:
+        """Bytes disponibles bajo el presupuesto, con una holgura mínima"""
+        if not self.enabled:
+            return sys.maxsize
+        minimum = int(self.limit * MIN_HEADROOM_FRACTION)
+        rss = current_rss()
+        if rss is None:
+            return self.limit
+        return max(self.limit - rss, minimum)
+
+    def under_pressure(self) -> bool:
+        """True si el RSS supera la marca alta del presupuesto"""
+        if not self.enabled:
+            return False
+        rss = current_rss()
+        return rss is not None and rss > self.limit * HIGH_WATERMARK
+
+
+class AdaptiveChunker:
+    """
+    Tamaño de chunk (en filas) derivado del presupuesto: se ajusta con los
+    bytes por fila observados y la holgura de RSS, y registra los cambios.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        budget: MemoryBudget,
+        share: float = 0.25,
+        min_rows: int = 1_000,
+        max_rows: int = 1_000_000,
+        initial_row_bytes: int = 1_024,
+    ):
+        self.name = name
+        self.budget = budget
+        self.share = share
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.row_bytes = float(initial_row_bytes)
+        self._last_logged = 0
+
+    def observe(self, rows: int, nbytes: int) -> None:
+        """Actualiza la estimación de bytes por fila (media exponencial)"""
+        if rows > 0 and nbytes > 0:
+            self.row_bytes = 0.5 * self.row_bytes + 0.5 * (nbytes / rows)
+
+    def rows(self) -> int:
+        """Filas del próximo chunk según la holgura actual"""
+        if not self.budget.enabled:
+            return self.max_rows
+        target = int(self.budget.headroom() * self.share / max(self.row_bytes, 1.0))
+        rows = max(self.min_rows, min(self.max_rows, target))
+        last = self._last_logged
+        if not last or rows >= 2 * last or rows * 2 <= last:
+            logger.info(
+                f"Chunk de {self.name}: {rows} filas "
+                f"(~{int(self.row_bytes)} B/fila, presupuesto {self.budget.limit} B)"
+            )
+            self._last_logged = rows
+        return rows
@@ -0,0 +1,274 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from pipeline.memory import current_rss
+
+# Buckets (segundos) de los histogramas de duración por fase
+DURATION_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+PHASE_DURATION = "pipeline_phase_duration_seconds"
+
+DESCRIPTIONS = {
+    "pipeline_files_total": ("counter", "Archivos por etapa y estado"),
+    "pipeline_rows_total": ("counter", "Filas por etapa y estado"),
+    "pipeline_bytes_read_total": ("counter", "Bytes leídos por etapa"),
+    "pipeline_bytes_written_total": ("counter", "Bytes escritos por etapa"),
+    PHASE_DURATION: ("histogram", "Duración de cada fase (hash, parse, validate...)"),
+    "pipeline_run_duration_seconds": ("gauge", "Duración total de la ejecución"),
+    "pipeline_peak_rss_bytes": ("gauge", "Pico de RSS observado del proceso"),
+    "pipeline_last_run_timestamp_seconds": ("gauge", "Fin de la última ejecución"),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+class _Histogram:
+    """Histograma acumulativo con suma, conteo y máximo"""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+
+
+class MetricsRegistry:
+    """Registro de métricas de una ejecución (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            series.setdefault(key, _Histogram()).observe(value)
+
+    def render_prometheus(self) -> str:
+        """Formato de texto de Prometheus (textfile collector)"""
+        lines = []
+        with self._lock:
+            families = [
+                *((n, "counter", s) for n, s in sorted(self.counters.items())),
+                *((n, "gauge", s) for n, s in sorted(self.gauges.items())),
+                *((n, "histogram", s) for n, s in sorted(self.histograms.items())),
+            ]
+            for name, metric_type, series in families:
+                help_text = DESCRIPTIONS.get(name, (metric_type, name))[1]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for key in sorted(series):
+                    value = series[key]
+                    if metric_type != "histogram":
+                        lines.append(f"{name}{_format_labels(key)} {value:g}")
+                        continue
+                    for bound, count in zip(value.buckets, value.bucket_counts):
+                        labels = _format_labels(key, ("le", f"{bound:g}"))
+                        lines.append(f"{name}_bucket{labels} {count}")
+                    labels = _format_labels(key, ("le", "+Inf"))
+                    lines.append(f"{name}_bucket{labels} {value.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {value.sum:g}")
+                    lines.append(f"{name}_count{_format_labels(key)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_report(self) -> dict:
+        """Reporte JSON por etapa, con las fases ordenadas por tiempo total"""
+        stages: Dict[str, dict] = {}
+
+        def stage_entry(key: LabelKey) -> Tuple[dict, Dict[str, str]]:
+            labels = dict(key)
+            stage = labels.pop("stage", "")
+            entry = stages.setdefault(
+                stage, {"counters": {}, "gauges": {}, "phases": {}}
+            )
+            return entry, labels
+
+        def series_name(name: str, labels: Dict[str, str]) -> str:
+            suffix = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+            return f"{name}{{{suffix}}}" if suffix else name
+
+        with self._lock:
+            for name, series in self.counters.items():
+                for key, value in series.items():
+                    entry, labels = stage_entry(key)
+                    entry["counters"][series_name(name, labels)] = value
+            for name, series in self.gauges.items():
+                for key, value in series.items():
+                    entry, labels = stage_entry(key)
+                    entry["gauges"][series_name(name, labels)] = value
+            for key, histogram in self.histograms.get(PHASE_DURATION, {}).items():
+                entry, labels = stage_entry(key)
+                entry["phases"][labels.get("phase", "")] = {
+                    "count": histogram.count,
+                    "total_seconds": round(histogram.sum, 6),
+                    "max_seconds": round(histogram.max, 6),
+                }
+
+        for entry in stages.values():
+            entry["phases"] = dict(
+                sorted(
+                    entry["phases"].items(),
+                    key=lambda item: item[1]["total_seconds"],
+                    reverse=True,
+                )
+            )
+        return {"generated_at": datetime.now().isoformat(), "stages": stages}
+
+    def write(self, directory: Path, run_name: str) -> Tuple[Path, Path]:
+        """Escribe `<run>.prom` y `<run>_report.json` de forma atómica"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        prom_path = directory / f"{run_name}.prom"
+        report_path = directory / f"{run_name}_report.json"
+        for path, content in (
+            (prom_path, self.render_prometheus()),
+            (report_path, json.dumps(self.to_report(), indent=2)),
+        ):
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, "w") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return prom_path, report_path
+
+
+class StageMetrics:
+    """Vista del registro con la etiqueta `stage` fija"""
+
+    def __init__(self, registry: Optional[MetricsRegistry], stage: str):
+        # Un registro compartido (runner) lo exporta quien lo creó
+        self.owns_registry = registry is None
+        self.registry = registry or MetricsRegistry()
+        self.stage = stage
+        self.started = time.perf_counter()
+
+    def start(self) -> None:
+        """Marca el inicio de la ejecución de la etapa"""
+        self.started = time.perf_counter()
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        self.registry.inc(name, value, stage=self.stage, **labels)
+
+    def files(self, status: str, count: int = 1) -> None:
+        self.inc("pipeline_files_total", count, status=status)
+
+    def rows(self, status: str, count: int) -> None:
+        self.inc("pipeline_rows_total", count, status=status)
+
+    def bytes_read(self, count: int) -> None:
+        self.inc("pipeline_bytes_read_total", count)
+
+    def bytes_written(self, count: int) -> None:
+        self.inc("pipeline_bytes_written_total", count)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Mide la duración de una fase en el histograma de la etapa"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registry.observe(
+                PHASE_DURATION,
+                time.perf_counter() - start,
+                stage=self.stage,
+                phase=name,
+            )
+
+    def finish(self) -> None:
+        """Registra duración total, pico de RSS y marca de tiempo de la etapa"""
+        self.registry.set(
+            "pipeline_run_duration_seconds",
+            time.perf_counter() - self.started,
+            stage=self.stage,
+        )
+        rss = current_rss()
+        if rss is not None:
+            self.registry.set(
+                "pipeline_peak_rss_bytes", _peak_rss(rss), stage=self.stage
+            )
+        self.registry.set(
+            "pipeline_last_run_timestamp_seconds", time.time(), stage=self.stage
+        )
+
+    def export(self, output_dir: Path) -> None:
+        """Exporta el registro propio de la etapa con su nombre"""
+        if self.owns_registry:
+            export_metrics(self.registry, self.stage, output_dir)
+
+
+def _peak_rss(fallback: int) -> int:
+    """Pico de RSS del proceso (ru_maxrss), o el RSS actual si no está disponible"""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max(peak if sys.platform == "darwin" else peak * 1024, fallback)
+    except (ImportError, OSError):
+        return fallback
+
+
+def export_metrics(registry: MetricsRegistry, run_name: str, output_dir: Path):
+    """Escribe las métricas si METRICS_ENABLED (en METRICS_DIR u output_dir/metrics)"""
+    from pipeline import config
+
+    if not config.METRICS_ENABLED:
+        return None
+    directory = Path(config.METRICS_DIR) if config.METRICS_DIR else None
+    return registry.write(directory or Path(output_dir) / "metrics", run_name)
@@ -0,0 +1,215 @@
+import itertools
+import logging
+import random
+import re
+import threading
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cpu", "memory")
+PROFILES_DIRNAME = "profiles"
+
+# Desde Python 3.12 cProfile usa sys.monitoring, que admite un solo profiler
+# activo por intérprete: las capturas CPU tienen un único hilo dueño por
+# proceso y las de otros hilos se omiten mientras ese dueño exista
+_cpu_lock = threading.Lock()
+_cpu_owner: Optional[int] = None
+_cpu_depth = 0
+
+
+def _claim_cpu() -> bool:
+    """Reserva cProfile para el hilo actual (reentrante dentro del hilo)"""
+    global _cpu_owner, _cpu_depth
+    with _cpu_lock:
+        if _cpu_owner not in (None, threading.get_ident()):
+            return False
+        _cpu_owner = threading.get_ident()
+        _cpu_depth += 1
+        return True
+
+
+def _release_cpu() -> None:
+    global _cpu_owner, _cpu_depth
+    with _cpu_lock:
+        _cpu_depth -= 1
+        if _cpu_depth == 0:
+            _cpu_owner = None
+
+
+def _safe_name(name: str) -> str:
+    """Nombre de captura apto para archivo"""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "capture"
+
+
+class Profiler:
+    """
+    Capturas opt-in con cProfile (`cpu`) y/o tracemalloc (`memory`).
+
+    Las capturas anidadas pausan la captura cProfile externa mientras dura la
+    interna, así cada `.prof` contiene solo su propio tiempo. cProfile tiene
+    un solo hilo dueño por proceso: las capturas CPU de otros hilos
+    concurrentes se omiten (con un log). Sin modos activos `capture` retorna
+    un contexto vacío.
+    """
+
+    def __init__(
+        self,
+        modes: Optional[List[str]] = None,
+        output_dir: Optional[Path] = None,
+        sample_rate: int = 1,
+        top_n: int = 25,
+    ):
+        modes = [mode for mode in modes or [] if mode]
+        unknown = set(modes) - set(PROFILE_MODES)
+        if unknown:
+            raise ValueError(f"Modo de profiling no soportado: {sorted(unknown)}")
+        self.cpu = "cpu" in modes
+        self.memory = "memory" in modes
+        self.output_dir = Path(output_dir or PROFILES_DIRNAME)
+        self.sample_rate = max(1, sample_rate)
+        self.top_n = top_n
+        self._sequence = itertools.count()
+        self._files_seen = itertools.count()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._tracing_depth = 0
+        self._owns_tracing = False
+
+    @classmethod
+    def from_config(cls, output_dir: Path) -> "Profiler":
+        """Profiler según PROFILE, PROFILE_DIR, PROFILE_SAMPLE_RATE y PROFILE_TOP_N"""
+        from pipeline import config
+
+        modes = config.PROFILE
+        if not modes:
+            return cls()
+        directory = Path(config.PROFILE_DIR) if config.PROFILE_DIR else None
+        return cls(
+            modes,
+            directory or Path(output_dir) / PROFILES_DIRNAME,
+            sample_rate=config.PROFILE_SAMPLE_RATE,
+            top_n=config.PROFILE_TOP_N,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.cpu or self.memory
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def active(self) -> bool:
+        """Hay una captura en curso en este hilo"""
+        return self.enabled and bool(self._stack())
+
+    def sample_file(self) -> bool:
+        """Uno de cada `sample_rate` archivos (determinista por orden de llegada)"""
+        if not self.enabled:
+            return False
+        return next(self._files_seen) % self.sample_rate == 0
+
+    def sample_run(self) -> bool:
+        """Capturas de etapa completa con probabilidad 1/`sample_rate`"""
+        if not self.enabled:
+            return False
+        return self.sample_rate == 1 or random.randrange(self.sample_rate) == 0
+
+    def capture(self, name: str, sampled: bool = True):
+        """Contexto de captura; vacío si está deshabilitado o no muestreado"""
+        if not self.enabled or not sampled:
+            return nullcontext()
+        return self._capture(name)
+
+    @contextmanager
+    def _capture(self, name: str):
+        stack = self._stack()
+        label = f"{next(self._sequence):04d}_{_safe_name(name)}"
+        profile = self._new_profile(label) if self.cpu else None
+        snapshot = None
+        try:
+            snapshot = self._start_tracing() if self.memory else None
+            # Un solo cProfile activo a la vez: pausar la captura externa
+            if stack and stack[-1] is not None:
+                stack[-1].disable()
+            stack.append(profile)
+            try:
+                if profile is not None:
+                    profile = self._enable(profile, label, stack)
+                yield
+            finally:
+                if profile is not None:
+                    profile.disable()
+                stack.pop()
+                if stack and stack[-1] is not None:
+                    stack[-1].enable()
+        finally:
+            if profile is not None:
+                _release_cpu()
+            self._write(label, profile, snapshot)
+
+    def _new_profile(self, label: str):
+        import cProfile
+
+        if not _claim_cpu():
+            logger.info(f"Captura CPU {label} omitida: otro hilo está perfilando")
+            return None
+        return cProfile.Profile()
+
+    def _enable(self, profile, label: str, stack: list):
+        """Activa el perfil; None si otra herramienta ya está perfilando"""
+        try:
+            profile.enable()
+        except ValueError as e:
+            logger.warning(f"Captura CPU {label} omitida: {e}")
+            _release_cpu()
+            stack[-1] = None
+            return None
+        return profile
+
+    def _start_tracing(self):
+        import tracemalloc
+
+        with self._lock:
+            if self._tracing_depth == 0:
+                # No detener un tracemalloc iniciado por fuera del profiler
+                self._owns_tracing = not tracemalloc.is_tracing()
+                if self._owns_tracing:
+                    tracemalloc.start()
+            self._tracing_depth += 1
+        return tracemalloc.take_snapshot()
+
+    def _stop_tracing(self) -> tuple:
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            self._tracing_depth -= 1
+            if self._tracing_depth == 0 and self._owns_tracing:
+                tracemalloc.stop()
+        return snapshot, current, peak
+
+    def _write(self, label: str, profile, start_snapshot) -> None:
+        """Escribe `<label>.prof` y/o `<label>.alloc.txt`"""
+        end = self._stop_tracing() if start_snapshot is not None else None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if profile is not None:
+            prof_path = self.output_dir / f"{label}.prof"
+            profile.dump_stats(str(prof_path))
+            logger.info(f"Perfil CPU: {prof_path}")
+        if end is not None:
+            snapshot, current, peak = end
+            stats = snapshot.compare_to(start_snapshot, "lineno")
+            lines = [
+                f"# {label}: actual={current} B pico={peak} B",
+                f"# Top {self.top_n} asignaciones (diferencia durante la captura)",
+            ]
+            lines.extend(str(stat) for stat in stats[: self.top_n])
+            alloc_path = self.output_dir / f"{label}.alloc.txt"
+            alloc_path.write_text("\n".join(lines) + "\n")
+            logger.info(f"Perfil de memoria: {alloc_path}")
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+from pipeline.contracts.streaming import iter_output_document
+
+logger = logging.getLogger(__name__)
+
+IGNORED_FIELDS = ("processed_at",)
+
+
+class DeltaManifest:
+    """Resumen de un delta entre dos versiones publicadas"""
+
+    def __init__(
+        self,
+        base_version: str,
+        file: str,
+        inserted: int,
+        deleted: int,
+        updated: int,
+        sha256: str,
+    ):
+        self.base_version = base_version
+        self.file = file
+        self.inserted = inserted
+        self.deleted = deleted
+        self.updated = updated
+        self.sha256 = sha256
+
+    def to_dict(self):
+        """Convertir a diccionario"""
+        return {
+            "base_version": self.base_version,
+            "file": self.file,
+            "inserted": self.inserted,
+            "deleted": self.deleted,
+            "updated": self.updated,
+            "sha256": self.sha256,
+        }
+
+
+def delta_filename(version: str) -> str:
+    """Nombre del archivo delta de una versión"""
+    return f"delta_{version}.jsonl"
+
+
+def _iter_sorted_records(file_path: Path) -> Iterator[Dict]:
+    """Registros de un archivo publicado, verificando el orden por id"""
+    last_id = None
+    for key, value in iter_output_document(file_path):
+        if key != "record":
+            continue
+        if last_id is not None and value["id"] < last_id:
+            raise ValueError(f"Registros no ordenados por id en {file_path.name}")
+        last_id = value["id"]
+        yield value
+
+
+def _comparable(record: Dict) -> Dict:
+    """Registro sin los campos que cambian en cada ejecución"""
+    return {k: v for k, v in record.items() if k not in IGNORED_FIELDS}
+
+
+def _changed_fields(old: Dict, new: Dict) -> List[str]:
+    """Campos cuyo valor difiere entre dos registros"""
+    keys = sorted(set(old) | set(new))
+    return [k for k in keys if old.get(k) != new.get(k)]
+
+
+def _merge(previous: Iterator[Dict], current: Iterator[Dict]) -> Iterator[Dict]:
+    """Merge lineal de dos secuencias ordenadas por id"""
+    old = next(previous, None)
+    new = next(current, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old["id"] < new["id"]):
+            yield {"op": "delete", "id": old["id"]}
+            old = next(previous, None)
+        elif old is None or new["id"] < old["id"]:
+            yield {"op": "insert", "id": new["id"], "record": new}
+            new = next(current, None)
+        else:
+            changed = _changed_fields(_comparable(old), _comparable(new))
+            if changed:
+                yield {
+                    "op": "update",
+                    "id": new["id"],
+                    "changed_fields": changed,
+                    "record": new,
+                }
+            old = next(previous, None)
+            new = next(current, None)
+
+
+def compute_delta(
+    previous_file: Path,
+    current_file: Path,
+    delta_path: Path,
+    base_version: str,
+) -> DeltaManifest:
+    """
+    Escribe en `delta_path` las inserciones, eliminaciones y actualizaciones
+    entre dos archivos publicados ordenados por id (JSON Lines, atómico).
+    """
+    counts = {"insert": 0, "delete": 0, "update": 0}
+    sha256_hash = hashlib.sha256()
+    tmp_path = delta_path.with_name(delta_path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            for change in _merge(
+                _iter_sorted_records(previous_file),
+                _iter_sorted_records(current_file),
+            ):
+                line = (json.dumps(change, sort_keys=True) + "\n").encode("utf-8")
+                f.write(line)
+                sha256_hash.update(line)
+                counts[change["op"]] += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, delta_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    logger.info(
+        f"Delta contra {base_version}: {counts['insert']} inserciones, "
+        f"{counts['delete']} eliminaciones, {counts['update']} actualizaciones"
+    )
+    return DeltaManifest(
+        base_version=base_version,
+        file=delta_path.name,
+        inserted=counts["insert"],
+        deleted=counts["delete"],
+        updated=counts["update"],
+        sha256=sha256_hash.hexdigest(),
+    )
+
+
+def iter_delta(delta_path: Path) -> Iterator[Dict]:
+    """Itera los cambios de un archivo delta"""
+    with open(delta_path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def apply_delta(base_records: Iterable[Dict], delta_path: Path) -> List[Dict]:
+    """Aplica un delta a los registros de la versión base (ordenados por id)"""
+    records = {record["id"]: record for record in base_records}
+    for change in iter_delta(delta_path):
+        if change["op"] == "delete":
+            records.pop(change["id"], None)
+        else:
+            records[change["id"]] = change["record"]
+    return [records[record_id] for record_id in sorted(records)]
@@ -0,0 +1,387 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import struct
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Columnas de TransformedRecord y su tipo en el layout columnar
+COLUMNS = [
+    ("id", "int64"),
+    ("timestamp", "string"),
+    ("original_value", "float64"),
+    ("normalized_value", "float64"),
+    ("category", "string"),
+    ("processed_at", "string"),
+]
+COLUMNAR_MAGIC = b"PLCOL001"
+
+# Layout de ancho fijo: columnas (nombre, typecode de `array`) ordenadas por id
+FIXED_COLUMNS = [
+    ("id", "q"),
+    ("timestamp", "q"),
+    ("timestamp_offset", "i"),
+    ("original_value", "d"),
+    ("normalized_value", "d"),
+    ("category", "I"),
+    ("processed_at", "q"),
+]
+# Columnas de timestamp que conservan su texto original si difiere del canónico
+FIXED_TIMESTAMPS = ["timestamp", "processed_at"]
+FIXED_MAGIC = b"PLFIX002"
+# Offset (segundos) que marca un timestamp sin zona horaria
+NAIVE_OFFSET = -(2**31)
+EPOCH = datetime(1970, 1, 1)
+EPOCH_UTC = EPOCH.replace(tzinfo=timezone.utc)
+
+
+class _HashingWriter(io.RawIOBase):
+    """Envoltorio de escritura que calcula SHA256 y tamaño al vuelo"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.raw.write(data)
+
+
+@contextmanager
+def atomic_output(target_path: Path):
+    """Escritura atómica (tmp + fsync + rename) que expone hash y tamaño"""
+    tmp_path = target_path.with_name(target_path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            writer = _HashingWriter(f)
+            yield writer
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+class ExportResult:
+    """Resultado de una exportación"""
+
+    def __init__(self, format: str, file: str, sha256: str, size: int):
+        self.format = format
+        self.file = file
+        self.sha256 = sha256
+        self.size = size
+
+    def to_dict(self):
+        """Convertir a diccionario"""
+        return {
+            "format": self.format,
+            "file": self.file,
+            "sha256": self.sha256,
+            "size": self.size,
+        }
+
+
+class Exporter(ABC):
+    """Interfaz abstracta para formatos de exportación"""
+
+    format: str = ""
+    extension: str = ""
+
+    def export(self, records: List[Dict], target_dir: Path) -> ExportResult:
+        """Exporta los registros de forma atómica dentro de `target_dir`"""
+        target = target_dir / f"data.{self.extension}"
+        with atomic_output(target) as writer:
+            self.write(records, writer)
+        return ExportResult(
+            self.format, target.name, writer.sha256.hexdigest(), writer.size
+        )
+
+    @abstractmethod
+    def write(self, records: List[Dict], writer) -> None:
+        pass
+
+
+class JSONLExporter(Exporter):
+    """Un registro JSON por línea"""
+
+    format = "jsonl"
+    extension = "jsonl"
+
+    def write(self, records: List[Dict], writer) -> None:
+        buffered = io.BufferedWriter(writer)
+        for record in records:
+            buffered.write((json.dumps(record) + "\n").encode("utf-8"))
+        buffered.flush()
+
+
+class CSVExporter(Exporter):
+    """CSV con cabecera y columnas en el orden del contrato"""
+
+    format = "csv"
+    extension = "csv"
+
+    def write(self, records: List[Dict], writer) -> None:
+        text = io.TextIOWrapper(io.BufferedWriter(writer), encoding="utf-8", newline="")
+        csv_writer = csv.DictWriter(
+            text, fieldnames=[name for name, _ in COLUMNS], extrasaction="ignore"
+        )
+        csv_writer.writeheader()
+        csv_writer.writerows(records)
+        text.flush()
+        text.detach()
+
+
+class ColumnarExporter(Exporter):
+    """
+    Layout columnar binario: magic, cabecera JSON con longitud uint32 y
+    columnas contiguas alineadas a 8 bytes (little-endian). Los números se
+    guardan como int64/float64; los strings como offsets int64 + bytes UTF-8.
+    """
+
+    format = "columnar"
+    extension = "col"
+
+    @staticmethod
+    def _encode_column(values: List, column_type: str) -> bytes:
+        if column_type == "string":
+            offsets = array("q", [0])
+            data = bytearray()
+            for value in values:
+                data.extend(str(value).encode("utf-8"))
+                offsets.append(len(data))
+            if sys.byteorder == "big":
+                offsets.byteswap()
+            return offsets.tobytes() + bytes(data)
+        typecode = "q" if column_type == "int64" else "d"
+        column = array(typecode, values)
+        if sys.byteorder == "big":
+            column.byteswap()
+        return column.tobytes()
+
+    def write(self, records: List[Dict], writer) -> None:
+        blobs = [
+            (
+                name,
+                column_type,
+                self._encode_column([r[name] for r in records], column_type),
+            )
+            for name, column_type in COLUMNS
+        ]
+        write_sections(writer, COLUMNAR_MAGIC, {"rows": len(records)}, blobs)
+
+
+def write_sections(
+    writer, magic: bytes, header: Dict, blobs: List[Tuple[str, str, bytes]]
+) -> None:
+    """
+    Magic, cabecera JSON con longitud uint32 y secciones contiguas alineadas
+    a 8 bytes; la cabecera lista nombre, tipo, offset y longitud de cada una
+    """
+    columns = []
+    offset = 0
+    for name, column_type, blob in blobs:
+        columns.append(
+            {
+                "name": name,
+                "type": column_type,
+                "offset": offset,
+                "length": len(blob),
+            }
+        )
+        offset += len(blob) + (-len(blob) % 8)
+    payload = json.dumps({**header, "columns": columns}).encode("utf-8")
+    payload += b" " * (-(len(magic) + 4 + len(payload)) % 8)
+
+    writer.write(magic)
+    writer.write(struct.pack("<I", len(payload)))
+    writer.write(payload)
+    for _, _, blob in blobs:
+        writer.write(blob)
+        writer.write(b"\0" * (-len(blob) % 8))
+
+
+def read_sections(
+    buffer: memoryview, magic: bytes, path: Path
+) -> Tuple[Dict, Dict[str, memoryview]]:
+    """Cabecera y vistas (sin copia) de las secciones de `write_sections`"""
+    if bytes(buffer[: len(magic)]) != magic:
+        raise ValueError(f"Formato binario inválido: {path}")
+    start = len(magic) + 4
+    (header_len,) = struct.unpack("<I", buffer[len(magic) : start])
+    header = json.loads(bytes(buffer[start : start + header_len]))
+    base = start + header_len
+    sections = {
+        column["name"]: buffer[
+            base + column["offset"] : base + column["offset"] + column["length"]
+        ]
+        for column in header["columns"]
+    }
+    return header, sections
+
+
+def encode_timestamp(value: str) -> Tuple[int, int]:
+    """Timestamp ISO 8601 como (microsegundos UTC desde epoch, offset en segundos)"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    offset = parsed.utcoffset()
+    if offset is None:
+        delta, seconds = parsed - EPOCH, NAIVE_OFFSET
+    else:
+        delta, seconds = parsed - EPOCH_UTC, int(offset.total_seconds())
+    return (
+        delta.days * 86400 + delta.seconds
+    ) * 1_000_000 + delta.microseconds, seconds
+
+
+def decode_timestamp(micros: int, offset: int) -> str:
+    """
+    Forma canónica de `encode_timestamp`: UTC como sufijo `Z` e isoformat
+    (sin fracción si es cero); otras formas ISO solo conservan el instante
+    """
+    value = EPOCH + timedelta(microseconds=micros)
+    if offset == NAIVE_OFFSET:
+        return value.isoformat()
+    if offset == 0:
+        return value.isoformat() + "Z"
+    zone = timezone(timedelta(seconds=offset))
+    return value.replace(tzinfo=timezone.utc).astimezone(zone).isoformat()
+
+
+class FixedWidthExporter(Exporter):
+    """
+    Layout binario de ancho fijo ordenado por id para búsquedas con mmap
+    (ver `pipeline.publisher.fixed_store`): id y timestamps int64, valores
+    float64 y categorías como códigos uint32 de un diccionario de strings.
+
+    Los timestamps cuyo texto no coincide con la forma canónica de
+    `decode_timestamp` (`+00:00`, solo fecha, `.000`) guardan además el
+    texto original en una tabla dispersa `<columna>_text_rows` (posiciones
+    int64 ordenadas) + `<columna>_text` (offsets int64 + bytes UTF-8).
+    """
+
+    format = "fixed"
+    extension = "fix"
+
+    def write(self, records: List[Dict], writer) -> None:
+        columns = {name: array(typecode) for name, typecode in FIXED_COLUMNS}
+        dictionary: Dict[str, int] = {}
+        texts: Dict[str, Tuple[array, List[str]]] = {
+            name: (array("q"), []) for name in FIXED_TIMESTAMPS
+        }
+        last_id = None
+        for record in records:
+            if last_id is not None and record["id"] < last_id:
+                raise ValueError("Registros no ordenados por id")
+            last_id = record["id"]
+            micros, offset = encode_timestamp(record["timestamp"])
+            processed_at, _ = encode_timestamp(record["processed_at"])
+            for name, canonical in (
+                ("timestamp", decode_timestamp(micros, offset)),
+                ("processed_at", decode_timestamp(processed_at, NAIVE_OFFSET)),
+            ):
+                if canonical != record[name]:
+                    texts[name][0].append(len(columns["id"]))
+                    texts[name][1].append(record[name])
+            columns["id"].append(record["id"])
+            columns["timestamp"].append(micros)
+            columns["timestamp_offset"].append(offset)
+            columns["original_value"].append(record["original_value"])
+            columns["normalized_value"].append(record["normalized_value"])
+            columns["category"].append(
+                dictionary.setdefault(record["category"], len(dictionary))
+            )
+            columns["processed_at"].append(processed_at)
+
+        blobs = []
+        for name, typecode in FIXED_COLUMNS:
+            column = columns[name]
+            if sys.byteorder == "big":
+                column.byteswap()
+            blobs.append((name, typecode, column.tobytes()))
+        # Tabla lateral de categorías: offsets int64 + bytes UTF-8
+        blobs.append(
+            (
+                "category_dictionary",
+                "string",
+                ColumnarExporter._encode_column(list(dictionary), "string"),
+            )
+        )
+        for name in FIXED_TIMESTAMPS:
+            rows, strings = texts[name]
+            if sys.byteorder == "big":
+                rows.byteswap()
+            blobs.append((f"{name}_text_rows", "q", rows.tobytes()))
+            blobs.append(
+                (
+                    f"{name}_text",
+                    "string",
+                    ColumnarExporter._encode_column(strings, "string"),
+                )
+            )
+        header = {"rows": len(records), "categories": len(dictionary)}
+        write_sections(writer, FIXED_MAGIC, header, blobs)
+
+
+def read_columnar(file_path: Path) -> Dict[str, List]:
+    """Lee un archivo columnar completo como diccionario de columnas"""
+    with open(file_path, "rb") as f:
+        content = f.read()
+    if content[: len(COLUMNAR_MAGIC)] != COLUMNAR_MAGIC:
+        raise ValueError(f"Formato columnar inválido: {file_path}")
+    start = len(COLUMNAR_MAGIC) + 4
+    (header_len,) = struct.unpack("<I", content[len(COLUMNAR_MAGIC) : start])
+    header = json.loads(content[start : start + header_len])
+    base = start + header_len
+    rows = header["rows"]
+
+    result = {}
+    for column in header["columns"]:
+        blob = content[
+            base + column["offset"] : base + column["offset"] + column["length"]
+        ]
+        if column["type"] == "string":
+            offsets = array("q")
+            offsets.frombytes(blob[: 8 * (rows + 1)])
+            if sys.byteorder == "big":
+                offsets.byteswap()
+            data = blob[8 * (rows + 1) :]
+            result[column["name"]] = [
+                data[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(rows)
+            ]
+        else:
+            values = array("q" if column["type"] == "int64" else "d")
+            values.frombytes(blob)
+            if sys.byteorder == "big":
+                values.byteswap()
+            result[column["name"]] = values.tolist()
+    return result
+
+
+class ExporterFactory:
+    """Factory para crear exportadores por formato"""
+
+    _exporters = {
+        JSONLExporter.format: JSONLExporter,
+        CSVExporter.format: CSVExporter,
+        ColumnarExporter.format: ColumnarExporter,
+        FixedWidthExporter.format: FixedWidthExporter,
+    }
+
+    @staticmethod
+    def create_exporter(export_format: str) -> Exporter:
+        exporter_class = ExporterFactory._exporters.get(export_format)
+        if exporter_class is None:
+            raise ValueError(f"Formato de exportación no soportado: {export_format}")
+        return exporter_class()
@@ -0,0 +1,154 @@
+import mmap
+import sys
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from pipeline.publisher.exporters import (
+    FIXED_MAGIC,
+    FIXED_TIMESTAMPS,
+    NAIVE_OFFSET,
+    decode_timestamp,
+    read_sections,
+)
+from pipeline.publisher.versions import CURRENT_LINK
+
+FIXED_FILENAME = "data.fix"
+
+
+class FixedWidthStore:
+    """
+    Lector de publicaciones de ancho fijo (`data.fix`) mapeado en memoria.
+
+    Las columnas se exponen como memoryviews sobre el mmap, sin copiar ni
+    cargar el archivo; los ids están ordenados, así que las búsquedas
+    puntuales y por rango son búsquedas binarias O(log n).
+    """
+
+    def __init__(self, path: str | Path):
+        if sys.byteorder != "little":
+            raise ValueError("El layout de ancho fijo requiere un host little-endian")
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Archivo de ancho fijo vacío: {self.path}")
+        try:
+            self._open_columns()
+        except Exception:
+            self.close()
+            raise
+
+    def _open_columns(self) -> None:
+        buffer = memoryview(self._mmap)
+        self._views = [buffer]
+        header, sections = read_sections(buffer, FIXED_MAGIC, self.path)
+        self._views.extend(sections.values())
+        self.rows = header["rows"]
+        self.categories = self._decode_strings(
+            sections.pop("category_dictionary"), header["categories"]
+        )
+        # Texto original de los timestamps no canónicos, decodificado al leer
+        self._texts = {}
+        for name in FIXED_TIMESTAMPS:
+            rows = sections.pop(f"{name}_text_rows").cast("q")
+            blob = sections.pop(f"{name}_text")
+            offsets = blob[: 8 * (len(rows) + 1)].cast("q")
+            data = blob[8 * (len(rows) + 1) :]
+            self._views.extend([rows, offsets, data])
+            self._texts[name] = (rows, offsets, data)
+        self._columns = {}
+        for column in header["columns"]:
+            if column["name"] in sections:
+                view = sections[column["name"]].cast(column["type"])
+                self._views.append(view)
+                self._columns[column["name"]] = view
+        self._ids = self._columns["id"]
+
+    @staticmethod
+    def _decode_strings(blob: memoryview, count: int) -> List[str]:
+        """Tabla lateral de strings (offsets int64 + bytes UTF-8)"""
+        offsets = blob[: 8 * (count + 1)].cast("q")
+        data = blob[8 * (count + 1) :]
+        strings = [
+            bytes(data[offsets[i] : offsets[i + 1]]).decode("utf-8")
+            for i in range(count)
+        ]
+        offsets.release()
+        return strings
+
+    def _text(self, name: str, index: int) -> Optional[str]:
+        """Texto original del timestamp si no es la forma canónica"""
+        rows, offsets, data = self._texts[name]
+        position = bisect_left(rows, index)
+        if position < len(rows) and rows[position] == index:
+            start, end = offsets[position], offsets[position + 1]
+            return bytes(data[start:end]).decode("utf-8")
+        return None
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def record(self, index: int) -> Dict:
+        """Registro en la posición indicada, con los campos de TransformedRecord"""
+        columns = self._columns
+        return {
+            "id": columns["id"][index],
+            "timestamp": self._text("timestamp", index)
+            or decode_timestamp(
+                columns["timestamp"][index], columns["timestamp_offset"][index]
+            ),
+            "original_value": columns["original_value"][index],
+            "normalized_value": columns["normalized_value"][index],
+            "category": self.categories[columns["category"][index]],
+            "processed_at": self._text("processed_at", index)
+            or decode_timestamp(columns["processed_at"][index], NAIVE_OFFSET),
+        }
+
+    def get(self, record_id: int) -> Optional[Dict]:
+        """Primer registro con el id indicado (None si no existe)"""
+        index = bisect_left(self._ids, record_id)
+        if index < self.rows and self._ids[index] == record_id:
+            return self.record(index)
+        return None
+
+    def lookup(self, record_id: int) -> List[Dict]:
+        """Todos los registros con el id indicado (varios orígenes)"""
+        return list(self.range(record_id, record_id + 1))
+
+    def range(self, start_id: int, end_id: int) -> Iterator[Dict]:
+        """Registros con start_id <= id < end_id, en orden de id"""
+        index = bisect_left(self._ids, start_id)
+        while index < self.rows and self._ids[index] < end_id:
+            yield self.record(index)
+            index += 1
+
+    def close(self) -> None:
+        """Libera las vistas y cierra el mmap"""
+        for view in reversed(getattr(self, "_views", [])):
+            view.release()
+        self._views = []
+        self._columns = {}
+        self._texts = {}
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "FixedWidthStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @classmethod
+    def open_current(cls, output_dir: str | Path) -> "FixedWidthStore":
+        """Abre el `data.fix` de la versión publicada actual"""
+        path = Path(output_dir) / CURRENT_LINK / FIXED_FILENAME
+        if not path.exists():
+            raise FileNotFoundError(
+                f"La versión actual no tiene {FIXED_FILENAME} "
+                "(agregar `fixed` a EXPORT_FORMATS)"
+            )
+        return cls(path)
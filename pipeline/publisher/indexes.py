@@ -0,0 +1,321 @@
+import json
+import logging
+import mmap
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pipeline.contracts.adapters import load_json
+from pipeline.publisher.exporters import (
+    atomic_output,
+    encode_timestamp,
+    read_sections,
+    write_sections,
+)
+from pipeline.publisher.versions import CURRENT_LINK, DATA_FILENAME
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "data.idx"
+INDEX_MAGIC = b"PLIDX001"
+# Registros por bloque del zone map de timestamps
+BLOCK_RECORDS = 1024
+# Lecturas separadas por menos bytes que esto se fusionan en una sola
+COALESCE_GAP_BYTES = 4096
+# Un registro del JSON publicado (indent=2) empieza y termina en estas líneas;
+# los strings van escapados, así que no aparecen dentro de un registro
+_RECORD_START = b"\n    {\n"
+_RECORD_END = b"\n    }"
+
+
+def iter_record_spans(
+    data_file: Path, batch_size: int = BLOCK_RECORDS
+) -> Iterator[Tuple[List[Tuple[int, int]], List[Dict]]]:
+    """
+    Lotes de rangos de bytes [inicio, fin) de los registros de un JSON
+    publicado y sus registros parseados (un solo parseo por lote)
+    """
+    with open(data_file, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        spans: List[Tuple[int, int]] = []
+        position = data.find(_RECORD_START)
+        while position != -1:
+            start = position + 1
+            end = data.find(_RECORD_END, start)
+            if end == -1:
+                raise ValueError(f"Registro sin cerrar en {data_file.name}")
+            end += len(_RECORD_END)
+            spans.append((start, end))
+            if len(spans) == batch_size:
+                yield spans, _parse_spans(data, spans)
+                spans = []
+            position = data.find(_RECORD_START, end)
+        if spans:
+            yield spans, _parse_spans(data, spans)
+
+
+def _parse_spans(data: mmap.mmap, spans: List[Tuple[int, int]]) -> List[Dict]:
+    # Registros consecutivos separados por ",\n": el rango completo es un arreglo
+    records = load_json(b"[" + data[spans[0][0] : spans[-1][1]] + b"]")
+    if len(records) != len(spans):
+        raise ValueError("Layout no soportado para índices")
+    return records
+
+
+def _timestamp_micros(value: str) -> int:
+    """Timestamp ISO 8601 como microsegundos UTC (sin zona = UTC)"""
+    return encode_timestamp(value)[0]
+
+
+def build_index(
+    data_file: Path,
+    target: Path,
+    block_records: int = BLOCK_RECORDS,
+    expected_records: Optional[int] = None,
+) -> Dict:
+    """
+    Construye el índice de un JSON publicado en una pasada: rangos de bytes
+    por registro, zone map min/max de timestamp por bloque y posting lists
+    de ordinales por categoría
+    """
+    starts, ends = array("q"), array("q")
+    block_min, block_max = array("q"), array("q")
+    postings: Dict[str, array] = {}
+    ordinal = 0
+    # Cada lote es exactamente un bloque del zone map
+    for spans, batch in iter_record_spans(data_file, block_records):
+        timestamps = [_timestamp_micros(record["timestamp"]) for record in batch]
+        block_min.append(min(timestamps))
+        block_max.append(max(timestamps))
+        for (start, end), record in zip(spans, batch):
+            starts.append(start)
+            ends.append(end)
+            postings.setdefault(record["category"], array("q")).append(ordinal)
+            ordinal += 1
+
+    records = len(starts)
+    if expected_records is not None and records != expected_records:
+        raise ValueError(
+            f"Layout no soportado para índices: {records} registros encontrados, "
+            f"{expected_records} esperados"
+        )
+
+    categories = sorted(postings)
+    posting_offsets = array("q", [0])
+    all_postings = array("q")
+    for category in categories:
+        all_postings.extend(postings[category])
+        posting_offsets.append(len(all_postings))
+
+    sections = {
+        "starts": starts,
+        "ends": ends,
+        "block_min": block_min,
+        "block_max": block_max,
+        "posting_offsets": posting_offsets,
+        "postings": all_postings,
+    }
+    blobs = []
+    for name, values in sections.items():
+        if sys.byteorder == "big":
+            values.byteswap()
+        blobs.append((name, "q", values.tobytes()))
+    header = {
+        "records": records,
+        "block_records": block_records,
+        "blocks": len(block_min),
+        "categories": categories,
+        "data_size": data_file.stat().st_size,
+    }
+    with atomic_output(target) as writer:
+        write_sections(writer, INDEX_MAGIC, header, blobs)
+    logger.info(
+        f"Índice {target.name}: {records} registros, {len(block_min)} bloques, "
+        f"{len(categories)} categorías"
+    )
+    return {
+        "file": target.name,
+        "sha256": writer.sha256.hexdigest(),
+        "size": writer.size,
+        "records": records,
+        "blocks": len(block_min),
+        "categories": len(categories),
+    }
+
+
+class QueryPlan:
+    """Rangos de bytes del archivo publicado que una consulta necesita leer"""
+
+    def __init__(self, reads: List[Tuple[int, int, Sequence[int]]], data_size: int):
+        self.reads = reads
+        self.data_size = data_size
+
+    @property
+    def bytes(self) -> int:
+        return sum(end - start for start, end, _ in self.reads)
+
+    @property
+    def records(self) -> int:
+        return sum(len(ordinals) for _, _, ordinals in self.reads)
+
+
+class DatasetIndex:
+    """
+    Índices secundarios de una versión publicada (`data.idx`) mapeados en
+    memoria: combina el zone map de timestamps con las posting lists de
+    categoría para leer solo los registros candidatos del JSON publicado
+    """
+
+    def __init__(self, index_file: str | Path, data_file: str | Path):
+        if sys.byteorder != "little":
+            raise ValueError("El índice requiere un host little-endian")
+        self.index_file = Path(index_file)
+        self.data_file = Path(data_file)
+        self._file = open(self.index_file, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        self._views = [buffer]
+        try:
+            header, sections = read_sections(buffer, INDEX_MAGIC, self.index_file)
+        except Exception:
+            self.close()
+            raise
+        self.records = header["records"]
+        self.block_records = header["block_records"]
+        self.blocks = header["blocks"]
+        self.categories: List[str] = header["categories"]
+        self.data_size = header["data_size"]
+        self._sections = {}
+        for name, blob in sections.items():
+            view = blob.cast("q")
+            self._views.extend([blob, view])
+            self._sections[name] = view
+
+    def _candidate_blocks(self, low: int, high: int) -> List[int]:
+        """Bloques cuyo rango [min, max] de timestamps intersecta [low, high]"""
+        block_min = self._sections["block_min"]
+        block_max = self._sections["block_max"]
+        return [
+            block
+            for block in range(self.blocks)
+            if block_max[block] >= low and block_min[block] <= high
+        ]
+
+    def _candidate_ordinals(
+        self, blocks: List[int], category: Optional[str]
+    ) -> Iterator[Sequence[int]]:
+        """Ordinales candidatos por bloque (posting list o bloque completo)"""
+        size = self.block_records
+        if category is None:
+            for block in blocks:
+                yield range(block * size, min(self.records, (block + 1) * size))
+            return
+        position = bisect_left(self.categories, category)
+        if position == len(self.categories) or self.categories[position] != category:
+            return
+        offsets = self._sections["posting_offsets"]
+        postings = self._sections["postings"][offsets[position] : offsets[position + 1]]
+        try:
+            for block in blocks:
+                first = bisect_left(postings, block * size)
+                last = bisect_left(postings, (block + 1) * size)
+                if first < last:
+                    yield postings[first:last].tolist()
+        finally:
+            postings.release()
+
+    def plan(
+        self,
+        category: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> QueryPlan:
+        """Lecturas necesarias para una consulta, sin tocar el archivo de datos"""
+        low = _timestamp_micros(start) if start else -(2**63)
+        high = _timestamp_micros(end) if end else 2**63 - 1
+        starts, ends = self._sections["starts"], self._sections["ends"]
+        reads: List[list] = []
+        for ordinals in self._candidate_ordinals(
+            self._candidate_blocks(low, high), category
+        ):
+            if isinstance(ordinals, range):
+                # Bloques completos contiguos se leen de una vez
+                if reads and starts[ordinals[0]] - reads[-1][1] <= COALESCE_GAP_BYTES:
+                    reads[-1][1] = ends[ordinals[-1]]
+                    reads[-1][2] = range(reads[-1][2][0], ordinals[-1] + 1)
+                else:
+                    reads.append([starts[ordinals[0]], ends[ordinals[-1]], ordinals])
+                continue
+            for ordinal in ordinals:
+                if reads and starts[ordinal] - reads[-1][1] <= COALESCE_GAP_BYTES:
+                    reads[-1][1] = ends[ordinal]
+                    reads[-1][2].append(ordinal)
+                else:
+                    reads.append([starts[ordinal], ends[ordinal], [ordinal]])
+        reads = [tuple(read) for read in reads]
+        return QueryPlan(reads, self.data_size)
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Iterator[Dict]:
+        """Registros de `category` con start <= timestamp <= end, en orden de id"""
+        low = _timestamp_micros(start) if start else None
+        high = _timestamp_micros(end) if end else None
+        plan = self.plan(category, start, end)
+        starts, ends = self._sections["starts"], self._sections["ends"]
+        with open(self.data_file, "rb") as f:
+            for read_start, read_end, ordinals in plan.reads:
+                f.seek(read_start)
+                chunk = f.read(read_end - read_start)
+                for ordinal in ordinals:
+                    record = json.loads(
+                        chunk[starts[ordinal] - read_start : ends[ordinal] - read_start]
+                    )
+                    timestamp = _timestamp_micros(record["timestamp"])
+                    if (low is None or timestamp >= low) and (
+                        high is None or timestamp <= high
+                    ):
+                        yield record
+
+    def close(self) -> None:
+        """Libera las vistas y cierra el mmap"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._sections = {}
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "DatasetIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @classmethod
+    def open_current(cls, output_dir: str | Path) -> "DatasetIndex":
+        """Índice de la versión publicada actual"""
+        version_dir = Path(output_dir) / CURRENT_LINK
+        index_file = version_dir / INDEX_FILENAME
+        if not index_file.exists():
+            raise FileNotFoundError(
+                f"La versión actual no tiene {INDEX_FILENAME} (PUBLISH_INDEXES=true)"
+            )
+        return cls(index_file, version_dir / DATA_FILENAME)
+
+
+def query(
+    output_dir: str | Path,
+    category: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> List[Dict]:
+    """Registros de la versión actual por categoría y rango de timestamps"""
+    with DatasetIndex.open_current(output_dir) as index:
+        return list(index.query(category, start, end))
@@ -1,18 +1,42 @@
 import json
 import logging
 import os
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+
+from pydantic import ValidationError
+
+from pipeline import config, hashing
+from pipeline.catalog import PublicationCatalog
+from pipeline.contracts.adapters import (
+    dump_records,
+    is_json_error,
+    validate_output_json,
+    validate_records,
+)
+from pipeline.contracts.schemas import OutputData, OutputMetadata
+from pipeline.contracts.sidecar import read_sidecar, sidecar_path
+from pipeline.contracts.streaming import RecordHasher, iter_output_document
+from pipeline.memory import MemoryBudget
+from pipeline.metrics import MetricsRegistry, StageMetrics
+from pipeline.profiling import Profiler
+from pipeline.publisher.delta import DeltaManifest, compute_delta, delta_filename
+from pipeline.publisher.exporters import ExporterFactory, ExportResult
+from pipeline.publisher.indexes import INDEX_FILENAME, build_index
+from pipeline.publisher.segments import SegmentStore
+from pipeline.publisher.versions import DATA_FILENAME, METADATA_FILENAME, VersionStore
+from pipeline.tracing import Tracer, current_span
 
-from pipeline.config import LOG_LEVEL, OUTPUT_DIR
-from pipeline.contracts.schemas import OutputData
-
-log_level = LOG_LEVEL
-logging.basicConfig(level=getattr(logging, log_level))
 logger = logging.getLogger(__name__)
 
+VALIDATION_MODES = ("strict", "streaming", "trusted")
+# Memoria aproximada de los modelos Pydantic por byte de JSON en modo strict
+STRICT_EXPANSION = 10
+# Registros validados por llamada en la validación streaming
+VALIDATION_BATCH_SIZE = 1000
+
 
 class PublisherMetadata:
     """Metadata de publicación"""
@@ -23,11 +47,23 @@ class PublisherMetadata:
         source_file: str,
         total_records: int,
         data_hash: str,
+        version: Optional[str] = None,
+        published_file: Optional[str] = None,
+        delta: Optional[dict] = None,
+        exports: Optional[List[dict]] = None,
+        segment: Optional[dict] = None,
+        index: Optional[dict] = None,
     ):
         self.published_at = published_at
         self.source_file = source_file
         self.total_records = total_records
         self.data_hash = data_hash
+        self.version = version
+        self.published_file = published_file
+        self.delta = delta
+        self.exports = exports or []
+        self.segment = segment
+        self.index = index
 
     def to_dict(self):
         """Convertir a diccionario"""
@@ -36,29 +72,86 @@ class PublisherMetadata:
             "source_file": self.source_file,
             "total_records": self.total_records,
             "data_hash": self.data_hash,
+            "version": self.version,
+            "published_file": self.published_file,
+            "delta": self.delta,
+            "exports": self.exports,
+            "segment": self.segment,
+            "index": self.index,
         }
 
 
 class Publisher:
     """Componente de publicación del pipeline ETL"""
 
-    def __init__(self, output_dir: str | None = None):
-        self.output_dir = Path(output_dir or OUTPUT_DIR)
+    def __init__(
+        self,
+        output_dir: str | None = None,
+        validation_mode: str | None = None,
+        keep_versions: int | None = None,
+        retention_days: int | None = None,
+        delta: bool | None = None,
+        export_formats: List[str] | None = None,
+        memory_budget: int | None = None,
+        metrics: MetricsRegistry | None = None,
+        segments: bool | None = None,
+        indexes: bool | None = None,
+    ):
+        self.output_dir = Path(output_dir or config.OUTPUT_DIR)
+        self.validation_mode = validation_mode or config.PUBLISH_VALIDATION
+        if self.validation_mode not in VALIDATION_MODES:
+            raise ValueError(f"Modo de validación no soportado: {self.validation_mode}")
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.catalog = PublicationCatalog(self.output_dir)
+        self.delta = config.PUBLISH_DELTA if delta is None else delta
+        self.indexes = config.PUBLISH_INDEXES if indexes is None else indexes
+        self.exporters = [
+            ExporterFactory.create_exporter(export_format)
+            for export_format in (
+                config.EXPORT_FORMATS if export_formats is None else export_formats
+            )
+        ]
+        self.versions = VersionStore(
+            self.output_dir,
+            keep_versions=(
+                config.PUBLISH_KEEP_VERSIONS if keep_versions is None else keep_versions
+            ),
+            retention_days=(
+                config.PUBLISH_RETENTION_DAYS
+                if retention_days is None
+                else retention_days
+            ),
+        )
+        use_segments = config.PUBLISH_SEGMENTS if segments is None else segments
+        self.segments = (
+            SegmentStore.from_config(self.output_dir) if use_segments else None
+        )
 
-    def _find_latest_transformed_file(self) -> Optional[Path]:
-        """Encuentra el archivo transformado más reciente"""
-        transformed_files = sorted(
-            [f for f in self.output_dir.glob("transformed_*.json")],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True,
+        self.memory_budget = (
+            MemoryBudget.from_config()
+            if memory_budget is None
+            else MemoryBudget(memory_budget)
         )
+        self.metrics = StageMetrics(metrics, "publisher")
+        self.profiler = Profiler.from_config(self.output_dir)
+        self.tracer = Tracer.from_config(self.output_dir)
 
-        if not transformed_files:
+    def _find_latest_transformed_file(self) -> Optional[Path]:
+        """Encuentra el archivo transformado más reciente desde el catálogo"""
+        if not self.catalog.exists():
+            logger.info("Catálogo no encontrado, reconstruyendo desde el directorio")
+            self.catalog.rebuild()
+
+        entry = self.catalog.latest()
+        if entry is None:
             logger.warning("No se encontraron archivos transformados para publicar")
             return None
 
-        latest_file = transformed_files[0]
+        latest_file = self.output_dir / entry.path
+        if not latest_file.exists():
+            logger.warning(f"Archivo del catálogo ya publicado o ausente: {entry.path}")
+            return None
+
         logger.info(f"Archivo transformado encontrado: {latest_file.name}")
         return latest_file
 
@@ -68,23 +161,146 @@ class Publisher:
             raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
 
         try:
-            with open(file_path, "r") as f:
-                data = json.load(f)
-
-            # Validar con Pydantic
-            validated_data = OutputData(**data)
+            # Validar con Pydantic directamente desde los bytes (sin dicts)
+            validated_data = validate_output_json(file_path.read_bytes())
             logger.info(
                 f"Datos validados: {validated_data.metadata.total_records} registros"
             )
             return validated_data
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Error al parsear JSON: {e}")
-            raise ValueError(f"JSON inválido en {file_path}: {e}")
+        except ValidationError as e:
+            if is_json_error(e):
+                logger.error(f"Error al parsear JSON: {e}")
+                raise ValueError(f"JSON inválido en {file_path}: {e}")
+            logger.error(f"Error de validación: {e}")
+            raise ValueError(f"Datos no cumplen esquema OutputData: {e}")
         except Exception as e:
             logger.error(f"Error de validación: {e}")
             raise ValueError(f"Datos no cumplen esquema OutputData: {e}")
 
+    def _stream_validate_transformed_data(self, file_path: Path) -> OutputMetadata:
+        """
+        Valida el archivo en streaming con memoria acotada: cada elemento de
+        `records` se valida al leerse y se acumula en un hash canónico.
+        """
+        if not file_path.exists():
+            raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
+
+        hasher = RecordHasher()
+        raw_metadata = None
+        batch = []
+
+        def flush() -> None:
+            # Un lote de registros por llamada al validador nativo
+            for record in dump_records(validate_records(batch), for_hash=True):
+                hasher.update(record)
+            batch.clear()
+
+        try:
+            for key, value in iter_output_document(file_path):
+                if key == "record":
+                    batch.append(value)
+                    if len(batch) >= VALIDATION_BATCH_SIZE:
+                        flush()
+                elif key == "metadata":
+                    raw_metadata = value
+            flush()
+        except ValueError as e:
+            logger.error(f"Error de validación en streaming: {e}")
+            raise ValueError(f"Datos no cumplen esquema OutputData: {e}")
+
+        if raw_metadata is None:
+            raise ValueError(f"Metadata ausente en {file_path}")
+        if hasher.count == 0:
+            raise ValueError("La salida debe contener al menos un registro")
+
+        try:
+            metadata = OutputMetadata(**raw_metadata)
+        except ValueError as e:
+            raise ValueError(f"Metadata no cumple esquema OutputMetadata: {e}")
+
+        if metadata.total_records != hasher.count:
+            raise ValueError(
+                f"total_records ({metadata.total_records}) no coincide con "
+                f"los registros leídos ({hasher.count})"
+            )
+        if metadata.data_hash != hasher.hexdigest():
+            raise ValueError("data_hash no coincide con el hash de los registros")
+
+        logger.info(f"Datos validados en streaming: {hasher.count} registros")
+        return metadata
+
+    def _calculate_file_hash(self, file_path: Path) -> str:
+        """Calcular hash SHA256 de un archivo en streaming"""
+        return hashing.hash_file(file_path)
+
+    def _verify_sidecar(self, file_path: Path) -> Optional[OutputMetadata]:
+        """
+        Verifica el archivo contra su sidecar (tamaño y SHA256 de bytes).
+        Retorna la metadata registrada por el Transformer si coincide.
+        """
+        sidecar = read_sidecar(file_path)
+        if sidecar is None:
+            logger.warning(f"Sidecar no encontrado para {file_path.name}")
+            return None
+
+        if file_path.stat().st_size != sidecar["size"]:
+            logger.warning(f"Tamaño no coincide con el sidecar: {file_path.name}")
+            return None
+
+        if self._calculate_file_hash(file_path) != sidecar["sha256"]:
+            logger.warning(f"Hash no coincide con el sidecar: {file_path.name}")
+            return None
+
+        try:
+            return OutputMetadata(**sidecar["metadata"])
+        except Exception as e:
+            logger.warning(f"Metadata del sidecar inválida: {e}")
+            return None
+
+    def _exceeds_budget(self, file_path: Path) -> bool:
+        """True si la validación completa en memoria no cabe en MEMORY_BUDGET"""
+        if not self.memory_budget.enabled:
+            return False
+        estimated = file_path.stat().st_size * STRICT_EXPANSION
+        headroom = self.memory_budget.headroom()
+        if estimated <= headroom:
+            return False
+        logger.info(
+            f"Validación completa estimada en {estimated} B > {headroom} B "
+            "disponibles: usando validación streaming"
+        )
+        return True
+
+    def _validate_for_publish(self, file_path: Path) -> OutputMetadata:
+        """Valida el archivo según el modo configurado y retorna su metadata"""
+        self.metrics.bytes_read(file_path.stat().st_size)
+        with self.tracer.span(
+            "publisher.validate",
+            **{"file.name": file_path.name, "validation.mode": self.validation_mode},
+        ) as span, self.metrics.phase("validate"):
+            metadata = self._validate_with_mode(file_path)
+            span.set_attribute("records", metadata.total_records)
+            span.set_attribute("data_hash", metadata.data_hash)
+            return metadata
+
+    def _validate_with_mode(self, file_path: Path) -> OutputMetadata:
+        """Validación según `validation_mode` (trusted, streaming o strict)"""
+        if self.validation_mode == "trusted":
+            metadata = self._verify_sidecar(file_path)
+            if metadata is not None:
+                logger.info(
+                    f"Sidecar verificado: {metadata.total_records} registros "
+                    "(sin reconstruir modelos)"
+                )
+                return metadata
+            logger.warning("Usando validación completa como respaldo")
+
+        if self.validation_mode == "streaming" or self._exceeds_budget(file_path):
+            return self._stream_validate_transformed_data(file_path)
+
+        return self._validate_transformed_data(file_path).metadata
+
     def _atomic_write(self, data: str, target_path: Path) -> None:
         """Escritura atómica de archivo usando tmp con rename"""
         tmp_path = target_path.with_suffix(".tmp")
@@ -97,7 +313,7 @@ class Publisher:
                 os.fsync(f.fileno())  # Forzar escritura a disco
 
             # Renombrar atómicamente
-            shutil.move(str(tmp_path), str(target_path))
+            os.replace(tmp_path, target_path)
             logger.info(f"Archivo escrito atómicamente: {target_path.name}")
 
         except Exception as e:
@@ -107,54 +323,192 @@ class Publisher:
             logger.error(f"Error en escritura atómica: {e}")
             raise IOError(f"Fallo al escribir {target_path}: {e}")
 
-    def _generate_published_filename(self) -> str:
+    def _create_delta(self, version: str) -> Optional[DeltaManifest]:
+        """Calcula el delta de la versión contra la versión publicada actual"""
+        base_version = self.versions.current_version()
+        if base_version is None:
+            return None
+        base_file = self.versions.version_dir(base_version) / DATA_FILENAME
+        if not base_file.exists():
+            return None
+        version_dir = self.versions.version_dir(version)
+        try:
+            return compute_delta(
+                base_file,
+                version_dir / DATA_FILENAME,
+                version_dir / delta_filename(version),
+                base_version,
+            )
+        except ValueError as e:
+            logger.warning(f"No se pudo calcular el delta: {e}")
+            return None
+
+    def _export(
+        self, version: str, records: Optional[List[dict]] = None
+    ) -> List[ExportResult]:
+        """
+        Exporta la versión a los formatos configurados en paralelo,
+        a partir de una única lectura de los registros publicados
+        """
+        if not self.exporters:
+            return []
+        version_dir = self.versions.version_dir(version)
+        if records is None:
+            records = list(self._iter_version_records(version))
+        with ThreadPoolExecutor(max_workers=len(self.exporters)) as executor:
+            futures = [
+                executor.submit(exporter.export, records, version_dir)
+                for exporter in self.exporters
+            ]
+            results = [future.result() for future in futures]
+        for result in results:
+            logger.info(f"Exportado {result.format}: {result.file}")
+        return results
+
+    def _build_index(
+        self, version: str, output_metadata: OutputMetadata
+    ) -> Optional[dict]:
+        """Índices por categoría y zone map de timestamps de la versión"""
+        version_dir = self.versions.version_dir(version)
+        try:
+            return build_index(
+                version_dir / DATA_FILENAME,
+                version_dir / INDEX_FILENAME,
+                block_records=config.INDEX_BLOCK_RECORDS,
+                expected_records=output_metadata.total_records,
+            )
+        except ValueError as e:
+            logger.warning(f"No se pudo construir el índice: {e}")
+            return None
+
+    def _iter_version_records(self, version: str):
+        """Registros publicados de una versión, leídos en streaming"""
+        data_file = self.versions.version_dir(version) / DATA_FILENAME
+        for key, value in iter_output_document(data_file):
+            if key == "record":
+                yield value
+
+    def _add_segment(self, version: str, records: Optional[List[dict]] = None):
+        """Agrega la versión como segmento y lanza la compactación"""
+        segment = self.segments.add(
+            self._iter_version_records(version) if records is None else records,
+            version,
+        )
+        self.segments.compact_async()
+        return segment
+
+    def _generate_published_filename(self, version: Optional[str] = None) -> str:
         """Genera nombre de archivo con timestamp"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = version or datetime.now().strftime("%Y%m%d_%H%M%S")
         return f"published_{timestamp}.json"
 
     def _create_metadata(
-        self, source_file: Path, output_data: OutputData
+        self,
+        source_file: Path,
+        output_metadata: OutputMetadata,
+        version: Optional[str] = None,
+        published_file: Optional[str] = None,
+        delta: Optional[DeltaManifest] = None,
+        exports: Optional[List[ExportResult]] = None,
+        segment: Optional[dict] = None,
+        index: Optional[dict] = None,
     ) -> PublisherMetadata:
         """Crea metadata de publicación"""
         return PublisherMetadata(
             published_at=datetime.now().isoformat(),
             source_file=source_file.name,
-            total_records=output_data.metadata.total_records,
-            data_hash=output_data.metadata.data_hash,
+            total_records=output_metadata.total_records,
+            data_hash=output_metadata.data_hash,
+            version=version,
+            published_file=published_file,
+            delta=delta.to_dict() if delta else None,
+            exports=[export.to_dict() for export in exports or []],
+            segment=segment,
+            index=index,
         )
 
-    def publish(self) -> bool:
-        """Proceso principal de publicación"""
+    def _finalize_version(
+        self,
+        version: str,
+        published_path: Path,
+        source_file: Path,
+        output_metadata: OutputMetadata,
+        records: Optional[List[dict]] = None,
+    ) -> None:
+        """Enlaza la versión, calcula delta y exportaciones y activa `current`"""
+        span = current_span()
+        if span is not None:
+            span.set_attribute("version", version)
+            span.set_attribute("source.file", source_file.name)
+            span.set_attribute("records", output_metadata.total_records)
+        # Enlazar en el directorio de la versión
+        self.versions.add(version, published_path)
+
+        # Delta contra la versión publicada anterior
+        with self.tracer.span("publisher.delta"), self.metrics.phase("delta"):
+            delta = self._create_delta(version) if self.delta else None
+
+        # Exportaciones adicionales (JSONL, CSV, columnar)
+        with self.tracer.span(
+            "publisher.export", **{"formats": [e.format for e in self.exporters]}
+        ), self.metrics.phase("export"):
+            exports = self._export(version, records)
+
+        # Índices secundarios (categoría y zone map de timestamps)
+        index = None
+        if self.indexes:
+            with self.tracer.span("publisher.index"), self.metrics.phase("index"):
+                index = self._build_index(version, output_metadata)
+
+        # Segmento inmutable con los registros de esta publicación (modo LSM)
+        segment = None
+        if self.segments is not None:
+            with self.tracer.span("publisher.segment"), self.metrics.phase("segment"):
+                segment = self._add_segment(version, records)
+
+        # Generar metadata.json (versión y raíz)
+        metadata = self._create_metadata(
+            source_file,
+            output_metadata,
+            version,
+            published_path.name,
+            delta,
+            exports,
+            segment,
+            index,
+        )
+        metadata_json = json.dumps(metadata.to_dict(), indent=2)
+        version_dir = self.versions.version_dir(version)
+        self._atomic_write(metadata_json, version_dir / METADATA_FILENAME)
+        self._atomic_write(metadata_json, self.output_dir / METADATA_FILENAME)
+
+        # Apuntar `current` a la nueva versión y aplicar retención
+        self.versions.set_current(version)
+        self.versions.gc()
+        self.metrics.rows("published", output_metadata.total_records)
+        self.metrics.files("published")
+
+    def _run_guarded(self, operation) -> bool:
+        """Ejecuta una operación de publicación traduciendo errores a False"""
+        self.metrics.start()
+        try:
+            with self.tracer.span("publisher.publish") as span, self.profiler.capture(
+                "publisher", self.profiler.sample_run()
+            ):
+                success = self._run_operation(operation)
+                span.set_attribute("success", success)
+                return success
+        finally:
+            self.metrics.finish()
+            self.metrics.export(self.output_dir)
+
+    def _run_operation(self, operation) -> bool:
+        """Ejecuta la operación registrando y traduciendo sus errores"""
         try:
             logger.info("Iniciando proceso de publicación:")
-
-            # Encontrar archivo transformado
-            source_file = self._find_latest_transformed_file()
-            if source_file is None:
-                logger.error("No hay archivos para publicar")
+            if not operation():
                 return False
 
-            # Validar datos
-            validated_data = self._validate_transformed_data(source_file)
-
-            # Generar nombre de archivo publicado
-            published_filename = self._generate_published_filename()
-            published_path = self.output_dir / published_filename
-
-            # Renombrar archivo transformado a publicado
-            logger.info(f"Publicando a: {published_filename}")
-            try:
-                shutil.move(str(source_file), str(published_path))
-            except Exception as e:
-                logger.error(f"Error al renombrar archivo: {e}")
-                raise IOError(f"Fallo al renombrar {source_file}: {e}")
-
-            # Generar metadata.json
-            metadata = self._create_metadata(source_file, validated_data)
-            metadata_path = self.output_dir / "metadata.json"
-            metadata_json = json.dumps(metadata.to_dict(), indent=2)
-            self._atomic_write(metadata_json, metadata_path)
-
             # Log de éxito
             logger.info("Publicación completada exitosament")
 
@@ -173,8 +527,72 @@ class Publisher:
             logger.error(f"Error inesperado en publicación: {e}")
             return False
 
+    def _publish_latest_file(self) -> bool:
+        """Publica el último archivo transformado del catálogo"""
+        # Encontrar archivo transformado
+        source_file = self._find_latest_transformed_file()
+        if source_file is None:
+            logger.error("No hay archivos para publicar")
+            return False
+
+        # Validar datos
+        output_metadata = self._validate_for_publish(source_file)
+
+        # Generar versión y nombre de archivo publicado
+        version = self.versions.new_version_id()
+        published_filename = self._generate_published_filename(version)
+        published_path = self.output_dir / published_filename
+
+        # Renombrar archivo transformado a publicado (sin copiar bytes)
+        logger.info(f"Publicando a: {published_filename}")
+        try:
+            os.replace(source_file, published_path)
+        except Exception as e:
+            logger.error(f"Error al renombrar archivo: {e}")
+            raise IOError(f"Fallo al renombrar {source_file}: {e}")
+
+        # El sidecar acompaña al archivo publicado
+        if sidecar_path(source_file).exists():
+            os.replace(sidecar_path(source_file), sidecar_path(published_path))
+
+        self._finalize_version(version, published_path, source_file, output_metadata)
+        return True
+
+    def publish(self) -> bool:
+        """Proceso principal de publicación"""
+        return self._run_guarded(self._publish_latest_file)
+
+    def publish_data(self, output_data: OutputData, source_name: str) -> bool:
+        """
+        Publica datos ya validados en memoria (runner en proceso), escribiendo
+        directamente el archivo publicado sin pasar por `transformed_*.json`
+        """
+
+        def operation() -> bool:
+            version = self.versions.new_version_id()
+            published_filename = self._generate_published_filename(version)
+            published_path = self.output_dir / published_filename
+            logger.info(f"Publicando a: {published_filename}")
+            with self.metrics.phase("write"):
+                payload = output_data.model_dump_json(indent=2)
+                self._atomic_write(payload, published_path)
+            self.metrics.bytes_written(len(payload.encode("utf-8")))
+
+            records = dump_records(output_data.records)
+            self._finalize_version(
+                version,
+                published_path,
+                Path(source_name),
+                output_data.metadata,
+                records,
+            )
+            return True
+
+        return self._run_guarded(operation)
+
 
 if __name__ == "__main__":
+    logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
     publisher = Publisher()
     success = publisher.publish()
     exit(0 if success else 1)
@@ -0,0 +1,332 @@
+import hashlib
+import heapq
+import json
+import logging
+import os
+import threading
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SEGMENTS_DIRNAME = "segments"
+MANIFEST_FILENAME = "manifest.json"
+# Locks entre procesos (flock): el manifest se reemplaza atómicamente, así
+# que no sirve como archivo de lock
+MANIFEST_LOCK_FILENAME = ".manifest.lock"
+COMPACT_LOCK_FILENAME = ".compact.lock"
+# Tamaño máximo del tier 0; cada tier siguiente es TIER_FACTOR veces mayor
+TIER_BASE_BYTES = 1024 * 1024
+TIER_FACTOR = 4
+# Reintentos de un scan si una compactación elimina segmentos al abrirlos
+SCAN_RETRIES = 3
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Lock exclusivo con flock; también excluye a otros hilos del proceso"""
+    import fcntl
+
+    with open(path, "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def segment_filename(seq_min: int, seq_max: int) -> str:
+    """Nombre de un segmento que cubre las publicaciones seq_min..seq_max"""
+    return f"seg_{seq_min:08d}_{seq_max:08d}.jsonl"
+
+
+def segment_tier(size: int) -> int:
+    """Tier de tamaño de un segmento (0 = menor a TIER_BASE_BYTES)"""
+    tier, limit = 0, TIER_BASE_BYTES
+    while size >= limit:
+        tier += 1
+        limit *= TIER_FACTOR
+    return tier
+
+
+def _iter_segment(handle) -> Iterator[Dict]:
+    for line in handle:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _keyed(records: Iterator[Dict], age: int) -> Iterator[tuple]:
+    # El segmento más reciente tiene la clave menor para el mismo id
+    for record in records:
+        yield record["id"], -age, record
+
+
+def merge_records(sources: List[Iterable[Dict]]) -> Iterator[Dict]:
+    """
+    Merge por id de secuencias ordenadas (de la más antigua a la más
+    reciente): para cada id gana el registro más reciente
+    """
+    streams = [_keyed(iter(source), age) for age, source in enumerate(sources)]
+    last_id = None
+    for record_id, _, record in heapq.merge(*streams):
+        if record_id != last_id:
+            last_id = record_id
+            yield record
+
+
+def _last_per_id(records: Iterable[Dict]) -> Iterator[Dict]:
+    """Registros ordenados por id, conservando el último de cada id"""
+    pending = None
+    for record in records:
+        if pending is not None:
+            if record["id"] < pending["id"]:
+                raise ValueError("Registros no ordenados por id")
+            if record["id"] != pending["id"]:
+                yield pending
+        pending = record
+    if pending is not None:
+        yield pending
+
+
+def _write_segment(path: Path, records: Iterable[Dict]) -> Dict:
+    """Escribe un segmento JSON Lines atómicamente y devuelve su resumen"""
+    sha256_hash = hashlib.sha256()
+    count, min_id, max_id = 0, None, None
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            for record in records:
+                line = (json.dumps(record, sort_keys=True) + "\n").encode("utf-8")
+                f.write(line)
+                sha256_hash.update(line)
+                if min_id is None:
+                    min_id = record["id"]
+                max_id = record["id"]
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return {
+        "file": path.name,
+        "records": count,
+        "size": path.stat().st_size,
+        "min_id": min_id,
+        "max_id": max_id,
+        "sha256": sha256_hash.hexdigest(),
+    }
+
+
+class SegmentStore:
+    """
+    Dataset publicado como segmentos inmutables ordenados por id (estilo LSM).
+
+    Cada publicación agrega un segmento con solo sus registros; una
+    compactación en segundo plano fusiona segmentos adyacentes del mismo
+    tier de tamaño aplicando last-writer-wins por id. El manifest lista los
+    segmentos del más antiguo al más reciente y se reemplaza atómicamente.
+
+    Las modificaciones del manifest y la compactación se serializan con
+    flock, así que el CLI `compact` puede correr junto a un Publisher.
+    """
+
+    def __init__(self, directory: Path, min_merge: int = 4):
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / MANIFEST_FILENAME
+        self.min_merge = max(2, min_merge)
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+
+    @contextmanager
+    def _manifest_lock(self):
+        """Exclusión de lectura-modificación-escritura del manifest"""
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with _file_lock(self.directory / MANIFEST_LOCK_FILENAME):
+                yield
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"next_seq": 1, "segments": []}
+
+    def _save_manifest(self, manifest: Dict) -> None:
+        tmp_path = self.manifest_path.with_name(MANIFEST_FILENAME + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def segments(self) -> List[Dict]:
+        """Segmentos del manifest, del más antiguo al más reciente"""
+        return self._load_manifest()["segments"]
+
+    def add(self, records: Iterable[Dict], version: Optional[str] = None) -> Dict:
+        """
+        Agrega un segmento con los registros (ordenados por id) de una
+        publicación; el costo es proporcional a los registros nuevos
+        """
+        with self._manifest_lock():
+            manifest = self._load_manifest()
+            seq = manifest["next_seq"]
+            path = self.directory / segment_filename(seq, seq)
+            segment = _write_segment(path, _last_per_id(records))
+            segment.update({"seq_min": seq, "seq_max": seq, "version": version})
+            manifest["segments"].append(segment)
+            manifest["next_seq"] = seq + 1
+            self._save_manifest(manifest)
+        logger.info(
+            f"Segmento {segment['file']} agregado: {segment['records']} registros "
+            f"({len(manifest['segments'])} segmentos)"
+        )
+        return segment
+
+    def scan(self) -> Iterator[Dict]:
+        """Scan ordenado por id del dataset completo (merge de segmentos)"""
+        for attempt in range(SCAN_RETRIES):
+            segments = self.segments()
+            stack = ExitStack()
+            try:
+                # Abrir todo al inicio: una compactación posterior puede borrar
+                # los archivos, pero los descriptores abiertos siguen siendo válidos
+                handles = [
+                    stack.enter_context(open(self.directory / s["file"], "r"))
+                    for s in segments
+                ]
+            except FileNotFoundError:
+                stack.close()
+                if attempt == SCAN_RETRIES - 1:
+                    raise
+                continue
+            with stack:
+                yield from merge_records([_iter_segment(h) for h in handles])
+            return
+
+    def _pick_window(self, segments: List[Dict]) -> List[Dict]:
+        """Primer grupo de segmentos adyacentes del mismo tier a fusionar"""
+        start = 0
+        for end in range(1, len(segments) + 1):
+            if end == len(segments) or segment_tier(
+                segments[end]["size"]
+            ) != segment_tier(segments[start]["size"]):
+                if end - start >= self.min_merge:
+                    return segments[start:end]
+                start = end
+        return []
+
+    def _remove_orphans(self, manifest: Dict) -> None:
+        """Elimina archivos que no figuran en el manifest (fallas previas)"""
+        listed = {s["file"] for s in manifest["segments"]} | {
+            MANIFEST_FILENAME,
+            MANIFEST_LOCK_FILENAME,
+            COMPACT_LOCK_FILENAME,
+        }
+        for path in self.directory.iterdir():
+            if path.name not in listed:
+                path.unlink(missing_ok=True)
+
+    def compact(self) -> int:
+        """
+        Fusiona segmentos por tiers de tamaño hasta que ningún tier tenga
+        `min_merge` segmentos adyacentes; devuelve la cantidad de merges
+        """
+        if not self.manifest_path.exists():
+            return 0
+        # Una sola compactación a la vez entre procesos: otra compactación
+        # borraría el `.tmp` o el segmento en curso de esta como huérfano
+        with _file_lock(self.directory / COMPACT_LOCK_FILENAME):
+            return self._compact()
+
+    def _compact(self) -> int:
+        merges = 0
+        with self._manifest_lock():
+            self._remove_orphans(self._load_manifest())
+        while True:
+            with self._manifest_lock():
+                window = self._pick_window(self.segments())
+            if not window:
+                return merges
+            # Los segmentos son inmutables: el merge corre sin el lock del
+            # manifest y solo el reemplazo es exclusivo (add solo agrega al final)
+            seq_min, seq_max = window[0]["seq_min"], window[-1]["seq_max"]
+            path = self.directory / segment_filename(seq_min, seq_max)
+            with ExitStack() as stack:
+                handles = [
+                    stack.enter_context(open(self.directory / s["file"], "r"))
+                    for s in window
+                ]
+                merged = _write_segment(
+                    path, merge_records([_iter_segment(h) for h in handles])
+                )
+            merged.update({"seq_min": seq_min, "seq_max": seq_max, "version": None})
+            with self._manifest_lock():
+                manifest = self._load_manifest()
+                files = [s["file"] for s in manifest["segments"]]
+                start = files.index(window[0]["file"])
+                manifest["segments"][start : start + len(window)] = [merged]
+                self._save_manifest(manifest)
+            for segment in window:
+                (self.directory / segment["file"]).unlink(missing_ok=True)
+            merges += 1
+            logger.info(
+                f"Compactados {len(window)} segmentos en {merged['file']}: "
+                f"{merged['records']} registros"
+            )
+
+    def _compact_guarded(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Error en compactación de segmentos: {e}")
+
+    def compact_async(self) -> None:
+        """Lanza la compactación en un hilo si no hay una en curso"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        # Hilo no daemon: el proceso espera a que termine el merge en curso
+        self._compactor = threading.Thread(
+            target=self._compact_guarded, name="segment-compaction"
+        )
+        self._compactor.start()
+
+    def wait(self) -> None:
+        """Espera a la compactación en segundo plano, si existe"""
+        if self._compactor is not None:
+            self._compactor.join()
+
+    @classmethod
+    def from_config(cls, output_dir: Path) -> "SegmentStore":
+        """Segmentos en OUTPUT_DIR/segments según SEGMENT_MIN_MERGE"""
+        from pipeline import config
+
+        return cls(Path(output_dir) / SEGMENTS_DIRNAME, config.SEGMENT_MIN_MERGE)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from pipeline.config import LOG_LEVEL, OUTPUT_DIR
+
+    logging.basicConfig(level=getattr(logging, LOG_LEVEL))
+    if len(sys.argv) < 2 or sys.argv[1] not in ("scan", "compact", "stats"):
+        print("Uso: python -m pipeline.publisher.segments scan|compact|stats [dir]")
+        exit(1)
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else OUTPUT_DIR
+    store = SegmentStore.from_config(Path(output_dir))
+    if sys.argv[1] == "scan":
+        for record in store.scan():
+            sys.stdout.write(json.dumps(record, sort_keys=True) + "\n")
+    elif sys.argv[1] == "compact":
+        print(f"Merges realizados: {store.compact()}")
+    else:
+        for segment in store.segments():
+            print(
+                f"{segment['file']}\ttier={segment_tier(segment['size'])}\t"
+                f"registros={segment['records']}\tbytes={segment['size']}"
+            )
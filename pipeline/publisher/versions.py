@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIRNAME = "versions"
+CURRENT_LINK = "current"
+DATA_FILENAME = "data.json"
+METADATA_FILENAME = "metadata.json"
+
+
+class VersionStore:
+    """
+    Publicaciones versionadas en directorios por versión con un enlace
+    simbólico `current` que se reemplaza atómicamente.
+    Los datos se enlazan (hardlink), nunca se copian.
+    """
+
+    def __init__(
+        self, output_dir: str | Path, keep_versions: int = 0, retention_days: int = 0
+    ):
+        self.output_dir = Path(output_dir)
+        self.versions_dir = self.output_dir / VERSIONS_DIRNAME
+        self.current_link = self.output_dir / CURRENT_LINK
+        self.keep_versions = keep_versions
+        self.retention_days = retention_days
+
+    def new_version_id(self) -> str:
+        """Genera un id de versión ordenable, siempre mayor que el último"""
+        base = datetime.now().strftime("%Y%m%d_%H%M%S")
+        versions = self.list_versions()
+        latest = versions[-1] if versions else ""
+        version = base
+        suffix = 1
+        while version <= latest or (self.versions_dir / version).exists():
+            version = f"{base}_{suffix:03d}"
+            suffix += 1
+        return version
+
+    def version_dir(self, version: str) -> Path:
+        """Directorio de una versión"""
+        return self.versions_dir / version
+
+    def add(self, version: str, data_file: Path) -> Path:
+        """Enlaza el archivo de datos dentro del directorio de la versión"""
+        target_dir = self.version_dir(version)
+        target_dir.mkdir(parents=True, exist_ok=False)
+        target = target_dir / DATA_FILENAME
+        try:
+            os.link(data_file, target)
+        except OSError as e:
+            # Sistemas de archivos sin hardlinks: enlace simbólico relativo
+            logger.warning(f"Hardlink no soportado ({e}), usando enlace simbólico")
+            os.symlink(os.path.relpath(data_file, target_dir), target)
+        logger.info(f"Versión {version} creada en {target_dir}")
+        return target
+
+    def set_current(self, version: str) -> None:
+        """Apunta `current` a la versión indicada con un rename atómico"""
+        tmp_link = self.output_dir / f".{CURRENT_LINK}.tmp"
+        if tmp_link.is_symlink() or tmp_link.exists():
+            tmp_link.unlink()
+        os.symlink(os.path.join(VERSIONS_DIRNAME, version), tmp_link)
+        os.replace(tmp_link, self.current_link)
+        logger.info(f"Versión actual: {version}")
+
+    def current_version(self) -> Optional[str]:
+        """Id de la versión actual, sin listar directorios"""
+        if not self.current_link.is_symlink():
+            return None
+        return Path(os.readlink(self.current_link)).name
+
+    def current_data_file(self) -> Optional[Path]:
+        """Archivo de datos de la versión actual"""
+        version = self.current_version()
+        if version is None:
+            return None
+        return self.version_dir(version) / DATA_FILENAME
+
+    def list_versions(self) -> List[str]:
+        """Versiones existentes ordenadas de la más antigua a la más reciente"""
+        if not self.versions_dir.exists():
+            return []
+        return sorted(p.name for p in self.versions_dir.iterdir() if p.is_dir())
+
+    def previous_version(self, version: str) -> Optional[str]:
+        """Versión inmediatamente anterior a la indicada"""
+        older = [v for v in self.list_versions() if v < version]
+        return older[-1] if older else None
+
+    def _published_at(self, version: str) -> datetime:
+        """Fecha de publicación de una versión (metadata o mtime)"""
+        metadata_file = self.version_dir(version) / METADATA_FILENAME
+        try:
+            with open(metadata_file, "r") as f:
+                return datetime.fromisoformat(json.load(f)["published_at"])
+        except (OSError, KeyError, ValueError):
+            return datetime.fromtimestamp(self.version_dir(version).stat().st_mtime)
+
+    def _linked_files(self, version: str) -> List[Path]:
+        """Archivos publicados fuera del directorio de la versión"""
+        metadata_file = self.version_dir(version) / METADATA_FILENAME
+        try:
+            with open(metadata_file, "r") as f:
+                published_file = json.load(f).get("published_file")
+        except (OSError, ValueError):
+            return []
+        if not published_file:
+            return []
+        path = self.output_dir / published_file
+        return [path, path.with_name(path.name + ".sha256")]
+
+    def gc(self) -> List[str]:
+        """
+        Elimina versiones fuera de la política de retención: se conservan las
+        `keep_versions` más recientes y, si se configura, solo las más nuevas
+        que `retention_days`. La versión actual nunca se elimina.
+        """
+        versions = self.list_versions()
+        current = self.current_version()
+        keep = set(versions)
+        if self.keep_versions > 0:
+            keep = set(versions[-self.keep_versions :])
+        if self.retention_days > 0:
+            limit = datetime.now() - timedelta(days=self.retention_days)
+            keep = {v for v in keep if self._published_at(v) >= limit}
+        if current is not None:
+            keep.add(current)
+
+        removed = []
+        for version in versions:
+            if version in keep:
+                continue
+            for path in self._linked_files(version):
+                if path.exists():
+                    path.unlink()
+            shutil.rmtree(self.version_dir(version))
+            removed.append(version)
+
+        if removed:
+            logger.info(f"GC de versiones: eliminadas {len(removed)} ({removed})")
+        return removed
+
+
+if __name__ == "__main__":
+    from pipeline.config import (
+        LOG_LEVEL,
+        OUTPUT_DIR,
+        PUBLISH_KEEP_VERSIONS,
+        PUBLISH_RETENTION_DAYS,
+    )
+
+    logging.basicConfig(level=getattr(logging, LOG_LEVEL))
+    store = VersionStore(OUTPUT_DIR, PUBLISH_KEEP_VERSIONS, PUBLISH_RETENTION_DAYS)
+    print(f"Versiones eliminadas: {store.gc()}")
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import contextvars
+import heapq
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
+
+from pipeline import config
+from pipeline.contracts.adapters import validate_records
+from pipeline.contracts.schemas import OutputData, TransformedRecord
+from pipeline.ingestor.main import Ingestor
+from pipeline.metrics import MetricsRegistry, StageMetrics, export_metrics
+from pipeline.publisher.main import Publisher
+from pipeline.tracing import Tracer
+from pipeline.transformer.main import Transformer
+from pipeline.transformer.spill import SPILL_DIRNAME, SpillBuffer
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Marca de fin de flujo entre etapas
+_END = object()
+
+
+class _StageError:
+    """Excepción de una etapa propagada por la cola hasta el escritor"""
+
+    def __init__(self, stage: str, error: Exception):
+        self.stage = stage
+        self.error = error
+
+
+class PipelineRunner:
+    """
+    Ejecuta Ingestor → Transformer → Publisher en un solo proceso, pasando
+    los DataFrames entre etapas sin serializar a JSON intermedio.
+    """
+
+    def __init__(
+        self,
+        input_dir: Optional[str] = None,
+        intermediate_dir: Optional[str] = None,
+        output_dir: Optional[str] = None,
+        persist_intermediate: Optional[bool] = None,
+        persist_transformed: Optional[bool] = None,
+        streaming: Optional[bool] = None,
+        queue_size: Optional[int] = None,
+    ):
+        # Un único registro de métricas para las tres etapas
+        self.metrics = MetricsRegistry()
+        self.ingestor = Ingestor(
+            input_dir=input_dir, output_dir=intermediate_dir, metrics=self.metrics
+        )
+        self.transformer = Transformer(
+            input_dir=str(self.ingestor.output_dir),
+            output_dir=output_dir,
+            metrics=self.metrics,
+        )
+        self.publisher = Publisher(
+            output_dir=str(self.transformer.output_dir), metrics=self.metrics
+        )
+        # Un único archivo de spans para las tres etapas
+        self.tracer = Tracer.from_config(self.transformer.output_dir)
+        for stage in (self.ingestor, self.transformer, self.publisher):
+            stage.tracer = self.tracer
+        self.persist_intermediate = (
+            config.PERSIST_INTERMEDIATE
+            if persist_intermediate is None
+            else persist_intermediate
+        )
+        self.persist_transformed = (
+            config.PERSIST_TRANSFORMED
+            if persist_transformed is None
+            else persist_transformed
+        )
+        self.streaming = config.PIPELINE_STREAMING if streaming is None else streaming
+        self.queue_size = max(1, queue_size or config.PIPELINE_QUEUE_SIZE)
+
+    def _iter_frames(
+        self, new_frames: Dict[str, pd.DataFrame]
+    ) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Frames recién ingestados más los intermedios ya persistidos de
+        ejecuciones anteriores, en el mismo orden que el Transformer (por hash)
+        """
+        persisted = self.transformer.iter_input_frames(exclude=set(new_frames))
+        frames = list(new_frames.items()) + list(persisted)
+        return iter(sorted(frames, key=lambda item: item[0]))
+
+    def _ingest_stage(self, out_queue: queue.Queue) -> None:
+        """Hilo de ingesta: un DataFrame por archivo, con backpressure"""
+        try:
+            seen = set()
+            for name, df in self.ingestor.iter_frames(
+                persist=self.persist_intermediate
+            ):
+                seen.add(name)
+                out_queue.put((name, df))
+            for name, df in self.transformer.iter_input_frames(exclude=seen):
+                out_queue.put((name, df))
+        except Exception as e:
+            out_queue.put(_StageError("ingesta", e))
+        finally:
+            out_queue.put(_END)
+
+    def _transform_stage(self, in_queue: queue.Queue, out_queue: queue.Queue) -> None:
+        """Hilo de transformación: lotes ordenados por id hacia el escritor"""
+        item = None
+        try:
+            while True:
+                item = in_queue.get()
+                if item is _END or isinstance(item, _StageError):
+                    if item is not _END:
+                        out_queue.put(item)
+                    break
+                profiler = self.transformer.profiler
+                # Misma captura por archivo que el modo por lotes: los pasos
+                # del prototipo solo se perfilan dentro de ella (en este hilo)
+                with profiler.capture(f"transformer_{item[0]}", profiler.sample_file()):
+                    batches = self._transform_item(*item)
+                for batch in batches:
+                    out_queue.put(batch)
+        except Exception as e:
+            out_queue.put(_StageError("transformación", e))
+        finally:
+            # Drenar la cola de entrada para no bloquear a la ingesta
+            while item is not _END:
+                item = in_queue.get()
+            out_queue.put(_END)
+
+    def _transform_item(
+        self, frame_name: str, frame: pd.DataFrame
+    ) -> List[Tuple[str, List[Dict]]]:
+        """Lotes transformados de un frame, uno por archivo de origen"""
+        batches = []
+        for name, df in self.transformer.split_sources(frame_name, frame):
+            try:
+                df_transformed = self.transformer.transform_frame(
+                    self.transformer.deduplicate(name, df)
+                )
+                batches.append((name, df_transformed.to_dict("records")))
+                logger.info(f"Transformado: {name}")
+            except Exception as e:
+                logger.error(f"Error transformando {name}: {str(e)}")
+        return batches
+
+    def _stream_output(self, start_time: float) -> Union[OutputData, Path, None]:
+        """
+        Etapas solapadas: ingesta y transformación en hilos conectados por
+        colas acotadas; el escritor hace un merge final por id en el mismo
+        orden que el modo por lotes.
+
+        Sin MEMORY_BUDGET el escritor valida cada lote al llegar y retiene la
+        salida completa. Con presupuesto acumula los lotes en un SpillBuffer
+        que vuelca runs ordenados a disco al superarlo; si hubo spill la salida
+        se escribe en streaming desde el merge a `transformed_*.json` y se
+        devuelve su ruta, así la memoria queda acotada por las colas, el
+        buffer y el merge.
+        """
+        frames_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        batches_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        # Cada hilo hereda el span activo para que sus spans cuelguen del run
+        workers = [
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._ingest_stage, frames_queue),
+                daemon=True,
+            ),
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._transform_stage, frames_queue, batches_queue),
+                daemon=True,
+            ),
+        ]
+        for worker in workers:
+            worker.start()
+
+        budget = self.transformer.memory_budget
+        buffer = (
+            SpillBuffer(self.transformer.output_dir / SPILL_DIRNAME, budget)
+            if budget.enabled
+            else None
+        )
+        try:
+            batches, failure = self._collect_batches(batches_queue, buffer)
+            for worker in workers:
+                worker.join()
+            if failure is not None:
+                logger.error(f"Fallo en la etapa de {failure.stage}: {failure.error}")
+                raise failure.error
+            if buffer is not None:
+                return self._buffered_output(buffer, start_time)
+        finally:
+            if buffer is not None:
+                buffer.cleanup()
+        if not batches:
+            return None
+
+        # Lotes en orden de nombre: el merge estable reproduce el orden por lotes
+        batches.sort(key=lambda batch: batch[0])
+        merged = list(
+            heapq.merge(*(records for _, records in batches), key=lambda r: r.id)
+        )
+        return self.transformer.assemble_output(merged, start_time)
+
+    def _collect_batches(
+        self, batches_queue: queue.Queue, buffer: Optional[SpillBuffer]
+    ) -> Tuple[List[Tuple[str, List[TransformedRecord]]], Optional[_StageError]]:
+        """
+        Escritor: consume los lotes hasta el fin del flujo y devuelve el
+        primer fallo de cualquier etapa. Sin `buffer` retiene los lotes
+        validados; con `buffer` los acumula sin validar (la escritura final
+        valida por lotes) y puede volcarlos a disco.
+        """
+        batches: List[Tuple[str, List[TransformedRecord]]] = []
+        failure: Optional[_StageError] = None
+        while True:
+            item = batches_queue.get()
+            if item is _END:
+                break
+            if isinstance(item, _StageError):
+                failure = failure or item
+                continue
+            if failure is not None:
+                # Seguir drenando para que las etapas anteriores terminen
+                continue
+            name, records = item
+            try:
+                if buffer is not None:
+                    buffer.extend([(name, record) for record in records])
+                else:
+                    batches.append((name, validate_records(records)))
+            except Exception as e:
+                failure = _StageError("validación", e)
+        return batches, failure
+
+    def _buffered_output(
+        self, buffer: SpillBuffer, start_time: float
+    ) -> Union[OutputData, Path, None]:
+        """Salida en memoria si el buffer no volcó a disco; si no, en streaming"""
+        if not buffer.spilled and not buffer.records:
+            return None
+        if not buffer.spilled:
+            all_records = [record for _, record in buffer.iter_sorted()]
+            return self.transformer.build_output(all_records, start_time)
+        return self.transformer.write_output_stream(buffer.iter_sorted(), start_time)
+
+    def run(self) -> bool:
+        """Ejecuta el pipeline completo en memoria y exporta sus métricas"""
+        run_metrics = StageMetrics(self.metrics, "pipeline")
+        try:
+            with self.tracer.span(
+                "pipeline.run", **{"streaming": self.streaming}
+            ) as span:
+                success = self._run()
+                span.set_attribute("success", success)
+                return success
+        finally:
+            run_metrics.finish()
+            export_metrics(self.metrics, "pipeline", self.transformer.output_dir)
+
+    def _run(self) -> bool:
+        """Ingesta, transformación y publicación con deduplicación global opcional"""
+        success = False
+        self.transformer.begin_dedup()
+        try:
+            success = self._run_stages()
+            return success
+        finally:
+            # Los ids reclamados solo se confirman si la publicación terminó
+            self.transformer.finish_dedup(success)
+
+    def _run_stages(self) -> bool:
+        """Ingesta, transformación y publicación (por lotes o en streaming)"""
+        start_time = time.time()
+        logger.info("Iniciando pipeline en proceso")
+
+        if self.streaming:
+            output_data = self._stream_output(start_time)
+        else:
+            new_frames = self.ingestor.ingest_frames(persist=self.persist_intermediate)
+            output_data = self.transformer.transform_frames(
+                self._iter_frames(new_frames), start_time
+            )
+        if output_data is None:
+            logger.error("No hay registros para publicar")
+            return False
+        if isinstance(output_data, Path):
+            # Salida ya escrita en streaming desde el merge de runs en disco
+            return self.publisher.publish()
+
+        if self.persist_transformed:
+            self.transformer.write_output(output_data, start_time)
+            return self.publisher.publish()
+        return self.publisher.publish_data(output_data, source_name="in-memory")
@@ -0,0 +1,137 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+TRACES_DIRNAME = "traces"
+SPANS_FILENAME = "spans.jsonl"
+
+# Span activo del contexto actual (hilo o tarea): padre de los spans nuevos
+_current_span: contextvars.ContextVar = contextvars.ContextVar(
+    "pipeline_current_span", default=None
+)
+
+
+def _attribute_value(value: Any) -> dict:
+    """Valor de atributo con la forma de OTLP/JSON"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple, set)):
+        return {"arrayValue": {"values": [_attribute_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def current_span() -> Optional["Span"]:
+    return _current_span.get()
+
+
+class Span:
+    """Span con ids, padre, duración y atributos (compatible con OTLP/JSON)"""
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        parent = _current_span.get()
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent else ""
+        self.attributes = dict(attributes)
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.tracer.export(self)
+        return False
+
+    def to_dict(self) -> dict:
+        status = {"code": "STATUS_CODE_OK"}
+        if self.error:
+            status = {"code": "STATUS_CODE_ERROR", "message": self.error}
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _attribute_value(value)}
+                for key, value in self.attributes.items()
+                if value is not None
+            ],
+            "status": status,
+        }
+
+
+class _NoopSpan:
+    """Span vacío cuando el tracing está deshabilitado"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Crea spans y los exporta como JSON lines (un span por línea)"""
+
+    def __init__(self, output_file: Optional[Path] = None):
+        self.output_file = Path(output_file) if output_file else None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, output_dir: Path) -> "Tracer":
+        """Tracer según TRACING_ENABLED y TRACING_DIR (output_dir/traces)"""
+        from pipeline import config
+
+        if not config.TRACING_ENABLED:
+            return cls()
+        directory = Path(config.TRACING_DIR) if config.TRACING_DIR else None
+        directory = directory or Path(output_dir) / TRACES_DIRNAME
+        return cls(directory / SPANS_FILENAME)
+
+    @property
+    def enabled(self) -> bool:
+        return self.output_file is not None
+
+    def span(self, name: str, **attributes):
+        """Span hijo del span activo; vacío si el tracing está deshabilitado"""
+        if self.output_file is None:
+            return _NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False) + "\n"
+        with self._lock:
+            self.output_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.output_file, "a") as f:
+                f.write(line)
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTS_DIRNAME = ".checkpoints"
+PROGRESS_FILENAME = "progress.jsonl"
+
+# Registro transformado junto con el nombre de su archivo de origen
+TaggedRecord = Tuple[str, Dict]
+
+
+class TransformCheckpoint:
+    """
+    Checkpoints por archivo de una transformación: cada archivo intermedio
+    completado deja un lote `<archivo>.jsonl` y una línea en `progress.jsonl`
+    (append-only) dentro de `OUTPUT_DIR/.checkpoints/<run_key>/`.
+    """
+
+    def __init__(self, output_dir: str | Path, input_names: List[str]):
+        self.run_key = self.compute_run_key(input_names)
+        self.root = Path(output_dir) / CHECKPOINTS_DIRNAME
+        self.directory = self.root / self.run_key
+        self.progress_path = self.directory / PROGRESS_FILENAME
+
+    @staticmethod
+    def compute_run_key(input_names: List[str]) -> str:
+        """Clave de ejecución: los mismos archivos de entrada reanudan el mismo run"""
+        content = "\n".join(sorted(input_names)).encode("utf-8")
+        return hashlib.sha256(content).hexdigest()[:16]
+
+    def _batch_path(self, name: str) -> Path:
+        return self.directory / f"{name}.jsonl"
+
+    def save(self, name: str, records: List[TaggedRecord]) -> None:
+        """Persiste el lote de un archivo completado y registra el progreso"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        batch_path = self._batch_path(name)
+        tmp_path = batch_path.with_name(batch_path.name + ".tmp")
+        sha256_hash = hashlib.sha256()
+        with open(tmp_path, "wb") as f:
+            for source, record in records:
+                line = (json.dumps([source, record]) + "\n").encode("utf-8")
+                f.write(line)
+                sha256_hash.update(line)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, batch_path)
+
+        entry = {
+            "file": name,
+            "records": len(records),
+            "sha256": sha256_hash.hexdigest(),
+        }
+        with open(self.progress_path, "a") as f:
+            f.write(json.dumps(entry, sort_keys=True) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_progress(self) -> List[Dict]:
+        """Entradas de progreso válidas (ignora una última línea truncada)"""
+        if not self.progress_path.exists():
+            return []
+        entries = []
+        with open(self.progress_path, "r") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning("Línea de progreso truncada ignorada")
+        return entries
+
+    def load(self) -> Dict[str, List[TaggedRecord]]:
+        """Lotes de los archivos ya completados, verificados por hash"""
+        completed = {}
+        for entry in self._read_progress():
+            batch_path = self._batch_path(entry["file"])
+            if not batch_path.exists():
+                continue
+            content = batch_path.read_bytes()
+            if hashlib.sha256(content).hexdigest() != entry["sha256"]:
+                logger.warning(f"Checkpoint corrupto, se reprocesa: {entry['file']}")
+                continue
+            completed[entry["file"]] = [
+                tuple(json.loads(line)) for line in content.splitlines() if line
+            ]
+        if completed:
+            logger.info(
+                f"Reanudando desde checkpoint {self.run_key}: "
+                f"{len(completed)} archivos completados"
+            )
+        return completed
+
+    def clear(self) -> None:
+        """Elimina los checkpoints del run tras una salida exitosa"""
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+        if self.root.exists() and not any(self.root.iterdir()):
+            self.root.rmdir()
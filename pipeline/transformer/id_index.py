@@ -0,0 +1,368 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ID_INDEX_DIRNAME = ".id_index"
+MANIFEST_FILENAME = "manifest.json"
+# Registro del índice exacto: id y dueño (fingerprint del archivo de origen)
+ENTRY_DTYPE = np.dtype([("id", "<i8"), ("owner", "<u8")])
+FALSE_POSITIVE_RATE = 0.01
+# Runs confirmados a partir de los cuales se compactan en uno solo
+MAX_RUNS = 8
+# Entradas por bloque en merges y reconstrucción del Bloom filter
+MERGE_CHUNK = 1 << 20
+# Archivos propios del índice (ver `_next_name`); ID_INDEX_DIR es configurable
+# y nada fuera de estos nombres se elimina
+_INDEX_FILE = re.compile(r"^(pending|run|bloom)_\d{6}\.bin(\.tmp)?$")
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def owner_tag(source: str) -> int:
+    """Fingerprint de 64 bits del nombre del archivo de origen"""
+    return int.from_bytes(
+        hashlib.blake2b(source.encode(), digest_size=8).digest(), "little"
+    )
+
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        z = values + _GOLDEN
+        z = (z ^ (z >> np.uint64(30))) * _MIX_1
+        z = (z ^ (z >> np.uint64(27))) * _MIX_2
+        return z ^ (z >> np.uint64(31))
+
+
+class BloomFilter:
+    """Bloom filter vectorizado sobre un archivo mapeado en memoria"""
+
+    def __init__(self, path: Path, num_bits: int, num_hashes: int):
+        self.path = Path(path)
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        size = (num_bits + 7) // 8
+        if not self.path.exists() or self.path.stat().st_size != size:
+            with open(self.path, "wb") as f:
+                f.truncate(size)
+        self.bits = np.memmap(self.path, dtype=np.uint8, mode="r+", shape=(size,))
+
+    @staticmethod
+    def parameters(capacity: int) -> Tuple[int, int]:
+        """Bits y funciones hash para `capacity` ids con FALSE_POSITIVE_RATE"""
+        capacity = max(1, capacity)
+        num_bits = int(-capacity * math.log(FALSE_POSITIVE_RATE) / math.log(2) ** 2)
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return max(64, num_bits), num_hashes
+
+    def _positions(self, ids: np.ndarray) -> np.ndarray:
+        """Matriz (k, n) de posiciones por doble hashing"""
+        values = ids.astype(np.int64).view(np.uint64)
+        h1 = _splitmix64(values)
+        h2 = _splitmix64(values ^ _MIX_2) | np.uint64(1)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)[:, None]
+        with np.errstate(over="ignore"):
+            return (h1 + steps * h2) % np.uint64(self.num_bits)
+
+    def add(self, ids: np.ndarray) -> None:
+        if len(ids) == 0:
+            return
+        positions = self._positions(ids).ravel()
+        masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        np.bitwise_or.at(self.bits, (positions >> np.uint64(3)).astype(np.intp), masks)
+
+    def might_contain(self, ids: np.ndarray) -> np.ndarray:
+        """False = con certeza ausente; True = posiblemente presente"""
+        if len(ids) == 0:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(ids)
+        bytes_ = self.bits[(positions >> np.uint64(3)).astype(np.intp)]
+        bits = (bytes_ >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return bits.all(axis=0)
+
+    def flush(self) -> None:
+        self.bits.flush()
+
+
+def _sorted_entries(ids: np.ndarray, owner: int) -> np.ndarray:
+    entries = np.empty(len(ids), dtype=ENTRY_DTYPE)
+    entries["id"] = ids
+    entries["owner"] = owner
+    entries.sort(order="id", kind="stable")
+    return entries
+
+
+def _merge_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    merged = np.concatenate([a, b])
+    return merged[np.argsort(merged["id"], kind="stable")]
+
+
+def _lookup(run: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Búsqueda binaria vectorizada: (encontrado, dueño) por id"""
+    if len(run) == 0:
+        return np.zeros(len(ids), dtype=bool), np.zeros(len(ids), dtype=np.uint64)
+    keys = run["id"]
+    positions = np.searchsorted(keys, ids)
+    clipped = np.minimum(positions, len(run) - 1)
+    found = (positions < len(run)) & (keys[clipped] == ids)
+    return found, np.asarray(run["owner"][clipped])
+
+
+def _write_run(path: Path, entries: np.ndarray) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(entries.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _open_run(path: Path) -> np.ndarray:
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=ENTRY_DTYPE)
+    return np.memmap(path, dtype=ENTRY_DTYPE, mode="r")
+
+
+def _merge_runs(first: np.ndarray, second: np.ndarray, target: Path) -> int:
+    """Merge por bloques de dos runs ordenados con memoria acotada"""
+    tmp_path = target.with_name(target.name + ".tmp")
+    i = j = total = 0
+    with open(tmp_path, "wb") as f:
+        while i < len(first) or j < len(second):
+            chunk_a = np.asarray(first[i : i + MERGE_CHUNK])
+            chunk_b = np.asarray(second[j : j + MERGE_CHUNK])
+            if len(chunk_a) and len(chunk_b):
+                # Solo es seguro emitir hasta el menor de los dos últimos ids
+                bound = min(chunk_a["id"][-1], chunk_b["id"][-1])
+                chunk_a = chunk_a[: np.searchsorted(chunk_a["id"], bound, "right")]
+                chunk_b = chunk_b[: np.searchsorted(chunk_b["id"], bound, "right")]
+            merged = _merge_sorted(chunk_a, chunk_b)
+            f.write(merged.tobytes())
+            i += len(chunk_a)
+            j += len(chunk_b)
+            total += len(merged)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, target)
+    return total
+
+
+class IdIndex:
+    """
+    Índice persistente de ids para deduplicación global (keep-first).
+
+    Cada id pertenece al primer archivo de origen que lo reclamó. Un Bloom
+    filter mapeado en memoria responde "seguro nuevo" sin tocar disco; los
+    posibles positivos se confirman con búsqueda binaria en runs ordenados
+    de (id, dueño). Los reclamos de la ejecución en curso quedan pendientes
+    hasta `commit`: un fallo antes de confirmar no altera el índice.
+    """
+
+    def __init__(
+        self, directory: Path, capacity: int = 10_000_000, buffer_ids: int = 1_000_000
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.buffer_ids = max(1, buffer_ids)
+        self.manifest = self._load_manifest(capacity)
+        self._discard_uncommitted()
+        bloom = self.manifest["bloom"]
+        self.bloom = BloomFilter(
+            self.directory / bloom["file"], bloom["bits"], bloom["hashes"]
+        )
+        self.runs: List[np.ndarray] = [
+            _open_run(self.directory / name) for name in self.manifest["runs"]
+        ]
+        # Reclamos pendientes: runs en disco y bloques ordenados en memoria
+        self.pending_files: List[str] = []
+        self.pending_runs: List[np.ndarray] = []
+        self.buffer: List[np.ndarray] = []
+        self.pending_count = 0
+
+    def _load_manifest(self, capacity: int) -> dict:
+        path = self.directory / MANIFEST_FILENAME
+        if path.exists():
+            with open(path, "r") as f:
+                return json.load(f)
+        num_bits, num_hashes = BloomFilter.parameters(capacity)
+        return {
+            "bloom": {
+                "file": "bloom_000000.bin",
+                "bits": num_bits,
+                "hashes": num_hashes,
+                "capacity": capacity,
+            },
+            "runs": [],
+            "count": 0,
+            "next_seq": 1,
+        }
+
+    def _discard_uncommitted(self) -> None:
+        """Elimina runs pendientes o temporales de una ejecución interrumpida"""
+        referenced = set(self.manifest["runs"]) | {self.manifest["bloom"]["file"]}
+        for path in self.directory.iterdir():
+            if path.name == MANIFEST_FILENAME + ".tmp" or (
+                _INDEX_FILE.match(path.name) and path.name not in referenced
+            ):
+                path.unlink()
+
+    def _next_name(self, prefix: str) -> str:
+        seq = self.manifest["next_seq"]
+        self.manifest["next_seq"] = seq + 1
+        return f"{prefix}_{seq:06d}.bin"
+
+    @property
+    def count(self) -> int:
+        """Ids confirmados más reclamos pendientes"""
+        return self.manifest["count"] + self.pending_count
+
+    def _find(self, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        found = np.zeros(len(ids), dtype=bool)
+        owners = np.zeros(len(ids), dtype=np.uint64)
+        for run in self.runs + self.pending_runs + self.buffer:
+            missing = ~found
+            if not missing.any():
+                break
+            hit, run_owners = _lookup(run, ids[missing])
+            index = np.flatnonzero(missing)[hit]
+            found[index] = True
+            owners[index] = run_owners[hit]
+        return found, owners
+
+    def claim(self, source: str, ids: np.ndarray) -> np.ndarray:
+        """
+        Máscara de filas a conservar: ids nuevos (que pasan a pertenecer a
+        `source`) o ya pertenecientes a `source`; se descartan los reclamados
+        antes por otro archivo
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        owner = np.uint64(owner_tag(source))
+        unique_ids = np.unique(ids)
+        maybe = self.bloom.might_contain(unique_ids)
+        found = np.zeros(len(unique_ids), dtype=bool)
+        owners = np.zeros(len(unique_ids), dtype=np.uint64)
+        if maybe.any():
+            found[maybe], owners[maybe] = self._find(unique_ids[maybe])
+
+        new_ids = unique_ids[~found]
+        self._add_pending(new_ids, owner)
+        rejected = unique_ids[found & (owners != owner)]
+        return ~np.isin(ids, rejected)
+
+    def _add_pending(self, ids: np.ndarray, owner: np.uint64) -> None:
+        if len(ids) == 0:
+            return
+        self.bloom.add(ids)
+        entries = _sorted_entries(ids, owner)
+        # Bloques en memoria con merge geométrico: O(log n) búsquedas por id
+        while self.buffer and len(self.buffer[-1]) <= len(entries):
+            entries = _merge_sorted(self.buffer.pop(), entries)
+        self.buffer.append(entries)
+        self.pending_count += len(ids)
+        if sum(len(block) for block in self.buffer) >= self.buffer_ids:
+            self._spill_buffer()
+
+    def _spill_buffer(self) -> None:
+        """Vuelca los reclamos en memoria a un run pendiente en disco"""
+        if not self.buffer:
+            return
+        entries = self.buffer.pop()
+        while self.buffer:
+            entries = _merge_sorted(self.buffer.pop(), entries)
+        name = self._next_name("pending")
+        _write_run(self.directory / name, entries)
+        self.pending_files.append(name)
+        self.pending_runs.append(_open_run(self.directory / name))
+
+    def commit(self) -> None:
+        """Confirma los reclamos de la ejecución y compacta si hay muchos runs"""
+        self._spill_buffer()
+        if not self.pending_files:
+            return
+        self.bloom.flush()
+        self.manifest["runs"].extend(self.pending_files)
+        self.manifest["count"] += self.pending_count
+        self.runs.extend(self.pending_runs)
+        self.pending_files, self.pending_runs, self.pending_count = [], [], 0
+        self._save_manifest()
+        if len(self.runs) > MAX_RUNS:
+            self.compact()
+
+    def abort(self) -> None:
+        """Descarta los reclamos pendientes (sus bits en el Bloom son inocuos)"""
+        self.buffer = []
+        self.pending_runs = []
+        for name in self.pending_files:
+            (self.directory / name).unlink(missing_ok=True)
+        self.pending_files = []
+        self.pending_count = 0
+
+    def compact(self) -> None:
+        """
+        Fusiona los runs confirmados en uno y reconstruye el Bloom filter
+        dimensionado al doble de los ids actuales
+        """
+        old_files = list(self.manifest["runs"]) + [self.manifest["bloom"]["file"]]
+        merged_name = self._next_name("run")
+        merged = np.zeros(0, dtype=ENTRY_DTYPE)
+        _write_run(self.directory / merged_name, merged)
+        for run in self.runs:
+            next_name = self._next_name("run")
+            _merge_runs(
+                _open_run(self.directory / merged_name), run, self.directory / next_name
+            )
+            (self.directory / merged_name).unlink()
+            merged_name = next_name
+        merged = _open_run(self.directory / merged_name)
+
+        capacity = max(self.manifest["bloom"]["capacity"], 2 * len(merged))
+        num_bits, num_hashes = BloomFilter.parameters(capacity)
+        bloom_name = self._next_name("bloom")
+        bloom = BloomFilter(self.directory / bloom_name, num_bits, num_hashes)
+        for start in range(0, len(merged), MERGE_CHUNK):
+            bloom.add(np.asarray(merged["id"][start : start + MERGE_CHUNK]))
+        bloom.flush()
+
+        self.manifest["runs"] = [merged_name]
+        self.manifest["bloom"] = {
+            "file": bloom_name,
+            "bits": num_bits,
+            "hashes": num_hashes,
+            "capacity": capacity,
+        }
+        self._save_manifest()
+        self.runs, self.bloom = [merged], bloom
+        for name in old_files:
+            (self.directory / name).unlink(missing_ok=True)
+        logger.info(f"Índice de ids compactado: {len(merged)} ids en un run")
+
+    def _save_manifest(self) -> None:
+        path = self.directory / MANIFEST_FILENAME
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def from_config(cls, output_dir: Path) -> "IdIndex":
+        """Índice en ID_INDEX_DIR (u OUTPUT_DIR/.id_index) según ID_INDEX_*"""
+        from pipeline import config
+
+        directory = Path(config.ID_INDEX_DIR) if config.ID_INDEX_DIR else None
+        return cls(
+            directory or Path(output_dir) / ID_INDEX_DIRNAME,
+            capacity=config.ID_INDEX_CAPACITY,
+            buffer_ids=config.ID_INDEX_BUFFER,
+        )
@@ -1,20 +1,56 @@
+from __future__ import annotations
+
 import copy
 import hashlib
-import json
 import logging
 import time
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List
-
-import pandas as pd
-from pipeline.config import INTERMEDIATE_DIR, LOG_LEVEL, OUTPUT_DIR
-from pipeline.contracts.schemas import OutputData, OutputMetadata, TransformedRecord
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from pipeline import config
+from pipeline.catalog import PublicationCatalog
+from pipeline.contracts.adapters import (
+    dump_records,
+    dump_records_json,
+    load_json,
+    validate_records,
+)
+from pipeline.contracts.schemas import (
+    SOURCE_COLUMN,
+    OutputData,
+    OutputMetadata,
+    TransformedRecord,
+)
+from pipeline.contracts.sidecar import write_sidecar
+from pipeline.contracts.streaming import RecordHasher
+from pipeline.memory import MemoryBudget
+from pipeline.metrics import MetricsRegistry, StageMetrics
+from pipeline.profiling import Profiler
+from pipeline.tracing import Tracer
+from pipeline.transformer.checkpoint import TaggedRecord, TransformCheckpoint
+from pipeline.transformer.id_index import IdIndex
+from pipeline.transformer.spill import SPILL_DIRNAME, SpillBuffer
+
+if TYPE_CHECKING:
+    import pandas as pd
 
-log_level = LOG_LEVEL
-logging.basicConfig(level=getattr(logging, log_level))
 logger = logging.getLogger(__name__)
 
+# Registros validados y serializados por llamada en la escritura streaming
+WRITE_BATCH_SIZE = 1000
+
 
 # Patrón prototype para transformaciones
 class TransformationPrototype:
@@ -31,31 +67,72 @@ class TransformationPrototype:
         """Agregar una transformación al pipeline"""
         self.transformations.append(transform_func)
 
-    def apply(self, data: pd.DataFrame) -> pd.DataFrame:
+    def apply(
+        self,
+        data: pd.DataFrame,
+        profiler: Optional[Profiler] = None,
+        tracer: Optional[Tracer] = None,
+    ) -> pd.DataFrame:
         """Aplicar todas las transformaciones"""
+        tracer = tracer or Tracer()
         result = data.copy()
         for transform in self.transformations:
-            result = transform(result)
+            name = getattr(transform, "__name__", "transform").lstrip("_")
+            with tracer.span(
+                "transformer.step", **{"transform.name": name, "rows.in": len(result)}
+            ) as span:
+                if profiler is not None and profiler.active():
+                    # Cada paso se perfila dentro de la captura de su archivo
+                    with profiler.capture(f"step_{name}"):
+                        result = transform(result)
+                else:
+                    result = transform(result)
+                span.set_attribute("rows.out", len(result))
         return result
 
 
 class Transformer:
     """Componente de transformación determinista"""
 
-    def __init__(self, input_dir: str | None = None, output_dir: str | None = None):
-        self.input_dir = Path(input_dir or INTERMEDIATE_DIR)
-        self.output_dir = Path(output_dir or OUTPUT_DIR)
+    def __init__(
+        self,
+        input_dir: str | None = None,
+        output_dir: str | None = None,
+        checkpoint: bool | None = None,
+        memory_budget: int | None = None,
+        metrics: MetricsRegistry | None = None,
+        global_dedup: bool | None = None,
+    ):
+        self.input_dir = Path(input_dir or config.INTERMEDIATE_DIR)
+        self.output_dir = Path(output_dir or config.OUTPUT_DIR)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.prototype = self._create_prototype()
+        self.catalog = PublicationCatalog(self.output_dir)
+        self.checkpoint = (
+            config.TRANSFORM_CHECKPOINT if checkpoint is None else checkpoint
+        )
+        self.memory_budget = (
+            MemoryBudget.from_config()
+            if memory_budget is None
+            else MemoryBudget(memory_budget)
+        )
+        self.metrics = StageMetrics(metrics, "transformer")
+        self.profiler = Profiler.from_config(self.output_dir)
+        self.tracer = Tracer.from_config(self.output_dir)
+        self.global_dedup = (
+            config.GLOBAL_DEDUP if global_dedup is None else global_dedup
+        )
+        self.id_index: Optional[IdIndex] = None
 
-    def _create_prototype(self) -> TransformationPrototype:
+    @classmethod
+    def _create_prototype(cls) -> TransformationPrototype:
         """Crear el prototipo de transformaciones"""
         prototype = TransformationPrototype()
 
         # Agregar transformaciones deterministas
-        prototype.add_transformation(self._clean_data)
-        prototype.add_transformation(self._normalize_values)
-        prototype.add_transformation(self._add_metadata)
+        prototype.add_transformation(cls._clean_data)
+        prototype.add_transformation(cls._normalize_values)
+        prototype.add_transformation(cls._add_metadata)
 
         return prototype
 
@@ -97,81 +174,381 @@ class Transformer:
     def _calculate_output_hash(self, data: List[Dict]) -> str:
         """Calcular hash determinista de la salida"""
         # Serializar con orden determinista
-        json_str = json.dumps(data, sort_keys=True, ensure_ascii=True)
-        return hashlib.sha256(json_str.encode()).hexdigest()
-
-    def transform(self):
-        """Proceso principal de transformación"""
-        start_time = time.time()
-        json_files = sorted(
+        hasher = RecordHasher()
+        for record in data:
+            hasher.update(record)
+        return hasher.hexdigest()
+
+    def _list_input_files(self) -> List[Path]:
+        """Archivos intermedios a transformar, en orden determinista"""
+        return sorted(
             [
                 f
                 for f in self.input_dir.glob("*.json")
                 if f.name != ".processed_hashes.json"
             ]
         )
-        print(f"{json_files}")
-        logger.info(f"Encontrados {len(json_files)} archivos para transformar")
-
-        all_records = []
 
+    def iter_input_frames(
+        self,
+        exclude: Optional[Set[str]] = None,
+        json_files: Optional[List[Path]] = None,
+    ) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """Cargar los archivos intermedios uno a uno como DataFrames"""
+        import pandas as pd
+
+        exclude = exclude or set()
+        if json_files is None:
+            json_files = self._list_input_files()
         for json_file in json_files:
+            if json_file.stem in exclude:
+                continue
             try:
-                with open(json_file, "r") as f:
-                    data = json.load(f)
-
-                df = pd.DataFrame(data)
-
-                # Aplicar transformaciones usando el prototipo
-                transform_pipeline = self.prototype.clone()
-                df_transformed = transform_pipeline.apply(df)
-
-                # Ordenar por ID para determinismo
-                df_transformed = df_transformed.sort_values("id")
-
-                all_records.extend(df_transformed.to_dict("records"))
-                logger.info(f"Transformado: {json_file.name}")
-
+                with self.metrics.phase("parse"):
+                    df = pd.DataFrame(load_json(json_file.read_bytes()))
+                self.metrics.bytes_read(json_file.stat().st_size)
+                self.metrics.files("processed")
             except Exception as e:
                 logger.error(f"Error transformando {json_file.name}: {str(e)}")
+                self.metrics.files("rejected")
+                continue
+            yield json_file.stem, df
 
-        if all_records:
-            # Ordenar todos los registros por ID para determinismo final
-            all_records.sort(key=lambda x: x["id"])
+    @staticmethod
+    def split_sources(
+        name: str, df: pd.DataFrame
+    ) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Separa un segmento coalescido en un DataFrame por archivo de origen,
+        para que limpieza y normalización se apliquen por archivo
+        """
+        if SOURCE_COLUMN not in df.columns:
+            yield name, df
+            return
+        for source_hash, group in df.groupby(SOURCE_COLUMN, sort=True):
+            yield source_hash, group.drop(columns=[SOURCE_COLUMN])
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Aplicar las transformaciones a un DataFrame"""
+        # Aplicar transformaciones usando el prototipo
+        transform_pipeline = self.prototype.clone()
+        with self.metrics.phase("transform"):
+            df_transformed = transform_pipeline.apply(df, self.profiler, self.tracer)
+        self.metrics.rows("input", len(df))
+
+        # Ordenar por ID para determinismo
+        with self.metrics.phase("sort"):
+            return df_transformed.sort_values("id")
+
+    def begin_dedup(
+        self, restored: Optional[Dict[str, List[TaggedRecord]]] = None
+    ) -> None:
+        """Abre el índice global de ids y reclama los lotes restaurados"""
+        if not self.global_dedup:
+            return
+        import numpy as np
+
+        self.id_index = IdIndex.from_config(self.output_dir)
+        sources: Dict[str, List[int]] = {}
+        for records in (restored or {}).values():
+            for source, rec in records:
+                sources.setdefault(source, []).append(rec["id"])
+        for source, ids in sources.items():
+            self.id_index.claim(source, np.array(ids, dtype=np.int64))
+
+    def finish_dedup(self, success: bool) -> None:
+        """Confirma los ids reclamados si la salida se escribió, o los descarta"""
+        if self.id_index is None:
+            return
+        if success:
+            self.id_index.commit()
+        else:
+            self.id_index.abort()
+        self.id_index = None
+
+    def deduplicate(self, name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Descarta las filas cuyo id ya pertenece a otro archivo de origen
+        (keep-first entre archivos y ejecuciones), antes de limpiar y normalizar
+        """
+        if self.id_index is None or len(df) == 0:
+            return df
+        keep = self.id_index.claim(name, df["id"].to_numpy())
+        dropped = int(len(df) - keep.sum())
+        if dropped:
+            logger.info(f"{dropped} registros con id repetido en otro archivo: {name}")
+            self.metrics.rows("duplicate", dropped)
+            return df[keep]
+        return df
 
-            # Validar y estructurar con Pydantic
-            try:
-                validated_records = [TransformedRecord(**rec) for rec in all_records]
-                records_as_dict = [
-                    rec.model_dump(exclude={"processed_at"})
-                    for rec in validated_records
-                ]
-                output_hash = self._calculate_output_hash(records_as_dict)
-                execution_time = time.time() - start_time
-                generated_at = datetime.now().isoformat()
-
-                output_data = OutputData(
-                    records=validated_records,
-                    metadata=OutputMetadata(
-                        total_records=len(validated_records),
-                        execution_time_seconds=execution_time,
-                        data_hash=output_hash,
-                        generated_at=generated_at,
-                    ),
-                )
+    def build_output(self, all_records: List[Dict], start_time: float) -> OutputData:
+        """Validar y estructurar con Pydantic"""
+        with self.tracer.span(
+            "transformer.validate", **{"records": len(all_records)}
+        ), self.metrics.phase("validate"):
+            validated_records = validate_records(all_records)
+        return self.assemble_output(validated_records, start_time)
+
+    def assemble_output(
+        self, validated_records: List[TransformedRecord], start_time: float
+    ) -> OutputData:
+        """Estructurar registros ya validados (ordenados por id) con su metadata"""
+        records_as_dict = dump_records(validated_records, for_hash=True)
+        with self.tracer.span(
+            "transformer.hash", **{"records": len(records_as_dict)}
+        ) as span, self.metrics.phase("hash"):
+            output_hash = self._calculate_output_hash(records_as_dict)
+            span.set_attribute("data_hash", output_hash)
+        execution_time = time.time() - start_time
+        generated_at = datetime.now().isoformat()
+
+        return OutputData(
+            records=validated_records,
+            metadata=OutputMetadata(
+                total_records=len(validated_records),
+                execution_time_seconds=execution_time,
+                data_hash=output_hash,
+                generated_at=generated_at,
+            ),
+        )
 
-                # Guardar resultado
-                output_file = self.output_dir / f"transformed_{int(start_time)}.json"
-                with open(output_file, "w") as f:
-                    f.write(output_data.model_dump_json(indent=2))
+    def _register_output(
+        self, output_file: Path, sha256: str, size: int, metadata: OutputMetadata
+    ) -> None:
+        """Sidecar con hash de bytes y registro en el catálogo de publicación"""
+        self.metrics.bytes_written(size)
+        self.metrics.rows("output", metadata.total_records)
+        write_sidecar(
+            output_file,
+            sha256=sha256,
+            size=size,
+            metadata=metadata.model_dump(),
+        )
+        self.catalog.register(
+            output_file,
+            data_hash=metadata.data_hash,
+            total_records=metadata.total_records,
+        )
 
-                logger.info(f"Transformación completa. Hash: {output_hash[:16]}...")
-                logger.info(f"Archivo guardado: {output_file}")
+        logger.info(f"Transformación completa. Hash: {metadata.data_hash[:16]}...")
+        logger.info(f"Archivo guardado: {output_file}")
+
+    def write_output(self, output_data: OutputData, start_time: float) -> Path:
+        """Guardar resultado con sidecar y registro en el catálogo"""
+        output_file = self.output_dir / f"transformed_{int(start_time)}.json"
+        with self.tracer.span(
+            "transformer.write", **{"output.file": output_file.name}
+        ) as span, self.metrics.phase("write"):
+            payload = output_data.model_dump_json(indent=2).encode("utf-8")
+            with open(output_file, "wb") as f:
+                f.write(payload)
+            span.set_attribute("output.bytes", len(payload))
+
+        self._register_output(
+            output_file,
+            hashlib.sha256(payload).hexdigest(),
+            len(payload),
+            output_data.metadata,
+        )
+        return output_file
+
+    def write_output_stream(
+        self, tagged_records: Iterator[TaggedRecord], start_time: float
+    ) -> Path:
+        """
+        Escritura incremental con los mismos bytes que `write_output`: valida,
+        hashea y serializa registro a registro sin materializar la salida
+        """
+        output_file = self.output_dir / f"transformed_{int(start_time)}.json"
+        tmp_file = output_file.with_name(output_file.name + ".tmp")
+        hasher = RecordHasher()
+        sha256_hash = hashlib.sha256()
+        size = 0
+
+        def emit(f, text: str) -> None:
+            nonlocal size
+            data = text.encode("utf-8")
+            sha256_hash.update(data)
+            size += len(data)
+            f.write(data)
+
+        try:
+            with self.tracer.span(
+                "transformer.write",
+                **{"output.file": output_file.name, "output.streaming": True},
+            ), self.metrics.phase("write"), open(tmp_file, "wb") as f:
+                emit(f, '{\n  "records": [')
+                records = (rec for _, rec in tagged_records)
+                while True:
+                    batch = list(islice(records, WRITE_BATCH_SIZE))
+                    if not batch:
+                        break
+                    first = hasher.count == 0
+                    validated = validate_records(batch)
+                    for record in dump_records(validated, for_hash=True):
+                        hasher.update(record)
+                    # "[\n  {...}\n]" -> elementos con la sangría del documento
+                    body = dump_records_json(validated, indent=2).decode("utf-8")
+                    body = body[1:-2].replace("\n", "\n  ")
+                    emit(f, ("" if first else ",") + body)
+                if hasher.count == 0:
+                    raise ValueError("La salida debe contener al menos un registro")
+
+                metadata = OutputMetadata(
+                    total_records=hasher.count,
+                    execution_time_seconds=time.time() - start_time,
+                    data_hash=hasher.hexdigest(),
+                    generated_at=datetime.now().isoformat(),
+                )
+                metadata_json = metadata.model_dump_json(indent=2)
+                emit(f, '\n  ],\n  "metadata": ')
+                emit(f, metadata_json.replace("\n", "\n  ") + "\n}")
+            tmp_file.replace(output_file)
+        finally:
+            if tmp_file.exists():
+                tmp_file.unlink()
+
+        self._register_output(output_file, sha256_hash.hexdigest(), size, metadata)
+        return output_file
+
+    def _collect_frames(
+        self,
+        frames: Iterable[Tuple[str, pd.DataFrame]],
+        sink: Callable[[List[TaggedRecord]], None],
+        checkpoint: Optional[TransformCheckpoint] = None,
+    ) -> None:
+        """Transformar cada frame y entregar su lote etiquetado al `sink`"""
+        for frame_name, frame in frames:
+            frame_records = []
+            failed = False
+            with self.tracer.span(
+                "transformer.file",
+                **{"file.name": frame_name, "rows.in": len(frame)},
+            ) as span, self.profiler.capture(
+                f"transformer_{frame_name}", self.profiler.sample_file()
+            ):
+                for name, df in self.split_sources(frame_name, frame):
+                    try:
+                        df_transformed = self.transform_frame(
+                            self.deduplicate(name, df)
+                        )
+                        frame_records.extend(
+                            (name, rec) for rec in df_transformed.to_dict("records")
+                        )
+                        logger.info(f"Transformado: {name}")
+
+                    except Exception as e:
+                        logger.error(f"Error transformando {name}: {str(e)}")
+                        failed = True
+                span.set_attribute("rows.out", len(frame_records))
+
+            sink(frame_records)
+            # Un frame con fallos se vuelve a transformar al reanudar
+            if checkpoint is not None and not failed:
+                checkpoint.save(frame_name, frame_records)
+
+    def transform_frames(
+        self,
+        frames: Iterable[Tuple[str, pd.DataFrame]],
+        start_time: float,
+        checkpoint: Optional[TransformCheckpoint] = None,
+        restored: Optional[Dict[str, List[TaggedRecord]]] = None,
+    ) -> Optional[OutputData]:
+        """Transformar DataFrames (nombre, datos) en memoria y validar la salida"""
+        tagged_records = []
+        for records in (restored or {}).values():
+            tagged_records.extend(records)
+        self._collect_frames(frames, tagged_records.extend, checkpoint)
+
+        if not tagged_records:
+            return None
+
+        # Ordenar por ID (y archivo de origen) para determinismo final,
+        # independiente de cómo se agruparon los archivos en segmentos
+        with self.metrics.phase("sort"):
+            tagged_records.sort(key=lambda x: (x[1]["id"], x[0]))
+        all_records = [rec for _, rec in tagged_records]
+        return self.build_output(all_records, start_time)
+
+    def _transform_bounded(
+        self,
+        frames: Iterable[Tuple[str, pd.DataFrame]],
+        start_time: float,
+        checkpoint: Optional[TransformCheckpoint],
+        restored: Dict[str, List[TaggedRecord]],
+    ) -> Optional[Path]:
+        """
+        Transformación dentro de MEMORY_BUDGET: los lotes se vuelcan a runs
+        ordenados en disco y la salida se escribe en streaming desde el merge
+        """
+        buffer = SpillBuffer(self.output_dir / SPILL_DIRNAME, self.memory_budget)
+        try:
+            for records in restored.values():
+                buffer.extend(records)
+            self._collect_frames(frames, buffer.extend, checkpoint)
+            if not buffer.spilled and not buffer.records:
+                return None
+            if not buffer.spilled:
+                all_records = [rec for _, rec in buffer.iter_sorted()]
+                return self.write_output(
+                    self.build_output(all_records, start_time), start_time
+                )
+            return self.write_output_stream(buffer.iter_sorted(), start_time)
+        finally:
+            buffer.cleanup()
 
-            except Exception as e:
-                logger.error(f"Error de validación o guardado: {e}")
+    def transform(self):
+        """Proceso principal de transformación"""
+        json_files = self._list_input_files()
+        # Los nombres de entrada enlazan la salida con los archivos que la generaron
+        with self.tracer.span(
+            "transformer.transform", **{"input.files": [f.stem for f in json_files]}
+        ) as span, self.profiler.capture("transformer", self.profiler.sample_run()):
+            output_file = self._transform(json_files)
+            if output_file is not None:
+                span.set_attribute("output.file", output_file.name)
+
+    def _transform(self, json_files: List[Path]) -> Optional[Path]:
+        """Transformación de los archivos intermedios pendientes"""
+        start_time = time.time()
+        self.metrics.start()
+        print(f"{json_files}")
+        logger.info(f"Encontrados {len(json_files)} archivos para transformar")
+        output_file = None
+
+        try:
+            checkpoint = None
+            restored = {}
+            if self.checkpoint:
+                checkpoint = TransformCheckpoint(
+                    self.output_dir, [f.stem for f in json_files]
+                )
+                restored = checkpoint.load()
+            self.begin_dedup(restored)
+            frames = self.iter_input_frames(
+                exclude=set(restored), json_files=json_files
+            )
+            if self.memory_budget.enabled:
+                output_file = self._transform_bounded(
+                    frames, start_time, checkpoint, restored
+                )
+            else:
+                output_data = self.transform_frames(
+                    frames, start_time, checkpoint=checkpoint, restored=restored
+                )
+                if output_data is not None:
+                    output_file = self.write_output(output_data, start_time)
+            if checkpoint is not None:
+                checkpoint.clear()
+        except Exception as e:
+            logger.error(f"Error de validación o guardado: {e}")
+        self.finish_dedup(output_file is not None)
+        self.metrics.finish()
+        self.metrics.export(self.output_dir)
+        return output_file
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
     transformer = Transformer()
     transformer.transform()
@@ -0,0 +1,91 @@
+import heapq
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Iterator, List
+
+from pipeline.memory import MemoryBudget, estimate_record_bytes
+from pipeline.transformer.checkpoint import TaggedRecord
+
+logger = logging.getLogger(__name__)
+
+SPILL_DIRNAME = ".spill"
+
+
+def sort_key(tagged: TaggedRecord):
+    """Orden final de la salida: id y luego archivo de origen"""
+    return tagged[1]["id"], tagged[0]
+
+
+class SpillBuffer:
+    """
+    Acumula registros transformados (etiquetados con su origen) y, al superar
+    su parte del presupuesto o ante presión de RSS, los ordena y los vuelca a
+    un run en disco. La lectura final es un merge de los runs ordenados.
+    """
+
+    def __init__(self, directory: Path, budget: MemoryBudget, share: float = 0.5):
+        self.directory = Path(directory)
+        self.budget = budget
+        self.share = share
+        self.records: List[TaggedRecord] = []
+        self.buffered_bytes = 0
+        self.runs: List[Path] = []
+
+    @property
+    def spilled(self) -> bool:
+        return bool(self.runs)
+
+    def extend(self, records: List[TaggedRecord]) -> None:
+        """Agrega un lote; vuelca a disco si excede el presupuesto"""
+        if not records:
+            return
+        self.records.extend(records)
+        self.buffered_bytes += estimate_record_bytes(records[0][1]) * len(records)
+        limit = self.budget.limit * self.share
+        if self.budget.enabled and (
+            self.buffered_bytes > limit or self.budget.under_pressure()
+        ):
+            self.spill()
+
+    def spill(self) -> None:
+        """Ordena el buffer y lo escribe como un run JSON Lines"""
+        if not self.records:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        run_path = self.directory / f"run_{len(self.runs):06d}.jsonl"
+        self.records.sort(key=sort_key)
+        with open(run_path, "w") as f:
+            for source, record in self.records:
+                f.write(json.dumps([source, record]) + "\n")
+        logger.info(
+            f"Spill de {len(self.records)} registros a {run_path.name} "
+            f"(~{self.buffered_bytes} B en memoria)"
+        )
+        self.runs.append(run_path)
+        self.records = []
+        self.buffered_bytes = 0
+
+    @staticmethod
+    def _iter_run(run_path: Path) -> Iterator[TaggedRecord]:
+        with open(run_path, "r") as f:
+            for line in f:
+                source, record = json.loads(line)
+                yield source, record
+
+    def iter_sorted(self) -> Iterator[TaggedRecord]:
+        """Todos los registros en orden final (merge de runs si hubo spill)"""
+        if not self.runs:
+            self.records.sort(key=sort_key)
+            yield from self.records
+            return
+        self.spill()
+        yield from heapq.merge(
+            *(self._iter_run(run) for run in self.runs), key=sort_key
+        )
+
+    def cleanup(self) -> None:
+        """Elimina los runs temporales"""
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from pipeline.contracts.streaming import RecordHasher, iter_output_document
+from pipeline.hashing import hash_file
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+STAGES = [
+    ("ingestor", "pipeline.ingestor.main"),
+    ("transformer", "pipeline.transformer.main"),
+    ("publisher", "pipeline.publisher.main"),
+]
+# Los intermedios se nombran con el digest del archivo de origen, que depende
+# de HASH_SCHEME: solo se comparan entre ejecuciones del mismo modo
+INTERMEDIATE_PREFIX = "intermediate/"
+
+
+def parse_mode(spec: str) -> tuple:
+    """Interpreta un modo `nombre:CLAVE=VALOR,CLAVE=VALOR`"""
+    name, _, assignments = spec.partition(":")
+    env = {}
+    for assignment in filter(None, assignments.split(",")):
+        key, sep, value = assignment.partition("=")
+        if not sep:
+            raise ValueError(f"Asignación inválida en el modo {name}: {assignment}")
+        env[key.strip()] = value.strip()
+    return name, env
+
+
+def collect_artifacts(intermediate_dir: Path, output_dir: Path) -> Dict[str, str]:
+    """Hashes de los artefactos de una ejecución, sin campos volátiles"""
+    artifacts = {}
+    for f in sorted(intermediate_dir.glob("*.json")):
+        if not f.name.startswith("."):
+            artifacts[f"{INTERMEDIATE_PREFIX}{f.name}"] = hash_file(f)
+
+    metadata_file = output_dir / "metadata.json"
+    if metadata_file.exists():
+        with open(metadata_file, "r") as f:
+            metadata = json.load(f)
+        artifacts["data_hash"] = metadata["data_hash"]
+        artifacts["total_records"] = str(metadata["total_records"])
+
+        # Hash canónico de los registros publicados (sin processed_at)
+        hasher = RecordHasher()
+        published = output_dir / metadata["published_file"]
+        for key, value in iter_output_document(published):
+            if key == "record":
+                value.pop("processed_at", None)
+                hasher.update(value)
+        artifacts["published_records"] = hasher.hexdigest()
+    return artifacts
+
+
+def run_pipeline_once(input_dir: Path, mode_env: Dict[str, str]) -> dict:
+    """Ejecuta Ingestor → Transformer → Publisher en un sandbox temporal aislado"""
+    with tempfile.TemporaryDirectory(prefix="determinism_") as sandbox:
+        intermediate_dir = Path(sandbox) / "intermediate"
+        output_dir = Path(sandbox) / "output"
+        env = dict(os.environ)
+        env.update(mode_env)
+        env.update(
+            {
+                "INPUT_DIR": str(input_dir),
+                "INTERMEDIATE_DIR": str(intermediate_dir),
+                "OUTPUT_DIR": str(output_dir),
+                "PYTHONPATH": str(PROJECT_ROOT),
+            }
+        )
+
+        timings = {}
+        for stage, module in STAGES:
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, "-m", module],
+                cwd=sandbox,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            timings[stage] = round(time.perf_counter() - start, 4)
+            if result.returncode != 0:
+                return {
+                    "error": f"{stage} terminó con código {result.returncode}",
+                    "stderr": result.stderr[-2000:],
+                    "timings": timings,
+                    "artifacts": {},
+                }
+
+        return {
+            "timings": timings,
+            "artifacts": collect_artifacts(intermediate_dir, output_dir),
+        }
+
+
+def _expected_artifacts(reference: Dict, mode_reference: Dict) -> Dict:
+    """Publicados de la referencia global e intermedios de la del modo"""
+    expected = {
+        k: v for k, v in reference.items() if not k.startswith(INTERMEDIATE_PREFIX)
+    }
+    for k, v in mode_reference.items():
+        if k.startswith(INTERMEDIATE_PREFIX):
+            expected[k] = v
+    return expected
+
+
+def check_determinism(
+    input_dir: Path, runs: int, workers: int, modes: List[tuple]
+) -> dict:
+    """
+    Ejecuta el pipeline `runs` veces por modo en paralelo y compara los
+    hashes de artefactos con la primera ejecución exitosa: los publicados
+    entre todos los modos, los intermedios dentro de cada modo.
+    """
+    jobs = [(name, env, i) for name, env in modes for i in range(runs)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(
+            executor.map(lambda job: run_pipeline_once(input_dir, job[1]), jobs)
+        )
+
+    report_runs = []
+    for (name, _, index), result in zip(jobs, results):
+        report_runs.append({"mode": name, "run": index, **result})
+
+    succeeded = [run for run in report_runs if "error" not in run]
+    reference = succeeded[0]["artifacts"] if succeeded else {}
+    mode_references = {}
+    for run in succeeded:
+        mode_references.setdefault(run["mode"], run["artifacts"])
+
+    mismatches = []
+    for run in report_runs:
+        if "error" in run:
+            mismatches.append({"mode": run["mode"], "run": run["run"], "error": True})
+            continue
+        expected = _expected_artifacts(reference, mode_references[run["mode"]])
+        keys = sorted(set(expected) | set(run["artifacts"]))
+        differing = [k for k in keys if expected.get(k) != run["artifacts"].get(k)]
+        if differing:
+            mismatches.append(
+                {"mode": run["mode"], "run": run["run"], "artifacts": differing}
+            )
+
+    return {
+        "deterministic": not mismatches and bool(reference),
+        "mismatches": mismatches,
+        "runs": report_runs,
+    }
+
+
+def print_report(report: dict) -> None:
+    """Imprime el resumen de ejecuciones y diferencias"""
+    for run in report["runs"]:
+        total = sum(run["timings"].values())
+        stages = ", ".join(f"{k}={v:.2f}s" for k, v in run["timings"].items())
+        status = run.get("error", "ok")
+        print(f"[{run['mode']}#{run['run']}] {total:.2f}s ({stages}) {status}")
+    if report["deterministic"]:
+        print("Determinismo verificado: todas las ejecuciones coinciden.")
+    else:
+        print("Error: las ejecuciones no coinciden.")
+        for mismatch in report["mismatches"]:
+            print(f"  {json.dumps(mismatch)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Verificador de determinismo con N ejecuciones en paralelo"
+    )
+    parser.add_argument("--input-dir", default="data/input")
+    parser.add_argument("--runs", type=int, default=3, help="Ejecuciones por modo")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--mode",
+        action="append",
+        default=[],
+        help="Modo nombre:CLAVE=VALOR,... (ej. trusted:PUBLISH_VALIDATION=trusted)",
+    )
+    parser.add_argument("--report", help="Guardar el reporte JSON en este archivo")
+    args = parser.parse_args()
+
+    modes = [parse_mode(spec) for spec in args.mode] or [("default", {})]
+    result = check_determinism(
+        Path(args.input_dir).resolve(), args.runs, args.workers, modes
+    )
+    print_report(result)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(result, f, indent=2)
+    exit(0 if result["deterministic"] else 1)
@@ -1,24 +1,34 @@
-import hashlib
+import argparse
 import json
 from pathlib import Path
+from typing import Dict, Iterator, List
 import os
 
+from pipeline.contracts.streaming import iter_array_items, iter_output_document
+from pipeline.hashing import hash_file, rehash_file
 
-def calculate_file_hash(filepath: Path) -> str:
-    """Calcula el hash SHA256 de un archivo."""
-    sha256_hash = hashlib.sha256()
-    with open(filepath, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
+IGNORED_FIELDS = ("processed_at",)
 
 
-def get_intermediate_hashes(intermediate_dir: Path) -> dict:
+def calculate_file_hash(filepath: Path, reference_digest: str | None = None) -> str:
+    """
+    Calcula el hash de un archivo. Por defecto SHA256 plano; si se indica un
+    digest de referencia se usa el mismo esquema y algoritmo que lo produjo.
+    """
+    if reference_digest is None:
+        return hash_file(filepath)
+    return rehash_file(filepath, reference_digest)
+
+
+def get_intermediate_hashes(
+    intermediate_dir: Path, reference_hashes: dict | None = None
+) -> dict:
     """Obtiene los hashes de los archivos en el directorio intermedio."""
+    reference_hashes = reference_hashes or {}
     hashes = {}
     for f in sorted(intermediate_dir.glob("*.json")):
         if f.name not in [".processed_hashes.json", ".reference_hashes.json"]:
-            hashes[f.name] = calculate_file_hash(f)
+            hashes[f.name] = calculate_file_hash(f, reference_hashes.get(f.name))
     return hashes
 
 
@@ -37,12 +47,12 @@ def run_verification(base_dir: Path):
         print(f"Hashes de referencia guardados en {reference_hashes_file}")
         return
 
-    # Hashes actuales
-    current_hashes = get_intermediate_hashes(intermediate_dir)
-
     with open(reference_hashes_file, "r") as f:
         reference_hashes = json.load(f)
 
+    # Hashes actuales, con el mismo esquema que la referencia
+    current_hashes = get_intermediate_hashes(intermediate_dir, reference_hashes)
+
     # Comparamos los hashes
     if current_hashes == reference_hashes:
         print("Verificación de reproducibilidad exitosa: Los hashes coinciden.")
@@ -50,9 +60,186 @@ def run_verification(base_dir: Path):
         print("Error: Los hashes no coinciden.")
         print("Hashes actuales:", json.dumps(current_hashes, indent=2))
         print("Hashes de referencia:", json.dumps(reference_hashes, indent=2))
+        print(
+            "Para localizar la primera diferencia: "
+            "python -m scripts.verify_reproducibility --diff <referencia> <candidato>"
+        )
         exit(1)
 
 
+def iter_artifact_records(file_path: Path) -> Iterator[Dict]:
+    """
+    Itera en streaming los registros de un artefacto: arreglo JSON
+    (intermedio) o documento con `records` (transformado/publicado).
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+    if first == "[":
+        yield from iter_array_items(file_path)
+    elif first == "{":
+        for key, value in iter_output_document(file_path):
+            if key == "record":
+                yield value
+    else:
+        raise ValueError(f"Formato de artefacto no reconocido: {file_path}")
+
+
+def _differing_fields(reference: Dict, candidate: Dict, ignore_fields) -> List[str]:
+    """Campos con valores distintos entre dos registros"""
+    keys = sorted((set(reference) | set(candidate)) - set(ignore_fields))
+    return [k for k in keys if reference.get(k) != candidate.get(k)]
+
+
+def diff_records(
+    reference_path: Path,
+    candidate_path: Path,
+    max_diffs: int = 10,
+    ignore_fields=IGNORED_FIELDS,
+) -> dict:
+    """
+    Compara registro a registro dos artefactos ordenados por id, en paralelo
+    y con memoria acotada. Se detiene al encontrar `max_diffs` diferencias.
+    """
+    reference_iter = iter_artifact_records(reference_path)
+    candidate_iter = iter_artifact_records(candidate_path)
+    differences = []
+    column_counts: Dict[str, int] = {}
+    compared = 0
+
+    reference = next(reference_iter, None)
+    candidate = next(candidate_iter, None)
+    while reference is not None or candidate is not None:
+        if len(differences) >= max_diffs:
+            break
+        if candidate is None or (
+            reference is not None and reference["id"] < candidate["id"]
+        ):
+            differences.append({"id": reference["id"], "kind": "missing"})
+            reference = next(reference_iter, None)
+            continue
+        if reference is None or candidate["id"] < reference["id"]:
+            differences.append({"id": candidate["id"], "kind": "extra"})
+            candidate = next(candidate_iter, None)
+            continue
+
+        compared += 1
+        fields = _differing_fields(reference, candidate, ignore_fields)
+        if fields:
+            differences.append(
+                {
+                    "id": reference["id"],
+                    "kind": "changed",
+                    "fields": {
+                        k: {
+                            "reference": reference.get(k),
+                            "candidate": candidate.get(k),
+                        }
+                        for k in fields
+                    },
+                }
+            )
+            for field in fields:
+                column_counts[field] = column_counts.get(field, 0) + 1
+        reference = next(reference_iter, None)
+        candidate = next(candidate_iter, None)
+
+    return {
+        "reference": str(reference_path),
+        "candidate": str(candidate_path),
+        "compared_records": compared,
+        "differing_records": len(differences),
+        "column_counts": column_counts,
+        "first_differences": differences,
+        "stopped_early": len(differences) >= max_diffs
+        and (reference is not None or candidate is not None),
+    }
+
+
+def _artifact_files(directory: Path) -> Dict[str, Path]:
+    """Artefactos JSON de un directorio, excluyendo archivos de control"""
+    return {
+        f.name: f
+        for f in sorted(directory.glob("*.json"))
+        if not f.name.startswith(".")
+    }
+
+
+def diff_artifacts(reference: Path, candidate: Path, max_diffs: int = 10) -> dict:
+    """Compara dos archivos o dos directorios de artefactos (pareados por nombre)"""
+    for path in (reference, candidate):
+        if not path.exists():
+            raise FileNotFoundError(f"No existe: {path}")
+    if reference.is_file() != candidate.is_file():
+        raise ValueError(
+            f"No se puede comparar un archivo con un directorio: {reference}, "
+            f"{candidate}"
+        )
+    if reference.is_file():
+        pairs = [(reference, candidate)]
+        missing, extra = [], []
+    else:
+        reference_files = _artifact_files(reference)
+        candidate_files = _artifact_files(candidate)
+        names = sorted(set(reference_files) & set(candidate_files))
+        pairs = [(reference_files[n], candidate_files[n]) for n in names]
+        missing = sorted(set(reference_files) - set(candidate_files))
+        extra = sorted(set(candidate_files) - set(reference_files))
+
+    reports = []
+    for reference_file, candidate_file in pairs:
+        report = diff_records(reference_file, candidate_file, max_diffs=max_diffs)
+        if report["differing_records"]:
+            reports.append(report)
+    return {"missing_files": missing, "extra_files": extra, "files": reports}
+
+
+def run_record_diff(reference: Path, candidate: Path, max_diffs: int) -> None:
+    """Ejecuta el diff por registro e imprime el reporte"""
+    try:
+        result = diff_artifacts(reference, candidate, max_diffs=max_diffs)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        exit(1)
+    if not (result["missing_files"] or result["extra_files"] or result["files"]):
+        print("Verificación por registros exitosa: los artefactos coinciden.")
+        return
+
+    print("Error: Los artefactos difieren.")
+    for name in result["missing_files"]:
+        print(f"  Falta en candidato: {name}")
+    for name in result["extra_files"]:
+        print(f"  Sobra en candidato: {name}")
+    for report in result["files"]:
+        print(f"  {report['reference']} vs {report['candidate']}")
+        print(f"    Registros con diferencias: {report['differing_records']}")
+        print(f"    Diferencias por columna: {report['column_counts']}")
+        for difference in report["first_differences"]:
+            print(f"    {json.dumps(difference, ensure_ascii=False)}")
+        if report["stopped_early"]:
+            print(f"    Detenido tras {max_diffs} diferencias")
+    exit(1)
+
+
 if __name__ == "__main__":
-    project_root = Path(os.getcwd())
-    run_verification(project_root)
+    parser = argparse.ArgumentParser(description="Verificador de reproducibilidad")
+    parser.add_argument(
+        "--diff",
+        nargs=2,
+        metavar=("REFERENCIA", "CANDIDATO"),
+        help="Comparar registro a registro dos archivos o directorios de artefactos",
+    )
+    parser.add_argument(
+        "--max-diffs",
+        type=int,
+        default=10,
+        help="Detener la comparación tras N registros distintos",
+    )
+    args = parser.parse_args()
+
+    if args.diff:
+        run_record_diff(Path(args.diff[0]), Path(args.diff[1]), args.max_diffs)
+    else:
+        project_root = Path(os.getcwd())
+        run_verification(project_root)
@@ -0,0 +1,122 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from pipeline.contracts.adapters import (
+    dump_records,
+    dump_records_json,
+    load_json,
+    validate_output_json,
+    validate_records,
+    validate_records_json,
+)
+from pipeline.contracts.schemas import OutputData, TransformedRecord
+from pipeline.publisher.main import Publisher
+from pipeline.transformer.main import WRITE_BATCH_SIZE, Transformer
+
+
+def _records(count: int) -> list:
+    return [
+        {
+            "id": i,
+            "timestamp": "2024-01-01T00:00:00Z",
+            "original_value": i * 1.1,
+            "normalized_value": ((i % 200) - 100) / 100.0,
+            "category": f"categoría_{i % 3}",
+            "processed_at": "2024-01-01T00:00:00.123456",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def test_validate_records_matches_model_constructor():
+    # Arrange
+    records = _records(50)
+
+    # Act
+    validated = validate_records(records)
+
+    # Assert
+    assert validated == [TransformedRecord(**rec) for rec in records]
+    assert validate_records_json(json.dumps(records).encode()) == validated
+    assert dump_records(validated) == [rec.model_dump() for rec in validated]
+    assert dump_records(validated, for_hash=True) == [
+        rec.model_dump(exclude={"processed_at"}) for rec in validated
+    ]
+    assert json.loads(dump_records_json(validated)) == dump_records(validated)
+    assert load_json(json.dumps(records).encode()) == records
+
+
+def test_validate_records_rejects_invalid_record():
+    # Arrange
+    records = _records(3)
+    records[1]["normalized_value"] = 5.0
+
+    # Act y Assert
+    with pytest.raises(ValueError):
+        validate_records(records)
+
+
+def test_validate_output_json_matches_dict_path():
+    # Arrange
+    document = {
+        "records": _records(20),
+        "metadata": {
+            "total_records": 20,
+            "execution_time_seconds": 0.5,
+            "data_hash": "A" * 64,
+            "generated_at": "2024-01-01T00:00:00",
+        },
+    }
+    payload = json.dumps(document, indent=2).encode()
+
+    # Act
+    validated = validate_output_json(payload)
+
+    # Assert
+    assert validated == OutputData(**json.loads(payload))
+    assert validated.metadata.data_hash == "a" * 64
+
+
+def test_stream_writer_matches_full_document_bytes():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        transformer = Transformer(
+            input_dir=f"{tmpdir}/intermediate", output_dir=f"{tmpdir}/output"
+        )
+        records = _records(WRITE_BATCH_SIZE * 2 + 7)
+        start_time = time.time()
+
+        # Act
+        full_file = transformer.write_output(
+            transformer.build_output(records, start_time), start_time
+        )
+        full = full_file.read_bytes()
+        full_file.unlink()
+        stream_file = transformer.write_output_stream(
+            (("src", rec) for rec in records), start_time
+        )
+        streamed = stream_file.read_bytes()
+
+        # Assert: mismos registros y mismo data_hash (la metadata lleva hora)
+        marker = b'"metadata"'
+        assert streamed[: streamed.index(marker)] == full[: full.index(marker)]
+        assert (
+            json.loads(streamed)["metadata"]["data_hash"]
+            == json.loads(full)["metadata"]["data_hash"]
+        )
+
+
+def test_publisher_reports_invalid_json():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "transformed_1.json"
+        file_path.write_text('{"records": [')
+        publisher = Publisher(output_dir=tmpdir)
+
+        # Act y Assert
+        with pytest.raises(ValueError, match="JSON inválido"):
+            publisher._validate_transformed_data(file_path)
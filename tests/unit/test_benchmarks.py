@@ -0,0 +1,93 @@
+from pathlib import Path
+
+import pytest
+
+from benchmarks.compare import compare_reports
+from benchmarks.generator import generate_dataset
+from benchmarks.run import run_benchmarks
+
+
+def _read_all(directory: Path) -> bytes:
+    return b"".join(f.read_bytes() for f in sorted(directory.glob("*.csv")))
+
+
+def test_generator_is_deterministic_and_honours_ratios(tmp_path: Path):
+    # Arrange
+    options = {
+        "rows": 2000,
+        "files": 3,
+        "categories": 4,
+        "duplicate_ratio": 0.1,
+        "invalid_ratio": 0.05,
+        "seed": 7,
+    }
+
+    # Act
+    first = generate_dataset(tmp_path / "a", **options)
+    second = generate_dataset(tmp_path / "b", **options)
+
+    # Assert
+    assert first == second
+    assert _read_all(tmp_path / "a") == _read_all(tmp_path / "b")
+    assert len(list((tmp_path / "a").glob("*.csv"))) == 3
+    assert first["rows"] == 2000
+    assert 100 < first["duplicates"] < 300
+    assert 50 < first["invalid"] < 150
+
+
+def test_generator_latin1_encoding(tmp_path: Path):
+    # Arrange y Act
+    generate_dataset(tmp_path, rows=10, encoding="latin-1")
+
+    # Assert
+    content = (tmp_path / "bench_00000.csv").read_bytes()
+    with pytest.raises(UnicodeDecodeError):
+        content.decode("utf-8")
+    assert "categoría" in content.decode("latin-1")
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    # Arrange
+    baseline = {
+        "benchmarks": {
+            "ingestor": {
+                "rows_per_second": 1000.0,
+                "wall_seconds": 1.0,
+                "peak_rss_bytes": 100,
+            },
+            "publisher": {"rows_per_second": 1000.0},
+        }
+    }
+    current = {
+        "benchmarks": {
+            "ingestor": {
+                "rows_per_second": 700.0,
+                "wall_seconds": 1.05,
+                "peak_rss_bytes": 90,
+            }
+        }
+    }
+
+    # Act
+    regressions = compare_reports(baseline, current, threshold=0.15)
+
+    # Assert
+    assert {(r["benchmark"], r["metric"]) for r in regressions} == {
+        ("ingestor", "rows_per_second"),
+        ("publisher", "missing"),
+    }
+
+
+def test_run_benchmarks_records_metrics():
+    # Arrange
+    dataset = {"rows": 200, "files": 2, "seed": 1}
+
+    # Act
+    report = run_benchmarks(dataset, {}, ["ingestor", "publisher"])
+
+    # Assert
+    assert set(report["benchmarks"]) == {"ingestor", "publisher"}
+    for result in report["benchmarks"].values():
+        assert "error" not in result
+        assert result["rows_per_second"] > 0
+        assert result["peak_rss_bytes"] > 0
@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from pipeline.catalog import PublicationCatalog
+from pipeline.publisher.main import Publisher
+
+
+def test_catalog_latest_returns_last_registered_entry():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        catalog = PublicationCatalog(output_dir)
+
+        for name in ["transformed_1.json", "transformed_2.json"]:
+            file_path = output_dir / name
+            file_path.write_text('{"records": []}')
+            catalog.register(file_path, data_hash="a" * 64, total_records=3)
+
+        # Act
+        entry = catalog.latest()
+
+        # Assert
+        assert entry.path == "transformed_2.json"
+        assert entry.data_hash == "a" * 64
+        assert entry.total_records == 3
+        assert entry.size == len('{"records": []}')
+        assert len(catalog.entries()) == 2
+
+
+def test_catalog_rebuild_recovers_entries_from_directory():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        file1 = output_dir / "transformed_1000.json"
+        file2 = output_dir / "transformed_2000.json"
+        file1.write_text(
+            json.dumps({"metadata": {"data_hash": "b" * 64, "total_records": 7}})
+        )
+        file2.write_text('{"test": 2}')
+        os.utime(file1, (1000, 1000))
+        os.utime(file2, (2000, 2000))
+
+        catalog = PublicationCatalog(output_dir)
+
+        # Act
+        total = catalog.rebuild()
+        entries = catalog.entries()
+
+        # Assert
+        assert total == 2
+        assert [e.path for e in entries] == [file1.name, file2.name]
+        assert entries[0].data_hash == "b" * 64
+        assert entries[0].total_records == 7
+        assert entries[1].data_hash is None
+
+
+def test_publisher_uses_catalog_without_listing_directory():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        registered = output_dir / "transformed_1.json"
+        unregistered = output_dir / "transformed_2.json"
+        registered.write_text("{}")
+        unregistered.write_text("{}")
+
+        PublicationCatalog(output_dir).register(
+            registered, data_hash=None, total_records=None
+        )
+        publisher = Publisher(output_dir=str(output_dir))
+
+        # Act
+        latest_file = publisher._find_latest_transformed_file()
+
+        # Assert
+        assert latest_file.name == "transformed_1.json"
+
+
+def test_publisher_skips_catalog_entry_already_published():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        transformed = output_dir / "transformed_1.json"
+        transformed.write_text("{}")
+        PublicationCatalog(output_dir).register(
+            transformed, data_hash=None, total_records=None
+        )
+        transformed.unlink()
+
+        publisher = Publisher(output_dir=str(output_dir))
+
+        # Act
+        latest_file = publisher._find_latest_transformed_file()
+
+        # Assert
+        assert latest_file is None
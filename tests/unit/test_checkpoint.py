@@ -0,0 +1,109 @@
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from pipeline.transformer.checkpoint import CHECKPOINTS_DIRNAME, TransformCheckpoint
+from pipeline.transformer.main import Transformer
+
+
+def _write_intermediate(input_dir: Path, count: int):
+    for i in range(count):
+        records = [
+            {
+                "id": i * 10 + j,
+                "timestamp": "2024-01-01T00:00:00Z",
+                "value": float(j * (i + 1)),
+                "category": f"c{j}",
+            }
+            for j in range(1, 4)
+        ]
+        (input_dir / f"{i:064x}.json").write_text(json.dumps(records))
+
+
+def _output_hash(output_dir: Path) -> str:
+    output_file = next(output_dir.glob("transformed_*.json"))
+    with open(output_file, "r") as f:
+        return json.load(f)["metadata"]["data_hash"]
+
+
+def test_checkpoint_roundtrip_ignores_truncated_progress():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        checkpoint = TransformCheckpoint(tmpdir, ["a", "b"])
+        checkpoint.save("a", [("a", {"id": 1, "value": 0.1})])
+        with open(checkpoint.progress_path, "a") as f:
+            f.write('{"file": "b", "rec')
+
+        # Act
+        restored = TransformCheckpoint(tmpdir, ["b", "a"]).load()
+
+        # Assert
+        assert restored == {"a": [("a", {"id": 1, "value": 0.1})]}
+
+
+def test_transformer_resumes_after_crash_with_same_hash():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        _write_intermediate(input_dir, 4)
+
+        reference_dir = Path(tmpdir) / "reference"
+        Transformer(str(input_dir), str(reference_dir), checkpoint=False).transform()
+
+        output_dir = Path(tmpdir) / "output"
+        crashed = Transformer(str(input_dir), str(output_dir), checkpoint=True)
+        json_files = crashed._list_input_files()
+        checkpoint = TransformCheckpoint(output_dir, [f.stem for f in json_files])
+
+        def crashing_frames():
+            for index, frame in enumerate(crashed.iter_input_frames()):
+                if index == 2:
+                    raise KeyboardInterrupt
+                yield frame
+
+        with pytest.raises(KeyboardInterrupt):
+            crashed.transform_frames(crashing_frames(), 0.0, checkpoint=checkpoint)
+
+        resumed = Transformer(str(input_dir), str(output_dir), checkpoint=True)
+        transformed = []
+        original = resumed.transform_frame
+        resumed.transform_frame = lambda df: transformed.append(1) or original(df)
+
+        # Act
+        resumed.transform()
+
+        # Assert
+        assert len(transformed) == 2  # Solo los archivos pendientes
+        assert _output_hash(output_dir) == _output_hash(reference_dir)
+        assert not (output_dir / CHECKPOINTS_DIRNAME).exists()
+
+
+def test_failed_frames_are_not_checkpointed():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        _write_intermediate(input_dir, 2)
+        transformer = Transformer(str(input_dir), str(tmpdir), checkpoint=True)
+        json_files = transformer._list_input_files()
+        checkpoint = TransformCheckpoint(tmpdir, [f.stem for f in json_files])
+        original = transformer.transform_frame
+
+        def failing_first(df):
+            if df["id"].min() < 10:
+                raise ValueError("fallo transitorio")
+            return original(df)
+
+        transformer.transform_frame = failing_first
+
+        # Act
+        transformer.transform_frames(
+            transformer.iter_input_frames(), 0.0, checkpoint=checkpoint
+        )
+        restored = TransformCheckpoint(tmpdir, [f.stem for f in json_files]).load()
+
+        # Assert
+        assert list(restored) == [json_files[1].stem]
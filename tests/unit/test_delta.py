@@ -0,0 +1,109 @@
+import json
+import tempfile
+from pathlib import Path
+from pipeline.publisher.delta import apply_delta, compute_delta, iter_delta
+from pipeline.publisher.main import Publisher
+
+
+def _record(record_id: int, value: float) -> dict:
+    return {
+        "id": record_id,
+        "timestamp": "2024-01-01T00:00:00Z",
+        "original_value": value,
+        "normalized_value": 0.5,
+        "category": "sensor_a",
+        "processed_at": f"2024-01-15T10:30:0{record_id % 10}Z",
+    }
+
+
+def _write_output(file_path: Path, records: list) -> None:
+    with open(file_path, "w") as f:
+        json.dump(
+            {
+                "records": records,
+                "metadata": {
+                    "total_records": len(records),
+                    "execution_time_seconds": 0.1,
+                    "data_hash": "a" * 64,
+                    "generated_at": "2024-01-15T10:30:00Z",
+                },
+            },
+            f,
+        )
+
+
+def test_compute_delta_detects_inserts_deletes_and_updates():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir)
+        previous = [_record(1, 1.0), _record(2, 2.0), _record(3, 3.0)]
+        current = [_record(2, 2.0), _record(3, 30.0), _record(4, 4.0)]
+        # processed_at distinto no cuenta como cambio
+        current[0]["processed_at"] = "2025-01-01T00:00:00Z"
+        _write_output(base / "previous.json", previous)
+        _write_output(base / "current.json", current)
+        delta_path = base / "delta_v2.jsonl"
+
+        # Act
+        manifest = compute_delta(
+            base / "previous.json", base / "current.json", delta_path, "v1"
+        )
+        changes = list(iter_delta(delta_path))
+
+        # Assert
+        assert manifest.inserted == 1
+        assert manifest.deleted == 1
+        assert manifest.updated == 1
+        assert [(c["op"], c["id"]) for c in changes] == [
+            ("delete", 1),
+            ("update", 3),
+            ("insert", 4),
+        ]
+        assert changes[1]["changed_fields"] == ["original_value"]
+        assert apply_delta(previous, delta_path) == [
+            previous[1],
+            current[1],
+            current[2],
+        ]
+
+
+def test_publish_writes_delta_against_previous_version():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        publisher = Publisher(output_dir=str(output_dir), delta=True)
+        _write_output(output_dir / "transformed_1.json", [_record(1, 1.0)])
+        publisher.publish()
+        _write_output(
+            output_dir / "transformed_2.json", [_record(1, 1.0), _record(2, 2.0)]
+        )
+        publisher.catalog.rebuild()
+
+        # Act
+        success = publisher.publish()
+
+        # Assert
+        assert success is True
+        with open(output_dir / "metadata.json", "r") as f:
+            metadata = json.load(f)
+        delta = metadata["delta"]
+        version_dir = publisher.versions.version_dir(metadata["version"])
+        assert delta["inserted"] == 1
+        assert delta["deleted"] == 0
+        assert delta["updated"] == 0
+        assert (version_dir / delta["file"]).exists()
+
+
+def test_first_publish_has_no_delta():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        _write_output(output_dir / "transformed_1.json", [_record(1, 1.0)])
+        publisher = Publisher(output_dir=str(output_dir), delta=True)
+
+        # Act
+        publisher.publish()
+
+        # Assert
+        with open(output_dir / "metadata.json", "r") as f:
+            assert json.load(f)["delta"] is None
@@ -0,0 +1,69 @@
+from pathlib import Path
+import pytest
+from scripts.check_determinism import check_determinism, parse_mode
+
+
+def test_parse_mode_with_environment_overrides():
+    # Arrange y Act
+    name, env = parse_mode("fast:PUBLISH_VALIDATION=trusted,HASH_SCHEME=tree")
+
+    # Assert
+    assert name == "fast"
+    assert env == {"PUBLISH_VALIDATION": "trusted", "HASH_SCHEME": "tree"}
+
+
+def test_parse_mode_rejects_invalid_assignment():
+    # Arrange, Act y Assert
+    with pytest.raises(ValueError, match="Asignación inválida"):
+        parse_mode("broken:PUBLISH_VALIDATION")
+
+
+def test_check_determinism_parallel_runs_match(tmp_path: Path):
+    # Arrange
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / "data.csv").write_text(
+        "id,timestamp,value,category\n"
+        "2,2024-01-15T10:31:00Z,38.2,sensor_b\n"
+        "1,2024-01-15T10:30:00Z,42.5,sensor_a\n"
+        "3,2024-01-15T10:32:00Z,45.8,sensor_c\n"
+    )
+    modes = [("default", {}), parse_mode("streaming:PUBLISH_VALIDATION=streaming")]
+
+    # Act
+    report = check_determinism(input_dir, runs=1, workers=2, modes=modes)
+
+    # Assert
+    assert report["deterministic"] is True
+    assert len(report["runs"]) == 2
+    artifacts = report["runs"][0]["artifacts"]
+    assert artifacts["total_records"] == "3"
+    assert set(report["runs"][0]["timings"]) == {"ingestor", "transformer", "publisher"}
+
+
+def test_check_determinism_ignores_failed_first_run_and_hash_scheme(tmp_path: Path):
+    # Arrange
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / "data.csv").write_text(
+        "id,timestamp,value,category\n"
+        "1,2024-01-15T10:30:00Z,42.5,sensor_a\n"
+        "2,2024-01-15T10:31:00Z,38.2,sensor_b\n"
+    )
+    modes = [
+        parse_mode("broken:PROFILE=gpu"),
+        ("default", {}),
+        parse_mode("tree:HASH_SCHEME=tree"),
+    ]
+
+    # Act
+    report = check_determinism(input_dir, runs=1, workers=3, modes=modes)
+
+    # Assert
+    assert report["mismatches"] == [{"mode": "broken", "run": 0, "error": True}]
+    assert report["deterministic"] is False
+    intermediates = [
+        [k for k in run["artifacts"] if k.startswith("intermediate/")]
+        for run in report["runs"][1:]
+    ]
+    assert intermediates[0] != intermediates[1]
@@ -0,0 +1,96 @@
+import random
+import tempfile
+from pathlib import Path
+
+from benchmarks.generator import generate_dataset
+from pipeline import dryrun
+from pipeline.dryrun import DryRun, reservoir_sample, seek_sample
+
+
+def _write_csv(path: Path, rows: int) -> None:
+    lines = ["id,timestamp,value,category"]
+    lines += [f"{i},2024-01-01T00:00:00Z,{i * 1.5},c{i % 3}" for i in range(rows)]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_reservoir_sample_counts_rows_and_is_reproducible():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_file = Path(tmpdir) / "a.csv"
+        _write_csv(csv_file, 1000)
+
+        # Act
+        first = reservoir_sample(csv_file, 50, random.Random(1))
+        second = reservoir_sample(csv_file, 50, random.Random(1))
+
+        # Assert
+        assert first.estimated_rows == 1000
+        assert len(first.lines) == 50 and len(set(first.lines)) == 50
+        assert first.lines == second.lines
+        assert first.header == b"id,timestamp,value,category\n"
+
+
+def test_seek_sample_estimates_rows_without_full_scan():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_file = Path(tmpdir) / "a.csv"
+        _write_csv(csv_file, 20000)
+
+        # Act
+        sample = seek_sample(csv_file, 400, random.Random(3))
+
+        # Assert
+        assert sample.method == "seek"
+        assert 0 < len(sample.lines) <= 400
+        assert abs(sample.estimated_rows - 20000) / 20000 < 0.05
+        assert all(line.count(b",") == 3 for line in sample.lines)
+
+
+def test_dry_run_extrapolates_without_artifacts():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir)
+        generate_dataset(input_dir, rows=12000, files=2, invalid_ratio=0.2, seed=5)
+        (input_dir / "bad.csv").write_text("a,b\n1,2\n")
+        before = sorted(p.name for p in input_dir.rglob("*"))
+
+        # Act
+        report = DryRun(str(input_dir), sample_rows=500).run()
+
+        # Assert
+        assert sorted(p.name for p in input_dir.rglob("*")) == before
+        files = {f["file"]: f for f in report["files"]}
+        assert files["bad.csv"]["rejection_rate"] == 1.0
+        assert {f["method"] for f in report["files"]} == {"reservoir", "seek"}
+        totals = report["totals"]
+        assert abs(totals["estimated_rows"] - 12001) / 12001 < 0.05
+        assert 0.1 < totals["rejection_rate"] < 0.3
+        assert 0 < totals["estimated_output_records"] < totals["estimated_rows"]
+        assert totals["estimated_output_bytes"] > 0
+        for stage in ("ingestor", "transformer", "publisher"):
+            assert report["stages"][stage]["wall_seconds"] > 0
+            assert report["stages"][stage]["peak_memory_bytes"] > 0
+
+
+def test_dry_run_caps_bytes_read_and_measures_hash_once(monkeypatch):
+    # Arrange
+    calls = []
+    measure = dryrun.hash_rate
+    monkeypatch.setattr(dryrun, "hash_rate", lambda: calls.append(1) or measure())
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir)
+        for index in range(8):
+            _write_csv(input_dir / f"f{index}.csv", 20000)
+        total_bytes = sum(p.stat().st_size for p in input_dir.iterdir())
+
+        # Act
+        report = DryRun(str(input_dir), read_budget=200_000).run()
+
+        # Assert
+        assert len(calls) == 1
+        assert report["totals"]["read_bytes"] <= 200_000
+        assert report["totals"]["read_bytes"] < total_bytes / 20
+        assert {f["method"] for f in report["files"]} == {"seek"}
+        assert all(f["sampled_rows"] > 0 for f in report["files"])
+        estimated = report["totals"]["estimated_rows"]
+        assert abs(estimated - 160000) / 160000 < 0.1
@@ -0,0 +1,93 @@
+import csv
+import hashlib
+import json
+import tempfile
+from pathlib import Path
+import pytest
+from pipeline.publisher.exporters import ExporterFactory, read_columnar
+from pipeline.publisher.main import Publisher
+
+
+RECORDS = [
+    {
+        "id": 1,
+        "timestamp": "2024-01-01T00:00:00Z",
+        "original_value": 42.5,
+        "normalized_value": -1.0,
+        "category": "sensor_á",
+        "processed_at": "2024-01-15T10:30:00Z",
+    },
+    {
+        "id": 2,
+        "timestamp": "2024-01-01T00:01:00Z",
+        "original_value": 38.2,
+        "normalized_value": 1.0,
+        "category": "sensor_b",
+        "processed_at": "2024-01-15T10:30:00Z",
+    },
+]
+
+
+def test_exporter_factory_invalid_format():
+    # Arrange, Act y Assert
+    with pytest.raises(ValueError, match="Formato de exportación no soportado"):
+        ExporterFactory.create_exporter("xml")
+
+
+def test_columnar_export_roundtrip():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        exporter = ExporterFactory.create_exporter("columnar")
+
+        # Act
+        result = exporter.export(RECORDS, Path(tmpdir))
+        columns = read_columnar(Path(tmpdir) / result.file)
+
+        # Assert
+        assert columns["id"] == [1, 2]
+        assert columns["original_value"] == [42.5, 38.2]
+        assert columns["category"] == ["sensor_á", "sensor_b"]
+        assert result.size == (Path(tmpdir) / result.file).stat().st_size
+
+
+def test_publish_exports_all_formats_with_hashes():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        with open(output_dir / "transformed_1.json", "w") as f:
+            json.dump(
+                {
+                    "records": RECORDS,
+                    "metadata": {
+                        "total_records": 2,
+                        "execution_time_seconds": 0.1,
+                        "data_hash": "a" * 64,
+                        "generated_at": "2024-01-15T10:30:00Z",
+                    },
+                },
+                f,
+            )
+        publisher = Publisher(
+            output_dir=str(output_dir), export_formats=["jsonl", "csv", "columnar"]
+        )
+
+        # Act
+        success = publisher.publish()
+
+        # Assert
+        assert success is True
+        with open(output_dir / "metadata.json", "r") as f:
+            exports = json.load(f)["exports"]
+        assert [e["format"] for e in exports] == ["jsonl", "csv", "columnar"]
+        version_dir = output_dir / "current"
+        for export in exports:
+            content = (version_dir / export["file"]).read_bytes()
+            assert hashlib.sha256(content).hexdigest() == export["sha256"]
+        assert not list(version_dir.glob("*.tmp"))
+
+        with open(version_dir / "data.jsonl", "r") as f:
+            assert [json.loads(line) for line in f] == RECORDS
+        with open(version_dir / "data.csv", "r", newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [int(r["id"]) for r in rows] == [1, 2]
+        assert rows[0]["category"] == "sensor_á"
@@ -0,0 +1,137 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from pipeline.contracts.schemas import OutputData
+from pipeline.publisher.exporters import (
+    ExporterFactory,
+    decode_timestamp,
+    encode_timestamp,
+)
+from pipeline.publisher.fixed_store import FixedWidthStore
+from pipeline.publisher.main import Publisher
+
+
+def _record(record_id: int, timestamp: str, category: str) -> dict:
+    return {
+        "id": record_id,
+        "timestamp": timestamp,
+        "original_value": record_id * 1.5,
+        "normalized_value": -0.25,
+        "category": category,
+        "processed_at": "2024-01-15T10:30:00.123456",
+    }
+
+
+RECORDS = [
+    _record(1, "2024-01-01T00:00:00Z", "sensor_á"),
+    _record(3, "2024-01-01T00:01:00.500000+02:00", "sensor_b"),
+    _record(3, "2024-01-01T00:02:00", "sensor_á"),
+    _record(7, "1969-12-31T23:59:59-05:30", "otro"),
+]
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2024-01-01T00:00:00Z",
+        "2024-01-01T00:01:00.500000+02:00",
+        "1969-12-31T23:59:59-05:30",
+        "2024-01-15T10:30:00.123456",
+        "2024-01-15T10:30:00+05:30:15",
+    ],
+)
+def test_timestamp_encoding_roundtrip(value):
+    # Act
+    decoded = decode_timestamp(*encode_timestamp(value))
+
+    # Assert
+    assert decoded == value
+
+
+def test_fixed_store_returns_original_timestamp_text():
+    # Arrange
+    records = [
+        _record(1, "2024-01-15T10:30:00+00:00", "a"),
+        _record(2, "2024-01-15", "a"),
+        _record(3, "2024-01-15T10:30:00.000", "a"),
+        _record(4, "2024-01-15T10:30:00+05:30:15", "a"),
+        {**_record(5, "2024-01-15T10:30:00Z", "a"), "processed_at": "2024-01-15"},
+    ]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result = ExporterFactory.create_exporter("fixed").export(records, Path(tmpdir))
+
+        # Act
+        with FixedWidthStore(Path(tmpdir) / result.file) as store:
+            stored = [store.record(i) for i in range(len(store))]
+            micros = store._columns["timestamp"][3]
+
+        # Assert
+        assert stored == records
+        assert micros == encode_timestamp("2024-01-15T04:59:45Z")[0]
+
+
+def test_fixed_store_point_and_range_lookups():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result = ExporterFactory.create_exporter("fixed").export(RECORDS, Path(tmpdir))
+
+        # Act
+        with FixedWidthStore(Path(tmpdir) / result.file) as store:
+            first = store.get(3)
+            missing = store.get(5)
+            duplicates = store.lookup(3)
+            scanned = [r["id"] for r in store.range(2, 8)]
+            rows, categories = len(store), store.categories
+
+        # Assert
+        assert result.file == "data.fix"
+        assert first == RECORDS[1]
+        assert missing is None
+        assert duplicates == RECORDS[1:3]
+        assert scanned == [3, 3, 7]
+        assert rows == 4
+        assert categories == ["sensor_á", "sensor_b", "otro"]
+
+
+def test_fixed_exporter_rejects_unsorted_records():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        exporter = ExporterFactory.create_exporter("fixed")
+
+        # Act y Assert
+        with pytest.raises(ValueError, match="no ordenados"):
+            exporter.export(list(reversed(RECORDS)), Path(tmpdir))
+        assert list(Path(tmpdir).iterdir()) == []
+
+
+def test_open_current_reads_published_version():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_data = OutputData(
+            records=RECORDS,
+            metadata={
+                "total_records": len(RECORDS),
+                "execution_time_seconds": 0.1,
+                "data_hash": "a" * 64,
+                "generated_at": "2024-01-01T00:00:00",
+            },
+        )
+        publisher = Publisher(output_dir=tmpdir, export_formats=["fixed"])
+
+        # Act
+        assert publisher.publish_data(output_data, "a.csv")
+        with FixedWidthStore.open_current(tmpdir) as store:
+            record = store.get(7)
+
+        # Assert
+        assert record == RECORDS[3]
+
+
+def test_open_current_without_fixed_export():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Act y Assert
+        with pytest.raises(FileNotFoundError, match="EXPORT_FORMATS"):
+            FixedWidthStore.open_current(tmpdir)
@@ -0,0 +1,64 @@
+import hashlib
+import tempfile
+from pathlib import Path
+import pytest
+from pipeline.hashing import hash_file, parse_digest, verify_file
+
+
+def _write_file(tmpdir: str, size: int) -> Path:
+    file_path = Path(tmpdir) / "data.bin"
+    file_path.write_bytes(bytes(i % 251 for i in range(size)))
+    return file_path
+
+
+def test_plain_sha256_matches_hashlib_and_keeps_legacy_format():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = _write_file(tmpdir, 100_000)
+        expected = hashlib.sha256(file_path.read_bytes()).hexdigest()
+
+        # Act
+        digest = hash_file(file_path, block_size=4096)
+
+        # Assert
+        assert digest == expected
+        assert parse_digest(digest) == ("plain", "sha256", 0, expected)
+
+
+def test_tree_hash_is_independent_of_worker_count():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = _write_file(tmpdir, 100_000)
+
+        # Act
+        serial = hash_file(file_path, scheme="tree", chunk_size=8192, workers=1)
+        parallel = hash_file(file_path, scheme="tree", chunk_size=8192, workers=8)
+
+        # Assert
+        assert serial == parallel
+        assert serial.startswith("tree8192-sha256-")
+        assert verify_file(file_path, serial)
+
+
+def test_digest_records_algorithm_and_detects_changes():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = _write_file(tmpdir, 1000)
+        digest = hash_file(file_path, algorithm="blake2b")
+
+        # Act
+        file_path.write_bytes(b"otro contenido")
+
+        # Assert
+        assert parse_digest(digest)[:2] == ("plain", "blake2b")
+        assert not verify_file(file_path, digest)
+
+
+def test_hash_file_rejects_unknown_algorithm():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = _write_file(tmpdir, 10)
+
+        # Act y Assert
+        with pytest.raises(ValueError, match="Algoritmo de hash no soportado"):
+            hash_file(file_path, algorithm="md42")
@@ -0,0 +1,185 @@
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from pipeline.runner import PipelineRunner
+from pipeline.transformer import id_index
+from pipeline.transformer.id_index import ID_INDEX_DIRNAME, BloomFilter, IdIndex
+from pipeline.transformer.main import Transformer
+
+
+def _write_intermediate(input_dir: Path, name: str, rows: list):
+    records = [
+        {
+            "id": record_id,
+            "timestamp": "2024-01-01T00:00:00Z",
+            "value": value,
+            "category": "c",
+        }
+        for record_id, value in rows
+    ]
+    (input_dir / f"{name}.json").write_text(json.dumps(records))
+
+
+def _output_records(output_dir: Path) -> list:
+    (output_file,) = output_dir.glob("transformed_*.json")
+    with open(output_file, "r") as f:
+        return json.load(f)["records"]
+
+
+def test_claim_keeps_first_owner():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index = IdIndex(Path(tmpdir), capacity=1000)
+
+        # Act
+        first = index.claim("a", np.array([5, 1, 3, 3]))
+        second = index.claim("b", np.array([3, 4, 5, 6]))
+        again = index.claim("a", np.array([1, 5, 7]))
+
+        # Assert
+        assert first.tolist() == [True, True, True, True]
+        assert second.tolist() == [False, True, False, True]
+        assert again.tolist() == [True, True, True]
+        assert index.count == 6
+
+
+def test_commit_persists_and_abort_discards():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index = IdIndex(Path(tmpdir), capacity=1000)
+        index.claim("a", np.array([1, 2, 3]))
+        index.commit()
+
+        # Act
+        reopened = IdIndex(Path(tmpdir))
+        kept = reopened.claim("b", np.array([2, 10]))
+        reopened.abort()
+        after_abort = IdIndex(Path(tmpdir)).claim("c", np.array([10]))
+
+        # Assert
+        assert kept.tolist() == [False, True]
+        assert after_abort.tolist() == [True]
+
+
+def test_open_discards_only_its_own_uncommitted_files():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        directory = Path(tmpdir)
+        (directory / "published.json").write_text("{}")
+        (directory / "run_notes.bin").write_bytes(b"x")
+        index = IdIndex(directory, capacity=1000)
+        index.claim("a", np.array([1, 2]))
+        index.commit()
+        (directory / "pending_000099.bin").write_bytes(b"")
+        (directory / "run_000098.bin.tmp").write_bytes(b"")
+
+        # Act
+        IdIndex(directory)
+
+        # Assert
+        names = {path.name for path in directory.iterdir()}
+        assert {"published.json", "run_notes.bin"} <= names
+        assert "pending_000099.bin" not in names
+        assert "run_000098.bin.tmp" not in names
+
+
+def test_spilled_runs_and_compaction_stay_exact(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(id_index, "MAX_RUNS", 2)
+    monkeypatch.setattr(id_index, "MERGE_CHUNK", 64)
+    rng = np.random.default_rng(7)
+    ids = rng.permutation(5000) + 1
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Act: 5 ejecuciones de 1000 ids con buffer pequeño (runs pendientes)
+        for run in range(5):
+            index = IdIndex(Path(tmpdir), capacity=100, buffer_ids=300)
+            assert index.claim(f"s{run}", ids[run * 1000 : (run + 1) * 1000]).all()
+            index.commit()
+        index = IdIndex(Path(tmpdir))
+
+        # Assert
+        assert len(index.runs) <= 2
+        assert index.manifest["bloom"]["capacity"] >= 5000
+        assert not index.claim("z", ids).any()
+        assert index.claim("z", np.arange(6000, 7000)).all()
+        files = {p.name for p in Path(tmpdir).iterdir()}
+        assert files == set(index.manifest["runs"]) | {
+            index.manifest["bloom"]["file"],
+            "manifest.json",
+        }
+
+
+def test_bloom_filter_false_positive_rate():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bloom = BloomFilter(Path(tmpdir) / "bloom.bin", *BloomFilter.parameters(10_000))
+
+        # Act
+        bloom.add(np.arange(10_000))
+
+        # Assert
+        assert bloom.might_contain(np.arange(10_000)).all()
+        assert bloom.might_contain(np.arange(10**6, 10**6 + 10_000)).mean() < 0.02
+
+
+def test_transformer_deduplicates_across_files_and_runs():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "intermediate"
+        output_dir = Path(tmpdir) / "output"
+        input_dir.mkdir()
+        _write_intermediate(input_dir, "a", [(1, 10.0), (2, 20.0)])
+        _write_intermediate(input_dir, "b", [(2, 99.0), (3, 30.0)])
+
+        # Act
+        Transformer(str(input_dir), str(output_dir), global_dedup=True).transform()
+        first_run = _output_records(output_dir)
+        for path in output_dir.glob("transformed_*"):
+            path.unlink()
+        # Segunda ejecución: los mismos archivos conservan sus ids; un archivo
+        # nuevo no puede reintroducir ids ya publicados
+        _write_intermediate(input_dir, "c", [(1, 5.0), (4, 40.0)])
+        Transformer(str(input_dir), str(output_dir), global_dedup=True).transform()
+        second_run = _output_records(output_dir)
+
+        # Assert
+        assert [(r["id"], r["original_value"]) for r in first_run] == [
+            (1, 10.0),
+            (2, 20.0),
+            (3, 30.0),
+        ]
+        assert [(r["id"], r["original_value"]) for r in second_run] == [
+            (1, 10.0),
+            (2, 20.0),
+            (3, 30.0),
+            (4, 40.0),
+        ]
+        assert (output_dir / ID_INDEX_DIRNAME / "manifest.json").exists()
+
+
+def test_runner_failure_does_not_commit_claims(monkeypatch):
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        (input_dir / "a.csv").write_text(
+            "id,timestamp,value,category\n1,2024-01-01T00:00:00Z,1.0,x\n"
+        )
+        runner = PipelineRunner(
+            input_dir=str(input_dir),
+            intermediate_dir=f"{tmpdir}/inter",
+            output_dir=f"{tmpdir}/output",
+        )
+        runner.transformer.global_dedup = True
+        monkeypatch.setattr(runner.publisher, "publish_data", lambda *a, **k: False)
+
+        # Act
+        success = runner.run()
+
+        # Assert
+        assert not success
+        index = IdIndex(Path(tmpdir) / "output" / ID_INDEX_DIRNAME)
+        assert index.count == 0
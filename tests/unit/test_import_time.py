@@ -0,0 +1,70 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Presupuesto generoso para CI; sin pandas los imports toman ~0.3s
+IMPORT_BUDGET_SECONDS = 1.5
+
+PROBE = """
+import json, logging, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "elapsed": elapsed,
+    "pandas": "pandas" in sys.modules,
+    "dotenv": "dotenv" in sys.modules,
+    "handlers": len(logging.getLogger().handlers),
+}}))
+"""
+
+
+def _probe_import(statement: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(statement=statement)],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import pipeline.publisher.main",
+        "from pipeline.ingestor import Ingestor",
+        "import pipeline.transformer.main",
+        "import pipeline.runner",
+    ],
+)
+def test_stage_imports_are_lazy_and_within_budget(statement):
+    # Arrange y Act
+    probe = _probe_import(statement)
+
+    # Assert
+    assert probe["pandas"] is False
+    assert probe["dotenv"] is False
+    assert probe["handlers"] == 0
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+def test_config_resolves_on_first_access(monkeypatch):
+    # Arrange
+    from pipeline import config
+
+    config.reset()
+    monkeypatch.setenv("PUBLISH_KEEP_VERSIONS", "3")
+
+    # Act
+    keep_versions = config.PUBLISH_KEEP_VERSIONS
+
+    # Assert
+    assert keep_versions == 3
+    config.reset()
@@ -0,0 +1,152 @@
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from pipeline.contracts.schemas import OutputData
+from pipeline.publisher import indexes
+from pipeline.publisher.indexes import DatasetIndex, build_index
+from pipeline.publisher.main import Publisher
+
+OFFSETS = ["Z", "+02:00", "-05:30", ""]
+
+
+def _record(record_id: int) -> dict:
+    hour = record_id // 60
+    return {
+        "id": record_id,
+        "timestamp": f"2024-01-{1 + hour // 24:02d}T{hour % 24:02d}:"
+        f"{record_id % 60:02d}:00{OFFSETS[record_id % 4]}",
+        "original_value": record_id * 1.5,
+        "normalized_value": 0.5,
+        "category": f"sensor_{record_id % 5}",
+        "processed_at": "2024-01-15T10:30:00.123456",
+    }
+
+
+RECORDS = [_record(i) for i in range(3000)]
+
+
+def _output_data(records: list) -> OutputData:
+    return OutputData(
+        records=records,
+        metadata={
+            "total_records": len(records),
+            "execution_time_seconds": 0.1,
+            "data_hash": "a" * 64,
+            "generated_at": "2024-01-01T00:00:00",
+        },
+    )
+
+
+def _write_data(directory: Path, records: list) -> Path:
+    data_file = directory / "data.json"
+    data_file.write_text(_output_data(records).model_dump_json(indent=2))
+    return data_file
+
+
+def _brute_force(records: list, category, start, end) -> list:
+    micros = indexes._timestamp_micros
+    return [
+        record
+        for record in records
+        if (category is None or record["category"] == category)
+        and (start is None or micros(record["timestamp"]) >= micros(start))
+        and (end is None or micros(record["timestamp"]) <= micros(end))
+    ]
+
+
+@pytest.mark.parametrize(
+    "category, start, end",
+    [
+        ("sensor_3", "2024-01-01T10:00:00Z", "2024-01-01T20:00:00+01:00"),
+        ("sensor_0", None, None),
+        (None, "2024-01-02T05:00:00", "2024-01-02T06:00:00"),
+        ("no_existe", None, None),
+        (None, None, None),
+    ],
+)
+def test_query_matches_brute_force(category, start, end):
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_file = _write_data(Path(tmpdir), RECORDS)
+        build_index(data_file, Path(tmpdir) / "data.idx", block_records=100)
+
+        # Act
+        with DatasetIndex(Path(tmpdir) / "data.idx", data_file) as index:
+            found = list(index.query(category, start, end))
+
+        # Assert
+        assert found == _brute_force(RECORDS, category, start, end)
+
+
+def test_selective_query_reads_small_fraction():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_file = _write_data(Path(tmpdir), RECORDS)
+        summary = build_index(data_file, Path(tmpdir) / "data.idx", block_records=100)
+
+        # Act
+        with DatasetIndex(Path(tmpdir) / "data.idx", data_file) as index:
+            plan = index.plan("sensor_1", "2024-01-01T12:00:00", "2024-01-01T13:00:00")
+
+        # Assert
+        assert summary["records"] == 3000
+        assert summary["blocks"] == 30
+        assert summary["categories"] == 5
+        assert 0 < plan.records <= 200
+        assert plan.bytes < plan.data_size / 4
+
+
+def test_build_index_rejects_record_count_mismatch():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_file = _write_data(Path(tmpdir), RECORDS[:10])
+
+        # Act y Assert
+        with pytest.raises(ValueError, match="Layout no soportado"):
+            build_index(data_file, Path(tmpdir) / "data.idx", expected_records=11)
+        assert not (Path(tmpdir) / "data.idx").exists()
+
+
+def test_publisher_builds_index_and_query_reads_current():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        publisher = Publisher(output_dir=tmpdir, indexes=True)
+
+        # Act
+        assert publisher.publish_data(_output_data(RECORDS[:500]), "a.csv")
+        metadata = json.loads((Path(tmpdir) / "metadata.json").read_text())
+        found = indexes.query(tmpdir, "sensor_2", end="2024-01-01T01:00:00Z")
+
+        # Assert
+        assert (Path(tmpdir) / "current" / "data.idx").exists()
+        assert metadata["index"]["records"] == 500
+        assert metadata["index"]["file"] == "data.idx"
+        assert found == _brute_force(
+            RECORDS[:500], "sensor_2", None, "2024-01-01T01:00:00Z"
+        )
+
+
+def test_publisher_skips_index_on_unsupported_layout(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(indexes, "_RECORD_START", b"\nno-coincide\n")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        publisher = Publisher(output_dir=tmpdir, indexes=True)
+
+        # Act
+        assert publisher.publish_data(_output_data(RECORDS[:10]), "a.csv")
+        metadata = json.loads((Path(tmpdir) / "metadata.json").read_text())
+
+        # Assert
+        assert metadata["index"] is None
+        assert not (Path(tmpdir) / "current" / "data.idx").exists()
+
+
+def test_open_current_without_index():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Act y Assert
+        with pytest.raises(FileNotFoundError, match="PUBLISH_INDEXES"):
+            DatasetIndex.open_current(tmpdir)
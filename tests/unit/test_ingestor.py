@@ -104,3 +104,137 @@ def test_ingestor_valid_csv_processing():
         assert len(data) == 2
         assert data[0]["id"] == 1
         assert data[0]["category"] == "sensor_a"
+
+
+def _write_small_csvs(input_dir: Path, count: int):
+    for i in range(count):
+        (input_dir / f"sensor_{i:03d}.csv").write_text(
+            "id,timestamp,value,category\n"
+            f"{i + 1},2024-01-15T10:{i:02d}:00Z,{i * 1.5},sensor_{i % 3}\n"
+            f"{i + 100},2024-01-15T11:{i:02d}:00Z,{i - 2.25},sensor_{i % 3}\n"
+        )
+
+
+def test_ingestor_coalesces_small_files_into_segment():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        output_dir = Path(tmpdir) / "output"
+        input_dir.mkdir()
+        _write_small_csvs(input_dir, 12)
+        (input_dir / "broken.csv").write_text("id,value\n1,100\n")
+
+        ingestor = Ingestor(
+            input_dir=str(input_dir),
+            output_dir=str(output_dir),
+            small_file_threshold=1024,
+            small_file_batch_size=100,
+        )
+
+        # Act
+        ingestor.ingest()
+        ingestor.ingest()
+
+        # Assert
+        data_files = [
+            f for f in output_dir.glob("*.json") if not f.name.startswith(".")
+        ]
+        assert len(data_files) == 1
+        assert data_files[0].name.startswith("segment_")
+        with open(data_files[0], "r") as f:
+            data = json.load(f)
+        assert len(data) == 24
+        assert len({record["source_hash"] for record in data}) == 12
+        # Idempotencia por archivo de origen, sin el CSV inválido
+        assert len(ingestor.processed_hashes) == 12
+
+
+def test_coalesced_segments_transform_like_individual_files():
+    # Arrange
+    from pipeline.transformer.main import Transformer
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        _write_small_csvs(input_dir, 9)
+        hashes = {}
+        for mode, threshold in (("individual", 0), ("coalesced", 1024)):
+            intermediate_dir = Path(tmpdir) / f"intermediate_{mode}"
+            output_dir = Path(tmpdir) / f"output_{mode}"
+            Ingestor(
+                input_dir=str(input_dir),
+                output_dir=str(intermediate_dir),
+                small_file_threshold=threshold,
+                small_file_batch_size=4,
+            ).ingest()
+
+            # Act
+            Transformer(str(intermediate_dir), str(output_dir)).transform()
+            output_file = next(output_dir.glob("transformed_*.json"))
+            with open(output_file, "r") as f:
+                hashes[mode] = json.load(f)["metadata"]["data_hash"]
+
+        # Assert
+        assert hashes["coalesced"] == hashes["individual"]
+
+
+def test_coalesced_segments_do_not_share_type_inference():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        (input_dir / "a.csv").write_text(
+            "id,timestamp,value,category\n"
+            "1,2024-01-01T00:00:00Z,1.5,123\n"
+            "2,2024-01-02T00:00:00Z,2.5,456\n"
+        )
+        (input_dir / "b.csv").write_text(
+            "id,timestamp,value,category\n3,2024-01-03T00:00:00Z,3.5,sensor_b\n"
+        )
+
+        records = {}
+        for mode, threshold in (("individual", 0), ("coalesced", 10000)):
+            ingestor = Ingestor(
+                input_dir=str(input_dir),
+                output_dir=str(Path(tmpdir) / f"intermediate_{mode}"),
+                small_file_threshold=threshold,
+            )
+
+            # Act
+            frames = ingestor.ingest_frames(persist=False)
+            records[mode] = sorted(
+                (rec["id"], rec["category"])
+                for _, frame in frames.items()
+                for rec in frame.to_dict("records")
+            )
+
+        # Assert
+        assert records["coalesced"] == records["individual"]
+        assert records["individual"] == [(3, "sensor_b")]
+
+
+def test_ingestor_keeps_recorded_hash_scheme(monkeypatch):
+    # Arrange
+    from pipeline import config
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        output_dir = Path(tmpdir) / "output"
+        input_dir.mkdir()
+        (input_dir / "test.csv").write_text(
+            "id,timestamp,value,category\n1,2024-01-15T10:30:00Z,42.5,sensor_a\n"
+        )
+        Ingestor(input_dir=str(input_dir), output_dir=str(output_dir)).ingest()
+        monkeypatch.setattr(config, "HASH_SCHEME", "tree")
+
+        # Act
+        ingestor = Ingestor(input_dir=str(input_dir), output_dir=str(output_dir))
+        frames = ingestor.ingest_frames()
+
+        # Assert
+        assert frames == {}
+        assert ingestor.hash_schemes == [("plain", "sha256", 0)]
+        data_files = [
+            f for f in output_dir.glob("*.json") if not f.name.startswith(".")
+        ]
+        assert len(data_files) == 1
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from pipeline.contracts.schemas import OutputData
+from pipeline.ingestor.main import Ingestor
+from pipeline.memory import AdaptiveChunker, MemoryBudget, parse_size
+from pipeline.publisher.main import Publisher
+from pipeline.transformer.main import Transformer
+from pipeline.transformer.spill import SPILL_DIRNAME
+
+
+def _write_csv(input_dir: Path, name: str, start: int, rows: int):
+    lines = ["id,timestamp,value,category"]
+    for i in range(rows):
+        record_id = start + (i * 7) % rows
+        lines.append(f"{record_id},2024-01-01T00:00:{i % 60:02d}Z,{i * 1.25},c{i % 3}")
+    (input_dir / name).write_text("\n".join(lines) + "\n")
+
+
+def _data_files(directory: Path):
+    return sorted(f for f in directory.glob("*.json") if not f.name.startswith("."))
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [("", 0), ("0", 0), ("1024", 1024), ("512MB", 512 * 1024**2), ("2g", 2 * 1024**3)],
+)
+def test_parse_size(value, expected):
+    # Arrange, Act y Assert
+    assert parse_size(value) == expected
+
+
+def test_parse_size_invalid():
+    # Arrange, Act y Assert
+    with pytest.raises(ValueError, match="Tamaño de memoria inválido"):
+        parse_size("mucho")
+
+
+def test_adaptive_chunker_shrinks_with_observed_row_size():
+    # Arrange
+    chunker = AdaptiveChunker("test", MemoryBudget(10**12), min_rows=10, max_rows=10**9)
+    initial = chunker.rows()
+
+    # Act
+    chunker.observe(rows=10, nbytes=10 * 1_000_000)
+
+    # Assert
+    assert chunker.rows() < initial
+    assert AdaptiveChunker("off", MemoryBudget(0), max_rows=50).rows() == 50
+
+
+def test_ingestor_chunked_read_matches_full_read():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        _write_csv(input_dir, "data.csv", 1, 50)
+        full_dir = Path(tmpdir) / "full"
+        chunked_dir = Path(tmpdir) / "chunked"
+        Ingestor(str(input_dir), str(full_dir), memory_budget=0).ingest()
+        chunked = Ingestor(str(input_dir), str(chunked_dir), memory_budget=1)
+        chunked.chunker.min_rows = chunked.chunker.max_rows = 8
+
+        # Act
+        chunked.ingest()
+
+        # Assert
+        full_file, chunked_file = _data_files(full_dir)[0], _data_files(chunked_dir)[0]
+        assert chunked_file.read_bytes() == full_file.read_bytes()
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "latin-1"])
+@pytest.mark.parametrize("last_category,expected", [("abc_ñ", 3001), ("456", 0)])
+def test_ingestor_chunked_read_matches_full_read_on_mixed_types(
+    encoding, last_category, expected
+):
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        lines = ["id,timestamp,value,category"]
+        lines += [f"{i},2024-01-01T00:00:00Z,{i * 0.5},123" for i in range(1, 3001)]
+        lines.append(f"3001,2024-01-01T00:00:00Z,1.0,{last_category}")
+        (input_dir / "data.csv").write_bytes(("\n".join(lines) + "\n").encode(encoding))
+        full_dir = Path(tmpdir) / "full"
+        chunked_dir = Path(tmpdir) / "chunked"
+        Ingestor(str(input_dir), str(full_dir), memory_budget=0).ingest()
+        chunked = Ingestor(str(input_dir), str(chunked_dir), memory_budget=1)
+        chunked.chunker.min_rows = chunked.chunker.max_rows = 500
+
+        # Act
+        chunked.ingest()
+
+        # Assert
+        # Lectura completa: una columna mixta se infiere como texto y una
+        # solo numérica como int (categorías inválidas, archivo rechazado)
+        full_files, chunked_files = _data_files(full_dir), _data_files(chunked_dir)
+        assert [f.read_bytes() for f in chunked_files] == [
+            f.read_bytes() for f in full_files
+        ]
+        assert sum(len(json.loads(f.read_text())) for f in full_files) == expected
+
+
+def test_transformer_spills_and_streams_same_output():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        intermediate_dir = Path(tmpdir) / "intermediate"
+        input_dir.mkdir()
+        for index in range(3):
+            _write_csv(input_dir, f"data_{index}.csv", index * 20 + 1, 30)
+        Ingestor(str(input_dir), str(intermediate_dir), memory_budget=0).ingest()
+
+        outputs = {}
+        for mode, budget in (("memory", 0), ("spill", 1)):
+            output_dir = Path(tmpdir) / mode
+            transformer = Transformer(
+                str(intermediate_dir), str(output_dir), memory_budget=budget
+            )
+
+            # Act
+            transformer.transform()
+            outputs[mode] = next(output_dir.glob("transformed_*.json"))
+
+        # Assert
+        spill_file = outputs["spill"]
+        memory_data = json.loads(outputs["memory"].read_text())
+        spill_data = json.loads(spill_file.read_text())
+        assert (
+            spill_data["metadata"]["data_hash"] == memory_data["metadata"]["data_hash"]
+        )
+        assert [r["id"] for r in spill_data["records"]] == [
+            r["id"] for r in memory_data["records"]
+        ]
+        # Mismos bytes que la serialización de Pydantic y sidecar consistente
+        payload = spill_file.read_bytes()
+        expected = OutputData(**spill_data).model_dump_json(indent=2).encode("utf-8")
+        assert payload == expected
+        sidecar = json.loads(
+            (spill_file.parent / (spill_file.name + ".sha256")).read_text()
+        )
+        assert sidecar["sha256"] == hashlib.sha256(payload).hexdigest()
+        assert not (spill_file.parent / SPILL_DIRNAME).exists()
+
+
+def test_publisher_uses_streaming_validation_over_budget():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        transformed = Path(tmpdir) / "transformed_1.json"
+        transformed.write_text("x" * 4096)
+        publisher = Publisher(output_dir=tmpdir, memory_budget=1024)
+        unlimited = Publisher(output_dir=tmpdir, memory_budget=0)
+
+        # Act y Assert
+        assert publisher._exceeds_budget(transformed) is True
+        assert unlimited._exceeds_budget(transformed) is False
@@ -0,0 +1,153 @@
+import json
+import tempfile
+from pathlib import Path
+
+from pipeline import config
+from pipeline.ingestor.main import Ingestor
+from pipeline.metrics import PHASE_DURATION, MetricsRegistry, StageMetrics
+from pipeline.runner import PipelineRunner
+
+
+def _write_csv(input_dir: Path, name: str, rows: int):
+    lines = ["id,timestamp,value,category"]
+    for i in range(rows):
+        lines.append(f"{i + 1},2024-01-01T00:00:{i % 60:02d}Z,{i * 1.5},c{i % 2}")
+    lines.append("x,no-es-fecha,1.0,c0")
+    (input_dir / name).write_text("\n".join(lines) + "\n")
+
+
+def test_render_prometheus_histogram_buckets():
+    # Arrange
+    registry = MetricsRegistry()
+    registry.inc("pipeline_rows_total", 5, stage="ingestor", status="valid")
+    registry.observe(PHASE_DURATION, 0.002, stage="ingestor", phase="hash")
+    registry.observe(PHASE_DURATION, 2.0, stage="ingestor", phase="hash")
+
+    # Act
+    text = registry.render_prometheus()
+
+    # Assert
+    assert "# TYPE pipeline_rows_total counter" in text
+    assert 'pipeline_rows_total{stage="ingestor",status="valid"} 5' in text
+    bucket = f'{PHASE_DURATION}_bucket{{phase="hash",stage="ingestor",le="0.005"}} 1'
+    assert bucket in text
+    assert (
+        f'{PHASE_DURATION}_bucket{{phase="hash",stage="ingestor",le="+Inf"}} 2' in text
+    )
+    assert f'{PHASE_DURATION}_count{{phase="hash",stage="ingestor"}} 2' in text
+
+
+def test_report_orders_phases_by_total_time():
+    # Arrange
+    registry = MetricsRegistry()
+    stage = StageMetrics(registry, "transformer")
+    registry.observe(PHASE_DURATION, 0.1, stage="transformer", phase="parse")
+    registry.observe(PHASE_DURATION, 3.0, stage="transformer", phase="validate")
+    registry.observe(PHASE_DURATION, 0.5, stage="transformer", phase="write")
+    stage.finish()
+
+    # Act
+    report = registry.to_report()
+
+    # Assert
+    phases = report["stages"]["transformer"]["phases"]
+    assert list(phases) == ["validate", "write", "parse"]
+    gauges = report["stages"]["transformer"]["gauges"]
+    assert "pipeline_run_duration_seconds" in gauges
+
+
+def test_ingestor_exports_metrics_when_enabled(monkeypatch):
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        _write_csv(input_dir, "a.csv", 10)
+        metrics_dir = Path(tmpdir) / "metrics"
+        config.reset()
+        monkeypatch.setenv("METRICS_ENABLED", "true")
+        monkeypatch.setenv("METRICS_DIR", str(metrics_dir))
+
+        # Act
+        Ingestor(input_dir=str(input_dir), output_dir=f"{tmpdir}/inter").ingest()
+        config.reset()
+
+        # Assert
+        prom = (metrics_dir / "ingestor.prom").read_text()
+        report = json.loads((metrics_dir / "ingestor_report.json").read_text())
+        assert 'pipeline_files_total{stage="ingestor",status="processed"} 1' in prom
+        counters = report["stages"]["ingestor"]["counters"]
+        assert counters["pipeline_rows_total{status=valid}"] == 10
+        assert counters["pipeline_rows_total{status=rejected}"] == 1
+        assert {"hash", "parse", "validate", "write"} <= set(
+            report["stages"]["ingestor"]["phases"]
+        )
+
+
+def test_runner_exports_single_report_for_all_stages(monkeypatch):
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        _write_csv(input_dir, "a.csv", 20)
+        output_dir = Path(tmpdir) / "output"
+        config.reset()
+        monkeypatch.setenv("METRICS_ENABLED", "true")
+        monkeypatch.delenv("METRICS_DIR", raising=False)
+        runner = PipelineRunner(
+            input_dir=str(input_dir),
+            intermediate_dir=f"{tmpdir}/inter",
+            output_dir=str(output_dir),
+        )
+
+        # Act
+        success = runner.run()
+        config.reset()
+
+        # Assert
+        assert success
+        report = json.loads(
+            (output_dir / "metrics" / "pipeline_report.json").read_text()
+        )
+        assert {"ingestor", "transformer", "publisher", "pipeline"} <= set(
+            report["stages"]
+        )
+        assert not (output_dir / "metrics" / "publisher.prom").exists()
+
+
+def test_metrics_disabled_by_default(monkeypatch):
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        _write_csv(input_dir, "a.csv", 5)
+        config.reset()
+        monkeypatch.delenv("METRICS_ENABLED", raising=False)
+        monkeypatch.setenv("OUTPUT_DIR", f"{tmpdir}/output")
+
+        # Act
+        Ingestor(input_dir=str(input_dir), output_dir=f"{tmpdir}/inter").ingest()
+        config.reset()
+
+        # Assert
+        assert not (Path(tmpdir) / "output" / "metrics").exists()
+        assert not (Path(tmpdir) / "inter" / "metrics").exists()
+
+
+def test_ingestor_exports_metrics_to_its_output_dir(monkeypatch):
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        _write_csv(input_dir, "a.csv", 5)
+        config.reset()
+        monkeypatch.setenv("METRICS_ENABLED", "true")
+        monkeypatch.delenv("METRICS_DIR", raising=False)
+        monkeypatch.setenv("OUTPUT_DIR", f"{tmpdir}/output")
+
+        # Act
+        Ingestor(input_dir=str(input_dir), output_dir=f"{tmpdir}/inter").ingest()
+        config.reset()
+
+        # Assert
+        assert (Path(tmpdir) / "inter" / "metrics" / "ingestor.prom").exists()
+        assert not (Path(tmpdir) / "output").exists()
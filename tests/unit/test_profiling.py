@@ -0,0 +1,228 @@
+import json
+import pstats
+import tempfile
+import threading
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from pipeline import config
+from pipeline.profiling import Profiler
+from pipeline.transformer.main import Transformer
+
+
+def _busy_outer():
+    return sum(i * i for i in range(20_000))
+
+
+def _busy_inner():
+    return sorted(str(i) for i in range(20_000))
+
+
+def _functions(prof_path: Path) -> set:
+    stats = pstats.Stats(str(prof_path))
+    return {name for _, _, name in stats.stats}
+
+
+def test_disabled_profiler_writes_nothing():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profiler = Profiler(output_dir=Path(tmpdir) / "profiles")
+
+        # Act
+        with profiler.capture("noop"):
+            _busy_outer()
+
+        # Assert
+        assert not profiler.enabled
+        assert not profiler.sample_file()
+        assert not (Path(tmpdir) / "profiles").exists()
+
+
+def test_invalid_mode_raises():
+    # Arrange, Act y Assert
+    with pytest.raises(ValueError, match="Modo de profiling no soportado"):
+        Profiler(["gpu"])
+
+
+def test_nested_cpu_captures_pause_outer_profile():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profiler = Profiler(["cpu"], Path(tmpdir))
+
+        # Act
+        with profiler.capture("outer"):
+            _busy_outer()
+            with profiler.capture("inner"):
+                _busy_inner()
+
+        # Assert
+        outer = _functions(Path(tmpdir) / "0000_outer.prof")
+        inner = _functions(Path(tmpdir) / "0001_inner.prof")
+        assert "_busy_outer" in outer and "_busy_inner" not in outer
+        assert "_busy_inner" in inner
+
+
+def test_memory_capture_reports_top_allocations():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profiler = Profiler(["memory"], Path(tmpdir), top_n=5)
+
+        # Act
+        with profiler.capture("alloc"):
+            payload = [str(i) * 10 for i in range(50_000)]
+
+        # Assert
+        report = (Path(tmpdir) / "0000_alloc.alloc.txt").read_text().splitlines()
+        assert report[0].startswith("# 0000_alloc: actual=")
+        assert 0 < len(report) - 2 <= 5
+        assert "test_profiling.py" in report[2]
+        assert not tracemalloc.is_tracing()
+        assert len(payload) == 50_000
+
+
+def test_concurrent_threads_share_a_single_cpu_profiler():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profiler = Profiler(["cpu", "memory"], Path(tmpdir))
+        entered, release = threading.Event(), threading.Event()
+        errors, stacks = [], []
+
+        def hold():
+            try:
+                with profiler.capture("ingest"):
+                    entered.set()
+                    release.wait(5)
+                    _busy_outer()
+            except Exception as e:
+                errors.append(e)
+            stacks.append(list(profiler._stack()))
+
+        # Act
+        holder = threading.Thread(target=hold)
+        holder.start()
+        entered.wait(5)
+        with profiler.capture("transform"):
+            _busy_inner()
+        release.set()
+        holder.join()
+        with profiler.capture("after"):
+            _busy_inner()
+
+        # Assert
+        assert errors == []
+        assert stacks == [[]] and profiler._stack() == []
+        assert sorted(p.name for p in Path(tmpdir).glob("*.prof")) == [
+            "0000_ingest.prof",
+            "0002_after.prof",
+        ]
+        assert (Path(tmpdir) / "0001_transform.alloc.txt").exists()
+        assert not tracemalloc.is_tracing()
+
+
+def test_failed_cpu_enable_skips_capture_without_leaking(monkeypatch):
+    # Arrange
+    import cProfile
+
+    def busy_enable(self):
+        raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(cProfile.Profile, "enable", busy_enable)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profiler = Profiler(["cpu", "memory"], Path(tmpdir))
+
+        # Act
+        with profiler.capture("busy"):
+            _busy_outer()
+
+        # Assert
+        assert profiler._stack() == []
+        assert profiler._tracing_depth == 0
+        assert not list(Path(tmpdir).glob("*.prof"))
+        assert (Path(tmpdir) / "0000_busy.alloc.txt").exists()
+
+
+def test_sample_file_one_in_n():
+    # Arrange
+    profiler = Profiler(["cpu"], sample_rate=3)
+
+    # Act
+    sampled = [profiler.sample_file() for _ in range(7)]
+
+    # Assert
+    assert sampled == [True, False, False, True, False, False, True]
+
+
+def test_transformer_profiles_stage_files_and_steps(monkeypatch):
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "intermediate"
+        input_dir.mkdir()
+        for name in ("a", "b"):
+            records = [
+                {
+                    "id": i,
+                    "timestamp": "2024-01-01T00:00:00Z",
+                    "value": i * 2.0,
+                    "category": f"c{i % 2}",
+                }
+                for i in range(1, 6)
+            ]
+            (input_dir / f"{name}.json").write_text(json.dumps(records))
+        profiles_dir = Path(tmpdir) / "profiles"
+        config.reset()
+        monkeypatch.setenv("PROFILE", "cpu")
+        monkeypatch.setenv("PROFILE_DIR", str(profiles_dir))
+        monkeypatch.setenv("PROFILE_SAMPLE_RATE", "2")
+        # La captura de etapa completa se sortea con probabilidad 1/2
+        monkeypatch.setattr("pipeline.profiling.random.randrange", lambda n: 0)
+        transformer = Transformer(
+            input_dir=str(input_dir), output_dir=f"{tmpdir}/output"
+        )
+        config.reset()
+
+        # Act
+        transformer.transform()
+
+        # Assert
+        names = sorted(p.name.split("_", 1)[1] for p in profiles_dir.glob("*.prof"))
+        assert "transformer.prof" in names
+        assert "transformer_a.prof" in names
+        assert "transformer_b.prof" not in names
+        assert "step_clean_data.prof" in names
+        assert "step_normalize_values.prof" in names
+
+
+def test_streaming_runner_profiles_transformation_steps(monkeypatch):
+    # Arrange
+    from pipeline.runner import PipelineRunner
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        (input_dir / "a.csv").write_text(
+            "id,timestamp,value,category\n"
+            "1,2024-01-01T00:00:00Z,1.5,c0\n"
+            "2,2024-01-02T00:00:00Z,2.5,c1\n"
+        )
+        profiles_dir = Path(tmpdir) / "profiles"
+        config.reset()
+        monkeypatch.setenv("PROFILE", "cpu")
+        monkeypatch.setenv("PROFILE_DIR", str(profiles_dir))
+        runner = PipelineRunner(
+            str(input_dir),
+            f"{tmpdir}/intermediate",
+            f"{tmpdir}/output",
+            streaming=True,
+        )
+        config.reset()
+
+        # Act
+        assert runner.run()
+
+        # Assert
+        names = [p.name.split("_", 1)[1] for p in profiles_dir.glob("*.prof")]
+        assert any(name.startswith("transformer_") for name in names)
+        assert "step_clean_data.prof" in names
+        assert "step_normalize_values.prof" in names
@@ -2,7 +2,9 @@ import os
 import tempfile
 import json
 from pathlib import Path
+import pytest
 from pipeline.publisher.main import Publisher, PublisherMetadata
+from pipeline.transformer.main import Transformer
 from pipeline.contracts.schemas import OutputData
 
 
@@ -153,3 +155,78 @@ def test_publisher_fails_when_no_files():
 
         # Assert
         assert success is False
+
+
+def _write_transformed_with_sidecar(output_dir: Path) -> Path:
+    """Genera un archivo transformado real con su sidecar"""
+    input_dir = output_dir / "intermediate"
+    input_dir.mkdir()
+    with open(input_dir / "data.json", "w") as f:
+        json.dump(
+            [
+                {
+                    "id": 1,
+                    "value": 10,
+                    "timestamp": "2024-01-01T00:00:00Z",
+                    "category": "A",
+                },
+                {
+                    "id": 2,
+                    "value": 20,
+                    "timestamp": "2024-01-01T00:01:00Z",
+                    "category": "B",
+                },
+            ],
+            f,
+        )
+    Transformer(str(input_dir), str(output_dir)).transform()
+    return next(output_dir.glob("transformed_*.json"))
+
+
+def test_publisher_trusted_mode_skips_model_construction(monkeypatch):
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        _write_transformed_with_sidecar(output_dir)
+        publisher = Publisher(output_dir=str(output_dir), validation_mode="trusted")
+
+        def fail_full_validation(file_path):
+            raise AssertionError("No debe validar con Pydantic completo")
+
+        monkeypatch.setattr(
+            publisher, "_validate_transformed_data", fail_full_validation
+        )
+
+        # Act
+        success = publisher.publish()
+
+        # Assert
+        assert success is True
+        with open(output_dir / "metadata.json", "r") as f:
+            metadata = json.load(f)
+        assert metadata["total_records"] == 2
+
+
+def test_publisher_trusted_mode_falls_back_on_hash_mismatch():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        transformed_file = _write_transformed_with_sidecar(output_dir)
+        content = transformed_file.read_text().replace('"B"', '"C"')
+        transformed_file.write_text(content)
+        publisher = Publisher(output_dir=str(output_dir), validation_mode="trusted")
+
+        # Act
+        verified = publisher._verify_sidecar(transformed_file)
+        output_metadata = publisher._validate_for_publish(transformed_file)
+
+        # Assert
+        assert verified is None
+        assert output_metadata.total_records == 2
+
+
+def test_publisher_rejects_unknown_validation_mode():
+    # Arrange, Act y Assert
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with pytest.raises(ValueError, match="Modo de validación no soportado"):
+            Publisher(output_dir=tmpdir, validation_mode="lazy")
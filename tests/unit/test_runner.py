@@ -0,0 +1,232 @@
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from pipeline.ingestor.main import Ingestor
+from pipeline.publisher.main import Publisher
+from pipeline.runner import PipelineRunner
+from pipeline.transformer.main import Transformer
+
+CSV_CONTENT = (
+    "id,timestamp,value,category\n"
+    "3,2024-01-03T00:00:00Z,30.25,C\n"
+    "1,2024-01-01T00:00:00Z,10.5,A\n"
+    "2,2024-01-02T00:00:00Z,20.0,B\n"
+)
+
+
+# Más decimales que la precisión de los JSON intermedios
+PRECISE_CSV_CONTENT = (
+    "id,timestamp,value,category\n"
+    "3,2024-01-03T00:00:00Z,30.123456789012345,C\n"
+    "1,2024-01-01T00:00:00Z,0.000000000012345,A\n"
+    "2,2024-01-02T00:00:00Z,12345678.987654321,B\n"
+)
+
+
+def _create_dirs(tmpdir, content=CSV_CONTENT):
+    input_dir = Path(tmpdir) / "input"
+    intermediate_dir = Path(tmpdir) / "intermediate"
+    output_dir = Path(tmpdir) / "output"
+    input_dir.mkdir()
+    (input_dir / "data.csv").write_text(content)
+    return input_dir, intermediate_dir, output_dir
+
+
+def _published_metadata(output_dir):
+    with open(output_dir / "metadata.json", "r") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("content", [CSV_CONTENT, PRECISE_CSV_CONTENT])
+def test_runner_in_memory_matches_file_mode(content):
+    # Arrange
+    with tempfile.TemporaryDirectory() as file_tmp, (
+        tempfile.TemporaryDirectory()
+    ) as mem_tmp:
+        input_dir, intermediate_dir, output_dir = _create_dirs(file_tmp, content)
+        Ingestor(str(input_dir), str(intermediate_dir)).ingest()
+        Transformer(str(intermediate_dir), str(output_dir)).transform()
+        Publisher(output_dir=str(output_dir)).publish()
+        expected = _published_metadata(output_dir)
+
+        input_dir, intermediate_dir, output_dir = _create_dirs(mem_tmp, content)
+        runner = PipelineRunner(
+            str(input_dir),
+            str(intermediate_dir),
+            str(output_dir),
+            persist_intermediate=False,
+            persist_transformed=False,
+        )
+
+        # Act
+        result = runner.run()
+
+        # Assert
+        metadata = _published_metadata(output_dir)
+        assert result is True
+        assert metadata["data_hash"] == expected["data_hash"]
+        assert metadata["total_records"] == 3
+        assert not any(
+            not f.name.startswith(".") for f in intermediate_dir.glob("*.json")
+        )
+        assert list(output_dir.glob("transformed_*.json")) == []
+
+
+def test_runner_persists_intermediate_when_requested():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir, intermediate_dir, output_dir = _create_dirs(tmpdir)
+        runner = PipelineRunner(
+            str(input_dir),
+            str(intermediate_dir),
+            str(output_dir),
+            persist_intermediate=True,
+            persist_transformed=True,
+        )
+
+        # Act
+        result = runner.run()
+        rerun = PipelineRunner(
+            str(input_dir), str(intermediate_dir), str(output_dir), True, True
+        ).run()
+
+        # Assert
+        assert result is True
+        intermediate = [
+            f for f in intermediate_dir.glob("*.json") if not f.name.startswith(".")
+        ]
+        assert len(intermediate) == 1
+        assert (intermediate_dir / ".processed_hashes.json").exists()
+        # La segunda ejecución reutiliza el intermedio persistido
+        assert rerun is True
+        assert _published_metadata(output_dir)["total_records"] == 3
+
+
+def test_runner_streaming_matches_batch_mode():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir, intermediate_dir, output_dir = _create_dirs(tmpdir)
+        # Varios archivos con ids repetidos entre archivos
+        for i in range(4):
+            (input_dir / f"extra_{i}.csv").write_text(
+                "id,timestamp,value,category\n"
+                f"{i + 2},2024-02-0{i + 1}T00:00:00Z,{i * 7.5},X{i}\n"
+                f"{i + 10},2024-02-0{i + 1}T00:00:00Z,{i - 3.25},Y\n"
+            )
+        batch = PipelineRunner(
+            str(input_dir),
+            str(intermediate_dir),
+            str(output_dir / "batch"),
+            persist_intermediate=False,
+            persist_transformed=False,
+            streaming=False,
+        )
+        streaming = PipelineRunner(
+            str(input_dir),
+            str(intermediate_dir),
+            str(output_dir / "streaming"),
+            persist_intermediate=False,
+            persist_transformed=False,
+            streaming=True,
+            queue_size=1,
+        )
+
+        # Act
+        batch_result = batch.run()
+        streaming_result = streaming.run()
+
+        # Assert
+        expected = _published_metadata(output_dir / "batch")
+        metadata = _published_metadata(output_dir / "streaming")
+        assert batch_result is True and streaming_result is True
+        assert metadata["data_hash"] == expected["data_hash"]
+        assert metadata["total_records"] == expected["total_records"]
+
+
+def test_runner_streaming_spills_writer_under_memory_budget(monkeypatch):
+    # Arrange
+    from pipeline.memory import MemoryBudget
+    from pipeline.transformer import spill
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir, intermediate_dir, output_dir = _create_dirs(tmpdir)
+        for i in range(4):
+            (input_dir / f"extra_{i}.csv").write_text(
+                "id,timestamp,value,category\n"
+                f"{i + 2},2024-02-0{i + 1}T00:00:00Z,{i * 7.5},X{i}\n"
+                f"{i + 10},2024-02-0{i + 1}T00:00:00Z,{i - 3.25},Y\n"
+            )
+        runners = {}
+        for mode, streaming in (("batch", False), ("spill", True)):
+            runners[mode] = PipelineRunner(
+                str(input_dir),
+                str(intermediate_dir),
+                str(output_dir / mode),
+                persist_intermediate=False,
+                persist_transformed=False,
+                streaming=streaming,
+                queue_size=1,
+            )
+        runners["spill"].transformer.memory_budget = MemoryBudget(1)
+        spilled_runs = []
+        original_spill = spill.SpillBuffer.spill
+
+        def counting_spill(buffer):
+            spilled_runs.append(len(buffer.records))
+            original_spill(buffer)
+
+        monkeypatch.setattr(spill.SpillBuffer, "spill", counting_spill)
+
+        # Act
+        results = {mode: runner.run() for mode, runner in runners.items()}
+
+        # Assert
+        expected = _published_metadata(output_dir / "batch")
+        metadata = _published_metadata(output_dir / "spill")
+        assert results == {"batch": True, "spill": True}
+        assert len([n for n in spilled_runs if n]) > 1
+        assert metadata["data_hash"] == expected["data_hash"]
+        assert metadata["total_records"] == expected["total_records"]
+        assert list((output_dir / "spill").glob("transformed_*.json")) == []
+        assert not (output_dir / "spill" / spill.SPILL_DIRNAME).exists()
+
+
+@pytest.mark.parametrize("persist,reingested", [(None, 0), (False, 1)])
+def test_runner_second_run_idempotency(monkeypatch, persist, reingested):
+    # Arrange
+    from pipeline import config
+
+    monkeypatch.delenv("PERSIST_INTERMEDIATE", raising=False)
+    config.reset()
+    reads = []
+    original_read = Ingestor._read_valid_frame
+
+    def counting_read(self, csv_file):
+        reads.append(csv_file.name)
+        return original_read(self, csv_file)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir, intermediate_dir, output_dir = _create_dirs(tmpdir)
+
+        def run():
+            return PipelineRunner(
+                str(input_dir),
+                str(intermediate_dir),
+                str(output_dir),
+                persist_intermediate=persist,
+                persist_transformed=False,
+            ).run()
+
+        assert run() is True
+        monkeypatch.setattr(Ingestor, "_read_valid_frame", counting_read)
+
+        # Act
+        result = run()
+
+        # Assert
+        assert result is True
+        assert len(reads) == reingested
+        assert _published_metadata(output_dir)["total_records"] == 3
@@ -0,0 +1,188 @@
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from pipeline.contracts.schemas import OutputData
+from pipeline.publisher import segments
+from pipeline.publisher.main import Publisher
+from pipeline.publisher.segments import (
+    SEGMENTS_DIRNAME,
+    SegmentStore,
+    merge_records,
+    segment_tier,
+)
+
+
+def _records(pairs: list) -> list:
+    return [{"id": record_id, "value": value} for record_id, value in pairs]
+
+
+def _output_data(pairs: list) -> OutputData:
+    return OutputData(
+        records=[
+            {
+                "id": record_id,
+                "timestamp": "2024-01-01T00:00:00Z",
+                "original_value": value,
+                "normalized_value": 0.0,
+                "category": "c",
+                "processed_at": "2024-01-01T00:00:00",
+            }
+            for record_id, value in pairs
+        ],
+        metadata={
+            "total_records": len(pairs),
+            "execution_time_seconds": 0.1,
+            "data_hash": "a" * 64,
+            "generated_at": "2024-01-01T00:00:00",
+        },
+    )
+
+
+def test_merge_records_last_writer_wins():
+    # Arrange
+    oldest = _records([(1, "a"), (3, "a"), (5, "a")])
+    middle = _records([(3, "b"), (4, "b")])
+    newest = _records([(1, "c"), (6, "c")])
+
+    # Act
+    merged = list(merge_records([oldest, middle, newest]))
+
+    # Assert
+    assert [(r["id"], r["value"]) for r in merged] == [
+        (1, "c"),
+        (3, "b"),
+        (4, "b"),
+        (5, "a"),
+        (6, "c"),
+    ]
+
+
+def test_add_keeps_last_duplicate_and_rejects_unsorted():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = SegmentStore(Path(tmpdir))
+
+        # Act
+        segment = store.add(_records([(1, "a"), (2, "a"), (2, "b")]), "v1")
+
+        # Assert
+        assert segment["records"] == 2
+        assert (segment["min_id"], segment["max_id"]) == (1, 2)
+        assert [r["value"] for r in store.scan()] == ["a", "b"]
+        with pytest.raises(ValueError):
+            store.add(_records([(2, "x"), (1, "x")]))
+
+
+def test_compaction_merges_tiers_and_preserves_scan(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(segments, "TIER_BASE_BYTES", 200)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = SegmentStore(Path(tmpdir), min_merge=2)
+        for run in range(5):
+            store.add(_records([(i, run) for i in range(run, run + 3)]))
+        before = list(store.scan())
+        (Path(tmpdir) / "seg_huérfano.jsonl.tmp").write_text("{}")
+
+        # Act
+        merges = store.compact()
+
+        # Assert
+        after = list(store.scan())
+        listed = store.segments()
+        assert merges >= 1
+        assert after == before
+        assert [(r["id"], r["value"]) for r in after] == [
+            (0, 0),
+            (1, 1),
+            (2, 2),
+            (3, 3),
+            (4, 4),
+            (5, 4),
+            (6, 4),
+        ]
+        tiers = [segment_tier(s["size"]) for s in listed]
+        assert all(a != b for a, b in zip(tiers, tiers[1:]))
+        assert listed[0]["seq_min"] == 1 and listed[-1]["seq_max"] == 5
+        files = {p.name for p in Path(tmpdir).iterdir()}
+        assert files == {s["file"] for s in listed} | {
+            "manifest.json",
+            ".manifest.lock",
+            ".compact.lock",
+        }
+
+
+def test_concurrent_compactions_across_stores_are_serialized(monkeypatch):
+    # Arrange
+    import threading
+
+    monkeypatch.setattr(segments, "TIER_BASE_BYTES", 200)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = SegmentStore(Path(tmpdir), min_merge=2)
+        for run in range(12):
+            writer.add(_records([(i, run) for i in range(run, run + 20)]))
+        before = list(writer.scan())
+        # Instancias independientes: solo flock las coordina (como dos procesos)
+        stores = [SegmentStore(Path(tmpdir), min_merge=2) for _ in range(4)]
+        errors = []
+
+        def compact(store):
+            try:
+                store.compact()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=compact, args=(s,)) for s in stores]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        writer.add(_records([(100, "nuevo")]))
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        assert errors == []
+        after = list(writer.scan())
+        assert after[:-1] == before and after[-1]["value"] == "nuevo"
+        files = {p.name for p in Path(tmpdir).iterdir() if p.suffix == ".jsonl"}
+        assert files == {s["file"] for s in writer.segments()}
+
+
+def test_publisher_adds_segment_per_publication(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(segments, "TIER_BASE_BYTES", 1)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        publisher = Publisher(output_dir=tmpdir, delta=False, segments=True)
+        publisher.segments.min_merge = 2
+
+        # Act
+        assert publisher.publish_data(_output_data([(1, 1.0), (2, 2.0)]), "a.csv")
+        assert publisher.publish_data(_output_data([(2, 20.0), (3, 3.0)]), "b.csv")
+        publisher.segments.wait()
+
+        # Assert
+        store = SegmentStore(Path(tmpdir) / SEGMENTS_DIRNAME)
+        assert [(r["id"], r["original_value"]) for r in store.scan()] == [
+            (1, 1.0),
+            (2, 20.0),
+            (3, 3.0),
+        ]
+        with open(Path(tmpdir) / "metadata.json") as f:
+            segment = json.load(f)["segment"]
+        assert segment["seq_min"] == 2 and segment["records"] == 2
+
+
+def test_publisher_without_segments_creates_nothing():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        publisher = Publisher(output_dir=tmpdir, delta=False, segments=False)
+
+        # Act
+        success = publisher.publish_data(_output_data([(1, 1.0)]), "a.csv")
+
+        # Assert
+        assert success
+        assert not (Path(tmpdir) / SEGMENTS_DIRNAME).exists()
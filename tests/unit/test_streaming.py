@@ -0,0 +1,126 @@
+import hashlib
+import json
+import tempfile
+from pathlib import Path
+import pytest
+from pipeline.contracts.streaming import (
+    RecordHasher,
+    iter_array_items,
+    iter_output_document,
+)
+from pipeline.publisher.main import Publisher
+from pipeline.transformer.main import Transformer
+
+
+def _records(n: int):
+    return [
+        {
+            "id": i,
+            "timestamp": "2024-01-01T00:00:00Z",
+            "original_value": i * 1.5,
+            "normalized_value": 0.5,
+            "category": f"sensor_{i % 3}",
+            "processed_at": "2024-01-15T10:30:00Z",
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def test_record_hasher_matches_full_serialization():
+    # Arrange
+    records = [{k: v for k, v in r.items() if k != "processed_at"} for r in _records(5)]
+    expected = hashlib.sha256(
+        json.dumps(records, sort_keys=True, ensure_ascii=True).encode()
+    ).hexdigest()
+    empty = hashlib.sha256(json.dumps([]).encode()).hexdigest()
+
+    # Act
+    hasher = RecordHasher()
+    for record in records:
+        hasher.update(record)
+
+    # Assert
+    assert hasher.hexdigest() == expected
+    assert hasher.count == 5
+    assert RecordHasher().hexdigest() == empty
+
+
+def test_iter_output_document_with_tiny_chunks():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "transformed_1.json"
+        document = {"records": _records(20), "metadata": {"total_records": 20}}
+        file_path.write_text(json.dumps(document, indent=2))
+
+        # Act
+        events = list(iter_output_document(file_path, chunk_size=7))
+
+        # Assert
+        records = [value for key, value in events if key == "record"]
+        assert records == document["records"]
+        assert ("metadata", {"total_records": 20}) in events
+
+
+def test_iter_array_items_rejects_truncated_file():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "data.json"
+        file_path.write_text(json.dumps(_records(3))[:-20])
+
+        # Act y Assert
+        with pytest.raises(ValueError, match="JSON inválido"):
+            list(iter_array_items(file_path, chunk_size=16))
+
+
+def test_publisher_streaming_mode_validates_transformer_output():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "intermediate"
+        output_dir = Path(tmpdir) / "output"
+        input_dir.mkdir()
+        with open(input_dir / "data.json", "w") as f:
+            json.dump(
+                [
+                    {
+                        "id": i,
+                        "value": i * 3,
+                        "timestamp": "2024-01-01T00:00:00Z",
+                        "category": "A",
+                    }
+                    for i in range(1, 11)
+                ],
+                f,
+            )
+        Transformer(str(input_dir), str(output_dir)).transform()
+        transformed_file = next(output_dir.glob("transformed_*.json"))
+        publisher = Publisher(output_dir=str(output_dir), validation_mode="streaming")
+
+        # Act
+        metadata = publisher._stream_validate_transformed_data(transformed_file)
+
+        # Assert
+        assert metadata.total_records == 10
+        assert publisher.publish() is True
+
+
+def test_publisher_streaming_mode_rejects_hash_mismatch():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        transformed_file = output_dir / "transformed_1.json"
+        document = {
+            "records": _records(2),
+            "metadata": {
+                "total_records": 2,
+                "execution_time_seconds": 0.1,
+                "data_hash": "a" * 64,
+                "generated_at": "2024-01-15T10:30:00Z",
+            },
+        }
+        transformed_file.write_text(json.dumps(document))
+        publisher = Publisher(output_dir=str(output_dir), validation_mode="streaming")
+
+        # Act y Assert
+        with pytest.raises(ValueError, match="data_hash no coincide"):
+            publisher._stream_validate_transformed_data(transformed_file)
+        assert publisher.publish() is False
@@ -0,0 +1,139 @@
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from pipeline import config
+from pipeline.runner import PipelineRunner
+from pipeline.tracing import Tracer, current_span
+
+
+def _read_spans(path: Path) -> list:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def _attributes(span: dict) -> dict:
+    return {attr["key"]: attr["value"] for attr in span["attributes"]}
+
+
+def test_disabled_tracer_is_noop():
+    # Arrange
+    tracer = Tracer()
+
+    # Act
+    with tracer.span("noop", rows=3) as span:
+        span.set_attribute("extra", 1)
+        active = current_span()
+
+    # Assert
+    assert not tracer.enabled
+    assert active is None
+
+
+def test_nested_spans_share_trace_and_link_parent():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        spans_file = Path(tmpdir) / "spans.jsonl"
+        tracer = Tracer(spans_file)
+
+        # Act
+        with tracer.span("parent", **{"file.hash": "abc"}):
+            with tracer.span("child", rows=10, ratio=0.5, ok=True) as child:
+                child.set_attribute("names", ["a", "b"])
+        with pytest.raises(ValueError):
+            with tracer.span("failing"):
+                raise ValueError("boom")
+
+        # Assert
+        child, parent, failing = _read_spans(spans_file)
+        assert child["traceId"] == parent["traceId"] != failing["traceId"]
+        assert child["parentSpanId"] == parent["spanId"]
+        assert parent["parentSpanId"] == ""
+        assert int(child["endTimeUnixNano"]) >= int(child["startTimeUnixNano"])
+        assert _attributes(parent)["file.hash"] == {"stringValue": "abc"}
+        assert _attributes(child)["rows"] == {"intValue": "10"}
+        assert _attributes(child)["ratio"] == {"doubleValue": 0.5}
+        assert _attributes(child)["ok"] == {"boolValue": True}
+        assert _attributes(child)["names"]["arrayValue"]["values"][1] == {
+            "stringValue": "b"
+        }
+        assert failing["status"] == {
+            "code": "STATUS_CODE_ERROR",
+            "message": "ValueError: boom",
+        }
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_runner_emits_single_trace(monkeypatch, streaming):
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        (input_dir / "a.csv").write_text(
+            "id,timestamp,value,category\n"
+            "2,2024-01-01T00:00:00Z,2.0,x\n"
+            "1,2024-01-01T00:00:01Z,1.0,y\n"
+        )
+        output_dir = Path(tmpdir) / "output"
+        config.reset()
+        monkeypatch.setenv("TRACING_ENABLED", "true")
+        monkeypatch.delenv("TRACING_DIR", raising=False)
+        runner = PipelineRunner(
+            input_dir=str(input_dir),
+            intermediate_dir=f"{tmpdir}/inter",
+            output_dir=str(output_dir),
+            streaming=streaming,
+        )
+        config.reset()
+
+        # Act
+        success = runner.run()
+
+        # Assert
+        assert success
+        spans = _read_spans(output_dir / "traces" / "spans.jsonl")
+        by_name = {}
+        for span in spans:
+            by_name.setdefault(span["name"], []).append(span)
+        assert len({span["traceId"] for span in spans}) == 1
+        root = by_name["pipeline.run"][0]
+        assert root["parentSpanId"] == ""
+        ingest = by_name["ingestor.file"][0]
+        assert ingest["parentSpanId"] == root["spanId"]
+        assert "stringValue" in _attributes(ingest)["file.hash"]
+        steps = {
+            _attributes(span)["transform.name"]["stringValue"]
+            for span in by_name["transformer.step"]
+        }
+        assert steps == {"clean_data", "normalize_values", "add_metadata"}
+        assert "transformer.hash" in by_name
+        assert "publisher.export" in by_name
+        publish_attributes = _attributes(by_name["publisher.publish"][0])
+        assert publish_attributes["records"] == {"intValue": "2"}
+
+
+def test_standalone_ingestor_traces_to_its_output_dir(monkeypatch):
+    # Arrange
+    from pipeline.ingestor.main import Ingestor
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_dir = Path(tmpdir) / "input"
+        input_dir.mkdir()
+        (input_dir / "a.csv").write_text(
+            "id,timestamp,value,category\n1,2024-01-01T00:00:00Z,1.0,x\n"
+        )
+        config.reset()
+        monkeypatch.setenv("TRACING_ENABLED", "true")
+        monkeypatch.delenv("TRACING_DIR", raising=False)
+        monkeypatch.setenv("OUTPUT_DIR", f"{tmpdir}/output")
+        ingestor = Ingestor(input_dir=str(input_dir), output_dir=f"{tmpdir}/inter")
+        config.reset()
+
+        # Act
+        ingestor.ingest()
+
+        # Assert
+        spans = _read_spans(Path(tmpdir) / "inter" / "traces" / "spans.jsonl")
+        assert {span["name"] for span in spans} >= {"ingestor.ingest", "ingestor.file"}
+        assert not (Path(tmpdir) / "output").exists()
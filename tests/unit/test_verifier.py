@@ -5,6 +5,9 @@ from scripts.verify_reproducibility import (
     run_verification,
     get_intermediate_hashes,
     calculate_file_hash,
+    diff_artifacts,
+    diff_records,
+    run_record_diff,
 )
 
 
@@ -117,3 +120,107 @@ def test_calculate_file_hash(setup_test_environment: Path):
 
     # Assert
     assert hash_value == expected_hash
+
+
+def _transformed_doc(values, processed_at="2024-01-15T10:30:00Z"):
+    return {
+        "records": [
+            {
+                "id": i + 1,
+                "original_value": v,
+                "category": "sensor_a",
+                "processed_at": processed_at,
+            }
+            for i, v in enumerate(values)
+        ],
+        "metadata": {"total_records": len(values)},
+    }
+
+
+def test_diff_records_reports_first_divergence_ignoring_processed_at(temp_dir: Path):
+    """
+    Prueba que el diff por registros localiza el primer id y campo distinto
+    """
+    # Arrange
+    reference = temp_dir / "reference.json"
+    candidate = temp_dir / "candidate.json"
+    reference.write_text(json.dumps(_transformed_doc([1.0, 2.0, 3.0])))
+    candidate.write_text(
+        json.dumps(_transformed_doc([1.0, 2.5, 3.0], "2025-01-01T00:00:00Z"))
+    )
+
+    # Act
+    report = diff_records(reference, candidate)
+
+    # Assert
+    assert report["compared_records"] == 3
+    assert report["differing_records"] == 1
+    assert report["column_counts"] == {"original_value": 1}
+    assert report["first_differences"][0]["id"] == 2
+    assert report["first_differences"][0]["fields"]["original_value"] == {
+        "reference": 2.0,
+        "candidate": 2.5,
+    }
+
+
+def test_diff_records_stops_after_max_diffs(temp_dir: Path):
+    """
+    Prueba que la comparación se detiene al alcanzar el máximo de diferencias
+    """
+    # Arrange
+    reference = temp_dir / "reference.json"
+    candidate = temp_dir / "candidate.json"
+    reference.write_text(json.dumps([{"id": i, "value": i} for i in range(1, 11)]))
+    candidate.write_text(json.dumps([{"id": i, "value": -i} for i in range(1, 11)]))
+
+    # Act
+    report = diff_records(reference, candidate, max_diffs=3)
+
+    # Assert
+    assert report["differing_records"] == 3
+    assert report["stopped_early"] is True
+    assert [d["id"] for d in report["first_differences"]] == [1, 2, 3]
+
+
+def test_diff_artifacts_directories_report_missing_and_extra(temp_dir: Path):
+    """
+    Prueba el diff entre directorios pareando archivos por nombre
+    """
+    # Arrange
+    reference_dir = temp_dir / "reference"
+    candidate_dir = temp_dir / "candidate"
+    reference_dir.mkdir()
+    candidate_dir.mkdir()
+    (reference_dir / "a.json").write_text(json.dumps([{"id": 1}, {"id": 2}]))
+    (candidate_dir / "a.json").write_text(json.dumps([{"id": 1}, {"id": 3}]))
+    (reference_dir / "b.json").write_text("[]")
+    (candidate_dir / "c.json").write_text("[]")
+
+    # Act
+    result = diff_artifacts(reference_dir, candidate_dir)
+
+    # Assert
+    assert result["missing_files"] == ["b.json"]
+    assert result["extra_files"] == ["c.json"]
+    kinds = [d["kind"] for d in result["files"][0]["first_differences"]]
+    assert kinds == ["missing", "extra"]
+
+
+def test_diff_artifacts_rejects_missing_or_mismatched_paths(temp_dir: Path):
+    """
+    Prueba que rutas inexistentes o de distinto tipo no se reportan como éxito
+    """
+    # Arrange
+    reference_dir = temp_dir / "reference"
+    reference_dir.mkdir()
+    candidate_file = temp_dir / "a.json"
+    candidate_file.write_text("[]")
+
+    # Act y Assert
+    with pytest.raises(FileNotFoundError, match="No existe"):
+        diff_artifacts(temp_dir / "no_existe", temp_dir / "tampoco")
+    with pytest.raises(ValueError, match="archivo con un directorio"):
+        diff_artifacts(reference_dir, candidate_file)
+    with pytest.raises(SystemExit) as exc_info:
+        run_record_diff(temp_dir / "no_existe", reference_dir, max_diffs=10)
+    assert exc_info.value.code == 1
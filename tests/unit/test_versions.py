@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from pipeline.publisher.main import Publisher
+from pipeline.publisher.versions import VersionStore
+
+
+def _write_transformed(output_dir: Path, name: str, total: int) -> Path:
+    records = [
+        {
+            "id": i,
+            "timestamp": "2024-01-01T00:00:00Z",
+            "original_value": float(i),
+            "normalized_value": 0.5,
+            "category": "sensor_a",
+            "processed_at": "2024-01-15T10:30:00Z",
+        }
+        for i in range(1, total + 1)
+    ]
+    file_path = output_dir / name
+    with open(file_path, "w") as f:
+        json.dump(
+            {
+                "records": records,
+                "metadata": {
+                    "total_records": total,
+                    "execution_time_seconds": 0.1,
+                    "data_hash": "a" * 64,
+                    "generated_at": "2024-01-15T10:30:00Z",
+                },
+            },
+            f,
+        )
+    return file_path
+
+
+def test_publish_creates_version_and_current_link():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        _write_transformed(output_dir, "transformed_1.json", 2)
+        publisher = Publisher(output_dir=str(output_dir))
+
+        # Act
+        success = publisher.publish()
+
+        # Assert
+        assert success is True
+        store = VersionStore(output_dir)
+        data_file = store.current_data_file()
+        published_file = next(output_dir.glob("published_*.json"))
+        assert (output_dir / "current").is_symlink()
+        assert os.path.samefile(data_file, published_file)  # hardlink, sin copia
+        with open(output_dir / "current" / "metadata.json", "r") as f:
+            metadata = json.load(f)
+        assert metadata["version"] == store.current_version()
+        assert metadata["published_file"] == published_file.name
+
+
+def test_publish_switches_current_to_newest_version():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        publisher = Publisher(output_dir=str(output_dir), keep_versions=0)
+        _write_transformed(output_dir, "transformed_1.json", 1)
+        publisher.publish()
+        _write_transformed(output_dir, "transformed_2.json", 3)
+        publisher.catalog.rebuild()
+
+        # Act
+        publisher.publish()
+
+        # Assert
+        versions = publisher.versions.list_versions()
+        assert len(versions) == 2
+        assert publisher.versions.current_version() == versions[-1]
+        with open(publisher.versions.current_data_file(), "r") as f:
+            assert len(json.load(f)["records"]) == 3
+
+
+def test_gc_keeps_only_configured_versions():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        publisher = Publisher(output_dir=str(output_dir), keep_versions=1)
+        for i in range(3):
+            _write_transformed(output_dir, f"transformed_{i}.json", 1)
+            publisher.catalog.rebuild()
+
+            # Act
+            assert publisher.publish() is True
+
+        # Assert
+        versions = publisher.versions.list_versions()
+        assert versions == [publisher.versions.current_version()]
+        assert len(list(output_dir.glob("published_*.json"))) == 1
+
+
+def test_gc_applies_retention_days_but_keeps_current():
+    # Arrange
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+        store = VersionStore(output_dir, retention_days=1)
+        for version in ["20200101_000000", "20200102_000000"]:
+            data_file = output_dir / f"published_{version}.json"
+            data_file.write_text("{}")
+            store.add(version, data_file)
+            with open(store.version_dir(version) / "metadata.json", "w") as f:
+                json.dump(
+                    {
+                        "published_at": "2020-01-01T00:00:00",
+                        "published_file": data_file.name,
+                    },
+                    f,
+                )
+        store.set_current("20200102_000000")
+
+        # Act
+        removed = store.gc()
+
+        # Assert
+        assert removed == ["20200101_000000"]
+        assert store.list_versions() == ["20200102_000000"]
+        assert not (output_dir / "published_20200101_000000.json").exists()